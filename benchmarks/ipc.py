@@ -0,0 +1,52 @@
+"""
+Estimate how much of a parallel run the parent spends receiving worker results.
+
+Run from the repository root:
+    python benchmarks/ipc.py [paths ...] [--cores N]
+
+Lints the files in this process, then times sending the results back both as pickled
+FileResults and in the packed batch encoding, and reports the parent's share of a run
+on N cores.
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexing.logic import engine  # noqa: E402
+from src.lexing.logic.results import decode_results, encode_results  # noqa: E402
+from src.lexing.logic.source_io import iter_python_files  # noqa: E402
+
+def timed(function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    return value, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Result transport benchmark')
+    parser.add_argument('paths', nargs='*', default=[os.path.dirname(os.__file__)])
+    parser.add_argument('--cores', type=int, default=16)
+    args = parser.parse_args()
+
+    files = list(iter_python_files(args.paths))
+    results, lint_time = timed(lambda: list(engine.run(files, jobs=1)))
+    findings = sum(len(result.diagnostics) for result in results)
+    wall = lint_time / args.cores
+    print(f"{len(files)} files, {findings} findings, {lint_time:.2f} s of linting ({wall:.3f} s on {args.cores} cores)")
+
+    pickled, pickle_time = timed(pickle.dumps, results, pickle.HIGHEST_PROTOCOL)
+    _, unpickle_time = timed(pickle.loads, pickled)
+    packed, pack_time = timed(encode_results, results)
+    _, unpack_time = timed(lambda data: list(decode_results(data)), packed)
+
+    for name, size, worker, parent in (
+        ('pickle', len(pickled), pickle_time, unpickle_time),
+        ('packed', len(packed), pack_time, unpack_time),
+    ):
+        print(f"{name}: {size / 1e6:.1f} MB, workers {worker:.3f} s, parent {parent:.3f} s ({parent / wall:.1%} of the run)")
+
+if __name__ == '__main__':
+    main()
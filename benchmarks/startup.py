@@ -0,0 +1,67 @@
+"""
+Measure how long `jays-linter` takes to lint a tiny file from a cold interpreter.
+
+Run from the repository root:
+    python benchmarks/startup.py [--runs N] [--budget-ms MS]
+
+Prints the best wall time over N runs and the slowest imports reported by
+`python -X importtime`, and exits with status 1 when the best run is over budget.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+TINY_FILE = "def myFunction():\n    return 1\n"
+
+def time_runs(command, runs, env):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def slowest_imports(command, env, count):
+    output = subprocess.run(command[:1] + ['-X', 'importtime'] + command[1:], env=env, capture_output=True, text=True).stderr
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative), name.rstrip()))
+    return sorted(imports, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup benchmark for jays-linter')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    # Bytecode caching off would make every run pay for compiling the linter
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tiny.py')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(TINY_FILE)
+
+        baseline = time_runs([sys.executable, '-c', 'pass'], args.runs, env)
+        command = [sys.executable, '-m', 'src.cli', path]
+        time_runs(command, 1, env)  # warm the bytecode cache
+        best = time_runs(command, args.runs, env)
+
+        print(f"interpreter alone: {baseline * 1000:.1f} ms")
+        print(f"jays-linter tiny file: {best * 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        print("slowest imports (cumulative us):")
+        for cumulative, name in slowest_imports(command, env, 10):
+            print(f"  {cumulative:>8} {name}")
+
+    return 0 if best * 1000 <= args.budget_ms else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
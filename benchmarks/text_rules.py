@@ -0,0 +1,104 @@
+"""
+Time the text and blank-line rules on a large generated file, or on --source FILE.
+
+Run from the repository root:
+    python benchmarks/text_rules.py [--lines N] [--long-every K] [--trailing-every K] [--source FILE]
+
+Every timing uses a fresh linter, so the blank-line rule pays for building the line
+table. It is compared with the loop that stripped and tested every line itself before
+the table; the text rules, plain loops over the lines, with an equivalent loop.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexing.logic.lexing import JayLinter  # noqa: E402
+
+def generated_source(lines, long_every, trailing_every):
+    parts = []
+    for i in range(lines):
+        parts.append(f"VALUE_{i} = {i}{' ' if trailing_every and i % trailing_every == 0 else ''}\n")
+        if long_every and i % long_every == 0:
+            parts.append("# " + "x" * 110 + "\n")
+    return ''.join(parts)
+
+def per_line_loop(linter):
+    for i, line in enumerate(linter.source_lines, start=1):
+        if line and line[-1].isspace():
+            linter.report('JL301', i, f"Line {i} has trailing whitespace.")
+        if not line and i != 1:
+            linter.report('JL302', i, f"Line {i} is empty.")
+        if len(line) > 100:
+            linter.report('JL307', i, f"Line {i} exceeds the maximum line length of 100 characters.")
+
+def text_rules(linter):
+    linter.check_trailing_whitespace()
+    linter.check_line_length()
+
+def blank_line_loop(linter):
+    # check_empty_lines as it was, stripping and testing every line itself
+    previous_empty = previous_import = previous_function = False
+    for i, line in enumerate(linter.source_lines, start=1):
+        stripped = line.strip()
+        if not stripped:
+            previous_empty = True
+            continue
+        if previous_empty:
+            previous_empty = False
+            if previous_import and not stripped.startswith(('import ', 'from ')):
+                previous_import = False
+                continue
+            if previous_function and not stripped.startswith('def '):
+                previous_function = False
+                continue
+            linter.report('JL303', i, f"Line {i} should be empty.")
+        elif stripped.startswith(('import ', 'from ')):
+            previous_import = True
+        elif stripped.startswith('def '):
+            if previous_function:
+                linter.report('JL303', i - 1, f"Line {i-1} should be empty between functions.")
+            previous_function = True
+        elif not previous_function and not previous_import:
+            linter.report('JL303', i, f"Line {i} should be empty.")
+
+def blank_line_rule(linter):
+    linter.check_empty_lines()
+
+def best_of(source, function, prepare=None, repeat=5):
+    # Best time of function on a new linter over source; prepare runs before the clock starts
+    best = float('inf')
+    for _ in range(repeat):
+        linter = JayLinter(source)
+        linter.suppressions
+        if prepare is not None:
+            prepare(linter)
+        start = time.perf_counter()
+        function(linter)
+        best = min(best, time.perf_counter() - start)
+    return best, len(linter.messages)
+
+def main():
+    parser = argparse.ArgumentParser(description='Text rule benchmark')
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--long-every', type=int, default=5000, help="Add a long comment line every K lines (0: never)")
+    parser.add_argument('--trailing-every', type=int, default=5000, help="Add trailing whitespace every K lines (0: never)")
+    parser.add_argument('--source', metavar='FILE', help="Time the rules on FILE instead of a generated file")
+    args = parser.parse_args()
+
+    if args.source:
+        with open(args.source, encoding='utf-8') as f:
+            source = f.read()
+    else:
+        source = generated_source(args.lines, args.long_every, args.trailing_every)
+    print(f"{len(source) / 1e6:.1f} MB, {len(source.splitlines())} lines")
+    for name, loop, rule in (('text rules', per_line_loop, text_rules), ('blank-line rule', blank_line_loop, blank_line_rule)):
+        loop_time, loop_findings = best_of(source, loop)
+        rule_time, rule_findings = best_of(source, rule)
+        print(f"{name + ', per-line loop:':<30} {loop_time * 1000:7.1f} ms, {loop_findings} findings")
+        print(f"{name + ':':<30} {rule_time * 1000:7.1f} ms, {rule_findings} findings ({loop_time / rule_time:.2f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,9 @@ setup(
         'console_scripts': [
             'jays-linter = src.cli:main',
         ],
+        'pytest11': [
+            'jay_lint = src.pytest_plugin',
+        ],
     },
     author='Jay Choy',
     author_email='choyzhengjay@gmail.com',
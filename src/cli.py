@@ -1,49 +1,289 @@
 import argparse
-from pathlib import Path
+import os
+import sys
+import time
 
-from src.lexing.logic.lexing import JayLinter
+from src.lexing.logic.source_io import LINTED_SUFFIXES, iter_python_files
+# Kept importable from here for existing callers
+from src.lexing.logic.source_io import read_source_file, write_source_file  # noqa: F401
 
-def read_source_file(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return f.read()
+def collect_files(paths):
+    files = []
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Error: File '{path}' not found.")
+            continue
+        if not os.path.isdir(path) and not path.endswith(LINTED_SUFFIXES):
+            print(f"Error: '{path}' is not a valid Python file or notebook.")
+            continue
+        files.extend(iter_python_files([path], LINTED_SUFFIXES))
+    return files
 
-def write_source_file(file_path, source_code):
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(source_code)
+def write_baseline(baseline_path, results):
+    from src.lexing.logic.baseline import Baseline
+    baseline = Baseline()
+    for result in results:
+        if result.error:
+            print(f"Error: could not process '{result.path}': {result.error}")
+        baseline.add(result.fingerprints)
+    baseline.save(baseline_path)
+    print(f"Wrote {len(baseline)} findings to the baseline: {baseline_path}")
+
+# Slowest files listed by --profile
+PROFILE_SLOWEST = 5
+
+def _timed(results, timings):
+    # Pass results through, noting how long each file took
+    for result in results:
+        timings.append((result.elapsed, result.path))
+        yield result
+
+def _measured(results, metrics):
+    for result in results:
+        metrics.add_result(result)
+        yield result
+
+def _recorded(results, results_db):
+    for result in results:
+        results_db.add_result(result)
+        yield result
+
+def print_profile(timings, wall, workers):
+    # Parallel efficiency: the share of the workers' wall-clock time spent linting files
+    busy = sum(elapsed for elapsed, _ in timings)
+    efficiency = busy / (wall * workers) if wall else 1.0
+    print(f"Profile: {len(timings)} files in {wall:.2f} s with {workers} worker(s)", file=sys.stderr)
+    print(f"  {busy:.2f} s spent linting, parallel efficiency {efficiency:.1%}", file=sys.stderr)
+    print("  slowest files:", file=sys.stderr)
+    for elapsed, path in sorted(timings, reverse=True)[:PROFILE_SLOWEST]:
+        print(f"    {elapsed:8.3f} s  {path}", file=sys.stderr)
+
+def _select_plugins(parser, select, files, options):
+    # Load the selected plugin rules here first, so a bad selection is reported once
+    from src.lexing.logic.lexing import RULES
+    from src.lexing.logic.plugins import ALL_RULES, is_selected, load_rules
+    try:
+        rules = load_rules(select)
+    except ValueError as e:
+        parser.error(str(e))
+    known_codes = rules.codes | set(RULES)
+    for selector in select:
+        if selector != ALL_RULES and not any(is_selected(code, (selector,)) for code in known_codes):
+            parser.error(f"--select: no rule code starts with '{selector}'")
+    options = options or {}
+    return {path: dict(options.get(path) or {}, select=select) for path in files}
+
+def main(argv=None, cache=None, stdin=None):
+    """
+    Command line entry point. argv defaults to sys.argv[1:]; cache is the lint result
+    cache the daemon keeps between requests, and stdin the bytes it received for "-".
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ['daemon']:
+        from src.daemon import daemon_main
+        return daemon_main(argv[1:])
+    if argv[:1] == ['report']:
+        from src.report import report_main
+        return report_main(argv[1:])
 
-def main():
     parser = argparse.ArgumentParser(description='Python Function Comment Linter')
-    parser.add_argument('file', type=str, help='Python file to lint')
+    parser.add_argument('files', nargs='+', metavar='file', help='Python files or directories to lint, or - for standard input')
     parser.add_argument('--fix', action='store_true', help="Automatically fix the code")
+    parser.add_argument('--diff', action='store_true', help="Print the fixes as unified diffs instead of writing them")
+    parser.add_argument('-j', '--jobs', type=int, default=0, help="Number of worker processes (default: one per CPU)")
+    parser.add_argument('--project', metavar='ROOT', help="Check unused imports and symbols against every module under ROOT")
+    parser.add_argument('--project-index', metavar='FILE', help="Where to keep the project index (default: ROOT/.jay_lint_index.json)")
+    parser.add_argument('--duplicates', metavar='ROOT', help="Report functions that are near copies of another function under ROOT")
+    parser.add_argument('--duplicates-index', metavar='FILE', help="Where to keep the duplicate index (default: ROOT/.jay_lint_duplicates.json)")
+    parser.add_argument('--baseline', metavar='FILE', help="Only report findings that are not in this baseline file")
+    parser.add_argument('--write-baseline', metavar='FILE', help="Record the current findings as the baseline and exit")
+    parser.add_argument('--select', metavar='CODES', help="Comma-separated codes or code prefixes of plugin rules to run as well, or 'all'")
+    parser.add_argument(
+        '--recover', action='store_true',
+        help="Report syntax errors as JL001 findings and lint the statements that do parse, instead of skipping the file",
+    )
+    parser.add_argument('--stdin-filename', metavar='PATH', default='<stdin>', help="Path standard input is reported as, e.g. for --project and --baseline")
+    parser.add_argument(
+        '--shared-cache', metavar='DIR|URL', default=os.environ.get('JAY_LINT_SHARED_CACHE'),
+        help="Reuse lint results from a directory or HTTP cache shared between machines (default: $JAY_LINT_SHARED_CACHE)",
+    )
+    parser.add_argument('--profile', action='store_true', help="Print timings and the parallel efficiency of the run to stderr")
+    parser.add_argument(
+        '--metrics', metavar='FILE', action='append',
+        help="Write run metrics to FILE: JSON if it ends in .json, else OpenMetrics text (can be repeated)",
+    )
+    parser.add_argument(
+        '--results-db', metavar='FILE', default=os.environ.get('JAY_LINT_RESULTS_DB'),
+        help="Record the findings and per-file timings of lint runs in this SQLite database (default: $JAY_LINT_RESULTS_DB)",
+    )
+    parser.add_argument('--daemon', action='store_true', help="Run through the background daemon, starting it if needed")
+    parser.add_argument('--socket', metavar='PATH', help="Unix socket of the daemon (default: one per user in $XDG_RUNTIME_DIR or /tmp)")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    file_path = Path(args.file)
+    if args.daemon:
+        from src.daemon import run_client
+        try:
+            return run_client([arg for arg in argv if arg != '--daemon'], args.socket)
+        except PermissionError as e:
+            parser.error(f"--daemon: {e}")
 
-    if not file_path.exists():
-        print(f"Error: File '{args.file}' not found.")
+    sources = None
+    if '-' in args.files:
+        if len(args.files) > 1:
+            parser.error("'-' (standard input) cannot be combined with other files")
+        files = [args.stdin_filename]
+        sources = {args.stdin_filename: sys.stdin.buffer.read() if stdin is None else stdin}
+    else:
+        files = collect_files(args.files)
+    if not files:
         return
 
-    if not file_path.is_file() or not file_path.suffix == '.py':
-        print(f"Error: '{args.file}' is not a valid Python file.")
-        return
+    # The linter itself is only imported once the arguments are known to be usable
+    from src.lexing.logic import engine
 
-    source_code = read_source_file(file_path)
+    options = None
+    if args.project:
+        from src.lexing.logic.project import ProjectIndex
+        index = ProjectIndex(args.project, args.project_index)
+        index.update(jobs=args.jobs)
+        options = {path: index.linter_options(path) for path in files}
 
-    linter = JayLinter(source_code)
+    if args.duplicates:
+        from src.lexing.logic.duplicates import DuplicateIndex
+        duplicate_index = DuplicateIndex(args.duplicates, args.duplicates_index)
+        duplicate_index.update(jobs=args.jobs)
+        project_options = options or {}
+        options = {path: dict(project_options.get(path) or {}, **duplicate_index.linter_options(path)) for path in files}
 
-    if args.fix:
-        linter.fix()
-        write_source_file(file_path, '\n'.join(linter.source_lines))
-        print(f"Fixed and saved the file: {args.file}")
-    else:
-        messages = linter.lint()
-        if messages:
-            print("Linting results:")
-            for message in messages:
+    if args.select:
+        select = tuple(code.strip() for code in args.select.split(',') if code.strip())
+        options = _select_plugins(parser, select, files, options)
+
+    if args.recover:
+        recover_options = options or {}
+        options = {path: dict(recover_options.get(path) or {}, recover=True) for path in files}
+
+    baseline = None
+    if args.baseline and not (args.fix or args.diff):
+        from src.lexing.logic.baseline import Baseline
+        try:
+            baseline = Baseline.load(args.baseline)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            parser.error(f"--baseline: could not read '{args.baseline}': {e}")
+
+    # Parallel runs hand out the files most expensive first, going by earlier runs' timings
+    workers = engine.worker_count(args.jobs, len(files))
+    history = None
+    if workers > 1:
+        from src.lexing.logic.scheduling import RuntimeHistory
+        history = RuntimeHistory()
+
+    shared_cache = None
+    if args.shared_cache and not (args.fix or args.diff):
+        from src.lexing.logic.shared_cache import open_shared_cache
+        try:
+            shared_cache = open_shared_cache(args.shared_cache)
+        except ValueError as e:
+            parser.error(str(e))
+
+    metrics = None
+    if args.metrics:
+        from src.lexing.logic.metrics import RunMetrics
+        metrics = RunMetrics(workers)
+
+    results_db = None
+    if args.results_db and not (args.fix or args.diff):
+        from src.lexing.logic.results_db import ResultsDatabase
+        try:
+            results_db = ResultsDatabase(args.results_db)
+        except ValueError as e:
+            parser.error(str(e))
+        results_db.start_run()
+
+    timings = [] if args.profile else None
+    start = time.perf_counter()
+    try:
+        return _report(
+            parser, args, engine, files, options, baseline, cache, sources, history, timings, shared_cache, metrics,
+            results_db,
+        )
+    finally:
+        if shared_cache is not None:
+            shared_cache.close()
+        if results_db is not None:
+            results_db.finish_run()
+            results_db.close()
+        if metrics is not None:
+            metrics.wall = time.perf_counter() - start
+            for path in args.metrics:
+                try:
+                    metrics.write(path)
+                except OSError as e:
+                    print(f"Error: could not write metrics to '{path}': {e}", file=sys.stderr)
+        if history is not None:
+            try:
+                history.save()
+            except OSError:
+                pass
+        if timings is not None:
+            print_profile(timings, time.perf_counter() - start, workers)
+
+def _observed(results, timings, metrics, results_db):
+    # The results with --profile, --metrics and --results-db looking on
+    if timings is not None:
+        results = _timed(results, timings)
+    if metrics is not None:
+        results = _measured(results, metrics)
+    if results_db is not None:
+        results = _recorded(results, results_db)
+    return results
+
+def _report(
+    parser, args, engine, files, options, baseline, cache, sources, history, timings, shared_cache, metrics, results_db,
+):
+    run_options = {
+        'jobs': args.jobs, 'options': options, 'cache': cache, 'sources': sources, 'history': history,
+        'shared_cache': shared_cache, 'metrics': metrics,
+    }
+    if args.write_baseline:
+        results = engine.run(files, fingerprints=True, **run_options)
+        try:
+            write_baseline(args.write_baseline, _observed(results, timings, metrics, results_db))
+        except OSError as e:
+            parser.error(f"--write-baseline: could not write '{args.write_baseline}': {e}")
+        return
+
+    single_file = len(files) == 1
+    # Editors replace their buffer with what --fix prints for standard input, so errors go elsewhere
+    fix_to_stdout = sources is not None and args.fix and not args.diff
+    results = engine.run(files, fix=args.fix, diff=args.diff, fingerprints=baseline is not None, **run_options)
+    for result in _observed(results, timings, metrics, results_db):
+        if baseline is not None:
+            result = engine.apply_baseline(result, baseline)
+        if result.error and fix_to_stdout:
+            print(f"Error: could not process '{result.path}': {result.error}", file=sys.stderr)
+            return 1
+        elif result.error:
+            print(f"Error: could not process '{result.path}': {result.error}")
+        elif args.diff:
+            if result.diff:
+                print(result.diff, end='')
+        elif fix_to_stdout:
+            sys.stdout.write(result.fixed_source)
+        elif args.fix:
+            if result.changed:
+                passes = f"{result.passes} pass" if result.passes == 1 else f"{result.passes} passes"
+                print(f"Fixed and saved the file: {result.path} ({passes})")
+            else:
+                print(f"No changes needed: {result.path}")
+        elif result.messages:
+            print("Linting results:" if single_file else f"Linting results for {result.path}:")
+            for message in result.messages:
                 print(f"- {message}")
-        else:
+        elif single_file:
             print("No issues found.")
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
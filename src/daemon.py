@@ -0,0 +1,314 @@
+import json
+import os
+import socket
+import sys
+
+# Seconds without a request after which the daemon exits
+DEFAULT_IDLE_TIMEOUT = 900
+
+# How long a client waits for a daemon it started to accept connections
+START_TIMEOUT = 5.0
+
+# Seconds a connected client gets to send its request
+REQUEST_TIMEOUT = 10.0
+
+# Lint results kept in memory; the oldest are dropped first
+MAX_CACHED_RESULTS = 50000
+
+# Variables that supply option defaults; a request carries the client's values, as
+# the daemon's own environment is that of whichever client happened to start it
+CLIENT_ENVIRONMENT = ('JAY_LINT_SHARED_CACHE', 'JAY_LINT_RESULTS_DB')
+
+def _private_directory(path):
+    # Create path for this user alone, or check that an existing one still is
+    import stat
+
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"'{path}' is not a directory only this user can access")
+    return path
+
+def default_socket_path():
+    base = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    directory = _private_directory(os.path.join(base, f"jay_lint-{os.getuid()}"))
+    return os.path.join(directory, 'daemon.sock')
+
+def _send(connection, message):
+    # Protocol: the client sends one JSON line, {"argv": [...], "cwd": "...", "environ": {...}}
+    # (plus "stdin", base64, when linting "-") or {"stop": true}; the daemon streams {"out": text} and
+    # {"err": text} lines back and ends with {"exit": status}
+    connection.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+class ResultCache(dict):
+    # engine.run's result cache with a size cap, so a long-lived daemon doesn't grow forever
+    def __setitem__(self, key, value):
+        if key not in self and len(self) >= MAX_CACHED_RESULTS:
+            del self[next(iter(self))]
+        super().__setitem__(key, value)
+
+class _StreamWriter:
+    # Stands in for stdout/stderr during a request and forwards whole lines to the client
+    def __init__(self, connection, stream):
+        self.connection = connection
+        self.stream = stream
+        self.pending = ''
+
+    def write(self, text):
+        self.pending += text
+        if '\n' in self.pending:
+            lines, _, self.pending = self.pending.rpartition('\n')
+            _send(self.connection, {self.stream: lines + '\n'})
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            _send(self.connection, {self.stream: self.pending})
+            self.pending = ''
+
+class LintDaemon:
+    """
+    Serves one request at a time on a Unix socket until it has been idle for
+    idle_timeout seconds. Modules, compiled patterns and lint results stay loaded
+    between requests; results are reused for files whose size and mtime are unchanged.
+    """
+    def __init__(self, socket_path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.socket_path = socket_path or default_socket_path()
+        self.idle_timeout = idle_timeout
+        self.cache = ResultCache()
+        self.requests = 0
+        self._running = False
+
+    def serve(self):
+        """
+        Listen until idle or stopped. Returns False without serving when another
+        daemon already owns the socket.
+        """
+        import fcntl
+
+        # The lock is held for the daemon's lifetime, so racing auto-starts can't both bind.
+        # Never follow a planted symlink or truncate whatever the path names.
+        lock = os.open(self.socket_path + '.lock', os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(lock)
+            return False
+
+        try:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            # Only this user may connect: a request can rewrite files with --fix
+            old_umask = os.umask(0o077)
+            try:
+                server.bind(self.socket_path)
+            finally:
+                os.umask(old_umask)
+            server.listen()
+            server.settimeout(self.idle_timeout)
+
+            self._running = True
+            with server:
+                while self._running:
+                    try:
+                        connection, _ = server.accept()
+                    except socket.timeout:
+                        break
+                    with connection:
+                        self._handle(connection)
+        finally:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            os.close(lock)
+        return True
+
+    def _handle(self, connection):
+        connection.settimeout(REQUEST_TIMEOUT)
+        try:
+            with connection.makefile('rb') as reader:
+                request = json.loads(reader.readline() or b'null')
+        except (OSError, ValueError):
+            return
+        if not isinstance(request, dict):
+            return
+        connection.settimeout(None)
+
+        try:
+            if request.get('stop'):
+                self._running = False
+                _send(connection, {'exit': 0})
+            else:
+                _send(connection, {'exit': self._run(connection, request)})
+        except OSError:
+            # The client went away mid-run; nothing left to report to
+            pass
+
+    def _run(self, connection, request):
+        import base64
+        import traceback
+        from contextlib import redirect_stderr, redirect_stdout
+        from src.cli import main
+
+        self.requests += 1
+        out = _StreamWriter(connection, 'out')
+        err = _StreamWriter(connection, 'err')
+        previous_cwd = os.getcwd()
+        previous_environ = {name: os.environ.get(name) for name in CLIENT_ENVIRONMENT}
+        status = 0
+        try:
+            with redirect_stdout(out), redirect_stderr(err):
+                try:
+                    os.chdir(request.get('cwd') or previous_cwd)
+                    _set_environ(request.get('environ') or {})
+                    stdin = base64.b64decode(request['stdin']) if 'stdin' in request else b''
+                    status = main(request.get('argv', []), cache=self.cache, stdin=stdin) or 0
+                except SystemExit as e:
+                    status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                except Exception:
+                    traceback.print_exc()
+                    status = 1
+        finally:
+            os.chdir(previous_cwd)
+            _set_environ(previous_environ)
+        out.flush()
+        err.flush()
+        return status
+
+def _set_environ(values):
+    # Apply the client's CLIENT_ENVIRONMENT; a variable it doesn't send is unset
+    for name in CLIENT_ENVIRONMENT:
+        value = values.get(name)
+        if isinstance(value, str):
+            os.environ[name] = value
+        else:
+            os.environ.pop(name, None)
+
+def _connect(socket_path):
+    # Requests may carry file contents and ask for --fix, so only talk to our own daemon
+    try:
+        owner = os.stat(socket_path).st_uid
+    except FileNotFoundError:
+        return None
+    if owner != os.getuid():
+        raise PermissionError(f"'{socket_path}' belongs to another user")
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        client.close()
+        return None
+    return client
+
+def start_daemon(socket_path, idle_timeout=None):
+    """Start a detached daemon on socket_path and wait until it accepts connections."""
+    import subprocess
+    import time
+
+    command = [sys.executable, '-m', 'src.cli', 'daemon', '--socket', socket_path]
+    if idle_timeout is not None:
+        command += ['--idle-timeout', str(idle_timeout)]
+    # The daemon may be started from any directory, so make this checkout importable
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    subprocess.Popen(
+        command, env=env, cwd=root, start_new_session=True,
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        client = _connect(socket_path)
+        if client is not None:
+            return client
+        time.sleep(0.02)
+    return None
+
+def _relay(client, request):
+    # Send one run to the daemon and copy its output here. None means the daemon
+    # hung up before answering, e.g. because it was just shutting down.
+    answered = False
+    try:
+        _send(client, request)
+        with client.makefile('rb') as reader:
+            for line in reader:
+                message = json.loads(line)
+                answered = True
+                if 'out' in message:
+                    sys.stdout.write(message['out'])
+                elif 'err' in message:
+                    sys.stderr.write(message['err'])
+                elif 'exit' in message:
+                    sys.stdout.flush()
+                    return message['exit']
+    except OSError:
+        pass
+    if not answered:
+        return None
+    print("Error: the daemon closed the connection before finishing", file=sys.stderr)
+    return 1
+
+def run_client(argv, socket_path=None):
+    """
+    Forward a jays-linter command line to the daemon, starting one if none is
+    running, and relay its output. Falls back to running in this process when no
+    daemon can be reached. Returns the exit status.
+    """
+    socket_path = socket_path or default_socket_path()
+    environ = {name: os.environ[name] for name in CLIENT_ENVIRONMENT if name in os.environ}
+    request = {'argv': argv, 'cwd': os.getcwd(), 'environ': environ}
+    stdin = None
+    if '-' in argv:
+        import base64
+        stdin = sys.stdin.buffer.read()
+        request['stdin'] = base64.b64encode(stdin).decode('ascii')
+    for _ in range(2):
+        client = _connect(socket_path) or start_daemon(socket_path)
+        if client is None:
+            break
+        with client:
+            status = _relay(client, request)
+        if status is not None:
+            return status
+
+    from src.cli import main
+    return main(argv, stdin=stdin)
+
+def stop_daemon(socket_path=None):
+    """Ask a running daemon to exit. Returns True when one was running."""
+    client = _connect(socket_path or default_socket_path())
+    if client is None:
+        return False
+    with client:
+        try:
+            _send(client, {'stop': True})
+            with client.makefile('rb') as reader:
+                return bool(reader.readline())
+        except OSError:
+            return False
+
+def daemon_main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='jays-linter daemon', description='Serve jays-linter runs from a background process')
+    parser.add_argument('--socket', metavar='PATH', help="Unix socket to listen on (default: one per user in $XDG_RUNTIME_DIR or /tmp)")
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT, help="Exit after this many seconds without a request")
+    parser.add_argument('--stop', action='store_true', help="Stop the running daemon")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.stop:
+            if stop_daemon(args.socket):
+                print("Daemon stopped.")
+            else:
+                print("No daemon is running.")
+            return 0
+
+        if not LintDaemon(args.socket, args.idle_timeout).serve():
+            print("A daemon is already running on this socket.")
+    except OSError as e:
+        parser.error(str(e))
+    return 0
@@ -0,0 +1,71 @@
+import hashlib
+import os
+from collections import Counter
+
+from src.lexing.logic.source_io import write_source_file
+
+BASELINE_HEADER = '# jay_lint baseline v1'
+
+def normalize_path(path):
+    # Baselines are shared between machines, so store paths relative to the working directory
+    return os.path.relpath(path).replace(os.sep, '/')
+
+def fingerprint(diagnostic, path, source_lines):
+    """
+    Identify a finding by rule, file and the content of its line rather than the line
+    number, so findings survive unrelated edits that shift lines around.
+    """
+    content = ''
+    if 0 < diagnostic.line <= len(source_lines):
+        content = ' '.join(source_lines[diagnostic.line - 1].split())
+    digest = hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+    return f"{diagnostic.code}\t{normalize_path(path)}\t{digest}"
+
+class Baseline:
+    """
+    Known findings as a multiset of fingerprints. The file holds one
+    "code<TAB>path<TAB>hash<TAB>count" line per distinct fingerprint, sorted.
+    """
+    def __init__(self, counts=None):
+        self.counts = Counter(counts or {})
+
+    @classmethod
+    def load(cls, path):
+        # OSError when the file can't be read, ValueError when it isn't a baseline
+        counts = Counter()
+        with open(path, encoding='utf-8') as f:
+            for lineno, line in enumerate(f, start=1):
+                line = line.rstrip('\n')
+                if not line or line.startswith('#'):
+                    continue
+                key, _, count = line.rpartition('\t')
+                if not key or not count.isdigit():
+                    raise ValueError(f"{path}, line {lineno}: not a baseline entry")
+                counts[key] += int(count)
+        return cls(counts)
+
+    def save(self, path):
+        lines = [BASELINE_HEADER]
+        lines.extend(f"{key}\t{count}" for key, count in sorted(self.counts.items()))
+        write_source_file(path, '\n'.join(lines) + '\n')
+
+    def add(self, fingerprints):
+        self.counts.update(fingerprints)
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def filter_new(self, fingerprints):
+        """
+        Return the indexes of the fingerprints that are not covered by the baseline.
+        Each baseline entry absorbs as many findings as its count.
+        """
+        remaining = self.counts
+        used = Counter()
+        new = []
+        for i, key in enumerate(fingerprints):
+            if used[key] < remaining.get(key, 0):
+                used[key] += 1
+            else:
+                new.append(i)
+        return new
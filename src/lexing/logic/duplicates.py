@@ -0,0 +1,233 @@
+import ast
+import base64
+import os
+import zlib
+from array import array
+from collections import Counter
+from itertools import chain
+
+from src.lexing.logic.file_index import FileIndex
+from src.lexing.logic.source_io import read_source_file
+
+DEFAULT_INDEX_NAME = '.jay_lint_duplicates.json'
+
+# Tokens per k-gram, and k-grams per winnowing window: copies of at least
+# KGRAM + WINDOW - 1 tokens are always noticed
+KGRAM = 8
+WINDOW = 6
+
+# Functions with fewer normalized tokens are too small to be worth reporting as copies
+MIN_TOKENS = 40
+
+# Share of the larger function's fingerprints two functions must have in common
+SIMILARITY = 0.8
+
+# Fingerprints shared by more functions than this are boilerplate and not looked up
+MAX_BUCKET = 64
+
+_BASE = 1000003
+_MASK = (1 << 32) - 1
+
+# Token ids of node classes, and of constants by the type of their value
+_class_ids = {}
+_constant_ids = {}
+
+def _token_id(name):
+    # Stable across processes and runs, unlike hash() of a string
+    return zlib.crc32(name.encode('ascii'))
+
+def _class_id(cls):
+    token = _class_ids.get(cls)
+    if token is None:
+        token = _class_ids[cls] = _token_id(cls.__name__)
+    return token
+
+def _has_docstring(node):
+    first = node.body[0] if node.body else None
+    return isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str)
+
+def normalized_functions(tree):
+    """
+    One preorder pass over tree giving its nodes as token ids: node types, with every
+    identifier and constant replaced by its kind, so copies that only rename variables
+    or change literals give the same sequence. Returns the tokens and, for each function,
+    (node, start, end) such that tokens[start:end] is its body without the docstring;
+    a nested function's tokens are part of the enclosing function's too.
+    """
+    tokens = []
+    functions = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if type(node) is int:
+            # End of the body of functions[node]
+            function, start, _ = functions[node]
+            functions[node] = (function, start, len(tokens))
+            continue
+        if type(node) is list:
+            # Start of the body of a function: [node]
+            function = node[0]
+            start = len(tokens) + (2 if _has_docstring(function) else 0)
+            functions.append((function, start, None))
+            stack.append(len(functions) - 1)
+            stack.extend(reversed(function.body))
+            continue
+        cls = type(node)
+        if cls is ast.Constant:
+            kind = type(node.value)
+            token = _constant_ids.get(kind)
+            if token is None:
+                token = _constant_ids[kind] = _token_id(f"Constant:{kind.__name__}")
+            tokens.append(token)
+            continue
+        if issubclass(cls, ast.expr_context):
+            continue
+        tokens.append(_class_id(cls))
+        children = []
+        is_function = cls is ast.FunctionDef or cls is ast.AsyncFunctionDef
+        for field in cls._fields:
+            if is_function and field == 'body':
+                # Placeholder for the body, so its span is recorded around it
+                children.append([node])
+                continue
+            value = getattr(node, field, None)
+            if type(value) is list:
+                children.extend(item for item in value if isinstance(item, ast.AST))
+            elif isinstance(value, ast.AST):
+                children.append(value)
+        stack.extend(reversed(children))
+    return tokens, functions
+
+def kgram_hashes(tokens, k=KGRAM):
+    # Karp-Rabin rolling hashes, modulo 2**32, of every run of k consecutive tokens
+    if len(tokens) < k:
+        return []
+    drop = pow(_BASE, k - 1, 1 << 32)
+    value = 0
+    for token in tokens[:k]:
+        value = (value * _BASE + token) & _MASK
+    hashes = [value]
+    for i in range(k, len(tokens)):
+        value = ((value - tokens[i - k] * drop) * _BASE + tokens[i]) & _MASK
+        hashes.append(value)
+    return hashes
+
+def winnow(hashes, window=WINDOW):
+    """
+    The hashes winnowing selects: the smallest of every window of consecutive hashes,
+    the rightmost one on ties, each selected position counted once.
+    """
+    if len(hashes) <= window:
+        return {min(hashes)} if hashes else set()
+    selected = set()
+    last = -1
+    for start in range(len(hashes) - window + 1):
+        chunk = hashes[start:start + window]
+        smallest = min(chunk)
+        position = start + window - 1 - chunk[::-1].index(smallest)
+        if position != last:
+            selected.add(smallest)
+            last = position
+    return selected
+
+def _encode(fingerprints):
+    return base64.b64encode(array('I', sorted(fingerprints)).tobytes()).decode('ascii')
+
+def _decode(text):
+    fingerprints = array('I')
+    fingerprints.frombytes(base64.b64decode(text))
+    return fingerprints
+
+def summarize_functions(path):
+    """
+    [name, line, end line, fingerprints] for every function in path large enough to be compared,
+    nested functions and methods included; the fingerprints are packed for the index.
+    """
+    tokens, spans = normalized_functions(ast.parse(read_source_file(path)))
+    functions = []
+    for node, start, end in spans:
+        if end - start >= MIN_TOKENS:
+            fingerprints = _encode(winnow(kgram_hashes(tokens[start:end])))
+            functions.append([node.name, node.lineno, node.end_lineno, fingerprints])
+    return functions
+
+class DuplicateIndex(FileIndex):
+    """
+    Winnowed fingerprints of every function under root, kept on disk as a JSON index of
+    per-file entries. update() only re-reads files whose size or mtime changed. Lookups
+    go through an in-memory map from fingerprint to functions, so finding the copies of
+    a function costs time proportional to its own fingerprints, not to the tree's size.
+    """
+    default_name = DEFAULT_INDEX_NAME
+    # Summaries are [[name, line, end line, packed fingerprints], ...]
+    summarize = staticmethod(summarize_functions)
+
+    def __init__(self, root, index_path=None):
+        super().__init__(root, index_path)
+        self._functions = None
+        self._by_path = None
+        self._buckets = None
+
+    def _changed(self):
+        self._functions = self._by_path = self._buckets = None
+
+    def _build(self):
+        # (relative path, name, line, end line, fingerprints) per function, the indexes of each file's
+        # functions, and fingerprint -> indexes of the functions that have it
+        functions = []
+        by_path = {}
+        buckets = {}
+        for relative in sorted(self.files):
+            indexes = by_path[relative] = []
+            for name, line, end_line, packed in self.files[relative][2]:
+                fingerprints = _decode(packed)
+                index = len(functions)
+                indexes.append(index)
+                functions.append((relative, name, line, end_line, fingerprints))
+                for fingerprint in fingerprints:
+                    bucket = buckets.get(fingerprint)
+                    if bucket is None:
+                        buckets[fingerprint] = [index]
+                    else:
+                        bucket.append(index)
+        self._functions, self._by_path, self._buckets = functions, by_path, buckets
+
+    def duplicates(self, path):
+        """
+        [line, name, other path, other line, other name] for each function in path that
+        is a near copy of another function in the tree, the most similar one found.
+        """
+        relative = os.path.relpath(os.path.abspath(path), self.root)
+        if relative not in self.files:
+            return []
+        if self._buckets is None:
+            self._build()
+        functions, buckets = self._functions, self._buckets
+        found = []
+        for index in self._by_path[relative]:
+            _, name, line, end_line, fingerprints = functions[index]
+            # A bucket of one only holds the function itself
+            shared = Counter(chain.from_iterable(
+                bucket for bucket in map(buckets.__getitem__, fingerprints) if 1 < len(bucket) <= MAX_BUCKET
+            ))
+            shared.pop(index, None)
+            needed = SIMILARITY * len(fingerprints)
+            best = None
+            for other, count in shared.items():
+                if count < needed:
+                    continue
+                other_path, _, other_line, other_end_line, other_fingerprints = functions[other]
+                if other_path == relative and (line <= other_line <= end_line or other_line <= line <= other_end_line):
+                    # A function and one nested in it, whose body is most of the outer one's
+                    continue
+                score = count / max(len(fingerprints), len(other_fingerprints))
+                if score >= SIMILARITY and (best is None or score > best[0]):
+                    best = (score, other)
+            if best is not None:
+                other_path, other_name, other_line, _, _ = functions[best[1]]
+                found.append([line, name, other_path.replace(os.sep, '/'), other_line, other_name])
+        return found
+
+    def linter_options(self, path):
+        # Keyword arguments for JayLinter carrying the copies of path's functions
+        return {'duplicates': self.duplicates(path)}
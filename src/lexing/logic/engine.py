@@ -0,0 +1,343 @@
+import os
+import time
+
+from src.lexing.logic.lexing import JayLinter
+from src.lexing.logic.results import FileResult, decode_results, encode_results
+from src.lexing.logic.source_io import NOTEBOOK_SUFFIX, close_source, read_source_bytes, source_encoding, write_source_file
+
+# Most files sent to a worker at once; results stream back to the caller a batch at a time
+MAX_BATCH_SIZE = 256
+
+# New results are stored in the shared cache this many at a time
+SHARED_CACHE_BATCH = 256
+
+def _fingerprints(linter, path):
+    from src.lexing.logic.baseline import fingerprint
+    return [fingerprint(diagnostic, path, linter.source_lines) for diagnostic in linter.diagnostics]
+
+def _linter(source, linter_options):
+    # source is text, or an encoded buffer (bytes, bytearray, memoryview) that is decoded once
+    if isinstance(source, str):
+        return JayLinter(source, **(linter_options or {}))
+    return JayLinter.from_bytes(source, **(linter_options or {}))
+
+def lint_source(source, path, linter_options=None, fingerprints=False, rule_timings=None):
+    """
+    Lint source held in memory; path only names it in the result and its fingerprints.
+    rule_timings, a RuleTimings, collects how long each rule took.
+    """
+    try:
+        linter = _linter(source, linter_options)
+        linter.rule_timings = rule_timings
+        linter.lint()
+    except (SyntaxError, UnicodeDecodeError, ValueError) as e:
+        return FileResult(path, error=str(e))
+    if rule_timings is not None:
+        rule_timings.lines += len(linter.source_lines)
+    return FileResult(
+        path,
+        messages=linter.messages,
+        diagnostics=linter.diagnostics,
+        fingerprints=_fingerprints(linter, path) if fingerprints else (),
+    )
+
+def lint_file(path, linter_options=None, fingerprints=False, rule_timings=None):
+    try:
+        data = read_source_bytes(path)
+    except OSError as e:
+        return FileResult(path, error=str(e))
+    try:
+        if path.endswith(NOTEBOOK_SUFFIX):
+            return _lint_notebook(data, path, linter_options, fingerprints, rule_timings)
+        return lint_source(data, path, linter_options, fingerprints, rule_timings)
+    finally:
+        close_source(data)
+
+def _lint_notebook(data, path, linter_options, fingerprints, rule_timings):
+    # Large notebooks arrive memory-mapped and only their code cells are ever decoded
+    from src.lexing.logic.notebooks import lint_notebook, open_cell_cache
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return lint_notebook(data, path, linter_options, fingerprints, rule_timings, open_cell_cache())
+
+def fix_source(source, path, diff=False, linter_options=None):
+    """
+    Fix source held in memory without writing anything. The fixed text is returned in
+    fixed_source, and as a unified diff against the original as well when diff is set.
+    """
+    try:
+        linter = _linter(source, linter_options)
+        original = linter.source_code
+        passes = linter.fix()
+    except (SyntaxError, UnicodeDecodeError, ValueError) as e:
+        return FileResult(path, error=str(e))
+
+    fixed_code = linter.source_code
+    # Keep the file's trailing newline so already clean files compare equal
+    if original.endswith('\n') and not fixed_code.endswith('\n'):
+        fixed_code += '\n'
+    changed = fixed_code != original
+    result = FileResult(
+        path, messages=linter.messages, diagnostics=linter.diagnostics, changed=changed, passes=passes, fixed_source=fixed_code,
+    )
+
+    if diff:
+        import difflib
+        diff_text = ''.join(difflib.unified_diff(
+            original.splitlines(keepends=True),
+            fixed_code.splitlines(keepends=True),
+            fromfile=f"a/{path}",
+            tofile=f"b/{path}",
+        )) if changed else ''
+        result = result._replace(diff=diff_text)
+    return result
+
+def fix_file(path, diff=False, linter_options=None):
+    try:
+        data = read_source_bytes(path)
+    except OSError as e:
+        return FileResult(path, error=str(e))
+    try:
+        result = fix_source(data, path, diff, linter_options)
+        # Written back in the encoding it was read in, BOM included
+        encoding = source_encoding(data) if result.changed else None
+    finally:
+        close_source(data)
+    fixed_code = result.fixed_source
+    # Files are fixed in place, so workers don't ship the fixed text back
+    result = result._replace(fixed_source=None)
+    if diff or result.error:
+        return result
+
+    # Leave unchanged files alone so their mtime, and any build cache keyed on it, survives
+    if result.changed:
+        try:
+            write_source_file(path, fixed_code, encoding)
+        except (OSError, UnicodeEncodeError) as e:
+            return result._replace(changed=False, error=str(e))
+    return result
+
+def _run_one(task, rule_timings=None):
+    path, settings, linter_options, source = task
+    start = time.perf_counter()
+    if path.endswith(NOTEBOOK_SUFFIX):
+        # The fixer only rewrites Python files, so notebooks are linted even when fixing
+        if source is None:
+            result = lint_file(path, linter_options, settings['fingerprints'], rule_timings)
+        else:
+            result = _lint_notebook(source, path, linter_options, settings['fingerprints'], rule_timings)
+            if settings['fix'] and not result.error:
+                # Editors replace their buffer with the fixed source, which is the notebook as it was
+                result = result._replace(fixed_source=source if isinstance(source, str) else bytes(source).decode('utf-8'))
+    elif source is not None:
+        if settings['fix'] or settings['diff']:
+            result = fix_source(source, path, diff=settings['diff'], linter_options=linter_options)
+        else:
+            result = lint_source(source, path, linter_options, settings['fingerprints'], rule_timings)
+    elif settings['fix'] or settings['diff']:
+        result = fix_file(path, diff=settings['diff'], linter_options=linter_options)
+    else:
+        result = lint_file(path, linter_options, settings['fingerprints'], rule_timings)
+    return result._replace(elapsed=time.perf_counter() - start)
+
+def _cache_key(task):
+    # Lint results stay valid while the file's size and mtime and the run's settings are unchanged
+    path, settings, linter_options, source = task
+    if source is not None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # The path as given is part of the key because fingerprints embed it
+    return (os.path.abspath(path), path, stat.st_mtime_ns, stat.st_size, settings['fingerprints'], repr(linter_options))
+
+def _run_batch(batch):
+    # Runs in a worker: one packed bytes object per batch is much cheaper to send back
+    # than pickled FileResults, which repeat every rule code and message string. Rule
+    # timings, when collected, come back summed over the batch.
+    settings, items = batch
+    rule_timings = None
+    if settings['metrics']:
+        from src.lexing.logic.metrics import RuleTimings
+        rule_timings = RuleTimings()
+    results = [_run_one((path, settings, linter_options, source), rule_timings) for path, linter_options, source in items]
+    return encode_results(results), rule_timings
+
+def worker_count(jobs, file_count):
+    # Worker processes run() uses for file_count files when asked for jobs (0 or None: one per CPU)
+    jobs = jobs or os.cpu_count() or 1
+    return 1 if file_count <= 1 else min(jobs, file_count)
+
+def _task_size(task):
+    path, _, _, source = task
+    if source is not None:
+        return len(source)
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+def _run_tasks(tasks, jobs, history=None, metrics=None):
+    jobs = worker_count(jobs, len(tasks))
+    if jobs == 1:
+        rule_timings = metrics.rule_timings if metrics is not None else None
+        for task in tasks:
+            yield _run_one(task, rule_timings)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    from src.lexing.logic.scheduling import plan_batches
+
+    # Predict each file's cost from its size, or from how long it took last time
+    sizes = [_task_size(task) for task in tasks]
+    paths = [os.path.abspath(task[0]) for task in tasks]
+    if history is None:
+        costs = sizes
+    else:
+        rate = history.seconds_per_byte()
+        costs = [history.predict(path, size, rate) for path, size in zip(paths, sizes)]
+    batches = plan_batches(costs, jobs, MAX_BATCH_SIZE)
+    batch_of = {}
+    for number, batch in enumerate(batches):
+        for index in batch:
+            batch_of[index] = number
+
+    # Every task of a run shares its settings, so they are sent once per batch
+    settings = tasks[0][1]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Batches are queued most expensive first and idle workers take the next one,
+        # but results are still handed out in input order
+        futures = [
+            executor.submit(_run_batch, (settings, [(tasks[i][0], tasks[i][2], tasks[i][3]) for i in batch]))
+            for batch in batches
+        ]
+        done = {}
+        for index in range(len(tasks)):
+            if index not in done:
+                batch = batches[batch_of[index]]
+                encoded, rule_timings = futures[batch_of[index]].result()
+                if rule_timings is not None:
+                    metrics.rule_timings.merge(rule_timings)
+                done.update(zip(batch, decode_results(encoded)))
+            result = done.pop(index)
+            if history is not None and result.error is None:
+                history.record(paths[index], sizes[index], result.elapsed)
+            yield result
+
+def _content_keys(tasks):
+    # Shared cache keys of the tasks' content, None for files that can't be read
+    from src.lexing.logic.shared_cache import content_key
+    keys = []
+    for path, settings, linter_options, source in tasks:
+        if source is not None:
+            data = source.encode('utf-8') if isinstance(source, str) else source
+            keys.append(content_key(data, path, settings, linter_options))
+            continue
+        try:
+            data = read_source_bytes(path)
+        except OSError:
+            keys.append(None)
+            continue
+        try:
+            keys.append(content_key(data, path, settings, linter_options))
+        finally:
+            close_source(data)
+    return keys
+
+def _run_shared(tasks, jobs, history, shared_cache, metrics):
+    # Lint results looked up in one batch, and new ones stored in batches, in a shared cache
+    from src.lexing.logic.shared_cache import pack_result, unpack_result
+    keys = _content_keys(tasks)
+    stored = shared_cache.get_many([key for key in keys if key is not None])
+    cached = {}
+    for index, key in enumerate(keys):
+        if key in stored:
+            result = unpack_result(stored[key], tasks[index][0])
+            if result is not None:
+                cached[index] = result
+    shared_cache.hits += len(cached)
+    shared_cache.misses += len(tasks) - len(cached)
+    if metrics is not None:
+        metrics.cache_hits += len(cached)
+        metrics.cache_misses += len(tasks) - len(cached)
+
+    fresh = _run_tasks([task for index, task in enumerate(tasks) if index not in cached], jobs, history, metrics)
+    pending = {}
+    try:
+        for index, key in enumerate(keys):
+            if index in cached:
+                yield cached[index]
+                continue
+            result = next(fresh)
+            if key is not None and result.error is None:
+                pending[key] = pack_result(result)
+                if len(pending) >= SHARED_CACHE_BATCH:
+                    shared_cache.put_many(pending)
+                    pending = {}
+            yield result
+    finally:
+        if pending:
+            shared_cache.put_many(pending)
+
+def run(
+    paths, fix=False, diff=False, jobs=None, options=None, fingerprints=False, cache=None, sources=None, history=None,
+    shared_cache=None, metrics=None,
+):
+    """
+    Lint or fix every path, yielding a FileResult per file in input order.
+    Files are spread over a process pool unless jobs is 1 or there is a single file.
+    options optionally maps a path to extra JayLinter keyword arguments for that file,
+    and fingerprints asks lint results to carry baseline fingerprints. cache is an
+    optional dict that lint results are kept in between runs of a long-lived process;
+    files whose size and mtime did not change since are not read again. sources maps
+    paths whose content is already in memory, such as standard input, to that content;
+    they are never read or written, and fixing one returns the text in fixed_source.
+    history is a RuntimeHistory that parallel runs schedule by and record timings in.
+    shared_cache is a SharedCache backend that lint results are fetched from and stored
+    in by content, so other machines and later jobs can reuse them. metrics is a RunMetrics
+    that rule timings, linted lines and cache hits are counted in.
+    """
+    options = options or {}
+    sources = sources or {}
+    settings = {'fix': fix, 'diff': diff, 'fingerprints': fingerprints, 'metrics': metrics is not None}
+    tasks = [(path, settings, options.get(path), sources.get(path)) for path in paths]
+    if fix or diff or (cache is None and shared_cache is None):
+        yield from _run_tasks(tasks, jobs, history, metrics)
+        return
+    if cache is None:
+        yield from _run_shared(tasks, jobs, history, shared_cache, metrics)
+        return
+
+    keys = [_cache_key(task) for task in tasks]
+    hits = [key is not None and key in cache for key in keys]
+    misses = [task for task, hit in zip(tasks, hits) if not hit]
+    if shared_cache is None:
+        if metrics is not None:
+            metrics.cache_hits += len(tasks) - len(misses)
+            metrics.cache_misses += len(misses)
+        fresh = _run_tasks(misses, jobs, history, metrics)
+    else:
+        # Only results the daemon's cache lacks are looked up in the shared cache
+        if metrics is not None:
+            metrics.cache_hits += len(tasks) - len(misses)
+        fresh = _run_shared(misses, jobs, history, shared_cache, metrics)
+    for path, key, hit in zip(paths, keys, hits):
+        if hit:
+            yield cache[key]._replace(elapsed=0.0)
+            continue
+        result = next(fresh)
+        if key is not None and result.error is None:
+            cache[key] = result
+        yield result
+
+def apply_baseline(result, baseline):
+    # Drop the findings of a lint result that the baseline already knows about
+    if not result.fingerprints:
+        return result
+    keep = baseline.filter_new(result.fingerprints)
+    return result._replace(
+        messages=[result.messages[i] for i in keep],
+        diagnostics=[result.diagnostics[i] for i in keep],
+        fingerprints=[result.fingerprints[i] for i in keep],
+    )
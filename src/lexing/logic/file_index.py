@@ -0,0 +1,93 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.lexing.logic.source_io import iter_python_files, write_source_file
+
+def _summarize_task(task):
+    summarize, args = task
+    try:
+        return summarize(*args), None
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError) as e:
+        return None, str(e)
+
+class FileIndex:
+    """
+    Per-file summaries of every .py file under root, kept on disk as a JSON index.
+    update() only re-reads files whose size or mtime changed. Subclasses set version,
+    default_name and summarize, a staticmethod wrapping a module-level
+    function so worker processes can run it.
+    """
+    # Bump in a subclass when its summaries change so stale indexes are rebuilt instead of misread
+    version = 1
+    default_name = None
+    summarize = None
+
+    def __init__(self, root, index_path=None):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path or os.path.join(self.root, self.default_name)
+        # relative path -> [mtime_ns, size, summary]
+        self.files = {}
+        self.errors = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == self.version and data.get('root') == self.root:
+            self.files = data['files']
+
+    def save(self):
+        data = {'version': self.version, 'root': self.root, 'files': self.files}
+        write_source_file(self.index_path, json.dumps(data, separators=(',', ':'), sort_keys=True))
+
+    def _summarize_args(self, path):
+        return (path,)
+
+    def _changed(self):
+        # Called after update() changed the summaries, to drop anything built from them
+        pass
+
+    def update(self, jobs=None):
+        """
+        Summarize new and changed files, drop deleted ones and save the index.
+        Returns the number of files that had to be parsed.
+        """
+        stale = []
+        seen = set()
+        for path in iter_python_files([self.root]):
+            relative = os.path.relpath(path, self.root)
+            seen.add(relative)
+            stat = os.stat(path)
+            entry = self.files.get(relative)
+            if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                stale.append((path, relative, stat))
+
+        removed = set(self.files) - seen
+        for relative in removed:
+            del self.files[relative]
+            self.errors.pop(relative, None)
+
+        tasks = [(self.summarize, self._summarize_args(path)) for path, _, _ in stale]
+        jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+        if jobs <= 1:
+            results = list(map(_summarize_task, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_summarize_task, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+
+        for (summary, error), (_, relative, stat) in zip(results, stale):
+            if error is not None:
+                self.files.pop(relative, None)
+                self.errors[relative] = error
+                continue
+            self.errors.pop(relative, None)
+            self.files[relative] = [stat.st_mtime_ns, stat.st_size, summary]
+
+        if stale or removed:
+            self._changed()
+            self.save()
+        return len(stale)
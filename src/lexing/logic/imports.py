@@ -0,0 +1,64 @@
+import ast
+
+def import_blocks(tree, lines):
+    """
+    Runs of top-level import statements with only blank lines between them, as lists of
+    nodes. Imports in functions, classes or try blocks are never part of a block, and nor
+    are statements sharing a line with another one, so sorting a block moves nothing out
+    of its scope.
+    """
+    body = tree.body
+    blocks = []
+    block = []
+    for i, node in enumerate(body):
+        whole_lines = (
+            (i == 0 or body[i - 1].end_lineno < node.lineno)
+            and (i + 1 == len(body) or node.end_lineno < body[i + 1].lineno)
+        )
+        # A comment between two imports also ends the block, so it stays with the import below it
+        if (
+            not isinstance(node, (ast.Import, ast.ImportFrom)) or not whole_lines
+            or block and any(lines[j].strip() for j in range(block[-1].end_lineno, node.lineno - 1))
+        ):
+            if len(block) > 1:
+                blocks.append(block)
+            block = []
+        if isinstance(node, (ast.Import, ast.ImportFrom)) and whole_lines:
+            block.append(node)
+    if len(block) > 1:
+        blocks.append(block)
+    return blocks
+
+def ordered_block(block, lines, group):
+    # The block's lines with its statements sorted within their groups, and one blank line between groups
+    groups = {}
+    for node in block:
+        text = lines[node.lineno - 1:node.end_lineno]
+        groups.setdefault(group(node, text[0]), []).append(text)
+    ordered = []
+    for key in sorted(groups):
+        if ordered:
+            ordered.append('')
+        for text in sorted(groups[key]):
+            ordered.extend(text)
+    return ordered
+
+def reorder_import_blocks(tree, lines, group):
+    """
+    Sort every top-level import block of the source lines tree was parsed from. group(node,
+    first_line) gives the sort group of an import statement. Returns the new lines, or None
+    when every block is already in order, so sorted files are not rewritten.
+    """
+    edits = []
+    for block in import_blocks(tree, lines):
+        start, end = block[0].lineno - 1, block[-1].end_lineno
+        ordered = ordered_block(block, lines, group)
+        if ordered != lines[start:end]:
+            edits.append((start, end, ordered))
+    if not edits:
+        return None
+    lines = list(lines)
+    # From the bottom up, so the earlier blocks' line numbers still hold
+    for start, end, ordered in reversed(edits):
+        lines[start:end] = ordered
+    return lines
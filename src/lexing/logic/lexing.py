@@ -1,42 +1,311 @@
 import ast
-import tokenize
-from io import BytesIO
 import re
 import sys
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from functools import lru_cache
+from itertools import compress
+from time import perf_counter
+from token import COMMENT, NAME, NL, OP
+
+from src.lexing.logic.imports import reorder_import_blocks
+from src.lexing.logic.lines import BLANK, CLASS, DEF, IMPORT, LineTable, edited_lines, refresh_flags
+from src.lexing.logic.plugins import load_rules
+from src.lexing.logic.returns import ReturnRules
+from src.lexing.logic.source_io import decode_source
+from src.lexing.logic.suppressions import SuppressionIndex
+
+# Upper bound on lint/fix passes run by fix() before giving up on reaching a fixpoint
+MAX_FIX_PASSES = 10
+
+# Rule codes attached to every finding; these are the codes "# jay_lint: disable=" accepts
+RULES = {
+    'JL001': 'syntax-error',
+    'JL101': 'missing-function-comment',
+    'JL102': 'naming-convention',
+    'JL201': 'import-order',
+    'JL202': 'unused-import',
+    'JL203': 'unused-argument',
+    'JL204': 'unused-variable',
+    'JL205': 'unused-symbol',
+    'JL301': 'trailing-whitespace',
+    'JL302': 'empty-line',
+    'JL303': 'blank-line-layout',
+    'JL304': 'missing-final-newline',
+    'JL305': 'leading-blank-line',
+    'JL306': 'blank-line-before-return',
+    'JL307': 'line-too-long',
+    'JL601': 'duplicate-function',
+}
+
+# line is 0 for findings about the file as a whole
+Diagnostic = namedtuple('Diagnostic', ['code', 'line', 'message'])
+
+# Naming conventions the naming rule can enforce, as (pattern, description used in messages)
+NAMING_CONVENTIONS = {
+    'lower_camel_case': (r'^[a-z]+([A-Z][a-z0-9]*)*$', 'lower camel case'),
+    'upper_camel_case': (r'^[A-Z]([A-Z0-9]*[a-z][a-z0-9]*[A-Z]|[a-z0-9]*[A-Z][A-Z0-9]*[a-z])[A-Za-z0-9]*$', 'upper camel case'),
+    'snake_case': (r'^_{0,2}[a-z][a-z0-9_]*$', 'snake case'),
+}
+
+@lru_cache(maxsize=None)
+def naming_pattern(convention):
+    # Compiled on first use, and then once per process, so importing the module stays cheap
+    return re.compile(NAMING_CONVENTIONS[convention][0])
+
+# Convention used for each kind of definition unless overridden with naming_conventions
+DEFAULT_NAMING_CONVENTIONS = {
+    'function': 'lower_camel_case',
+    'async_function': 'lower_camel_case',
+    'method': 'lower_camel_case',
+    'class': 'upper_camel_case',
+}
+
+# How each kind of definition is named in messages
+NAMING_KIND_LABELS = {
+    'function': 'Method',
+    'async_function': 'Method',
+    'method': 'Method',
+    'class': 'Class',
+}
 
 class JayLinter(ast.NodeVisitor):
-    def __init__(self, source_code):
+    def __init__(
+        self, source_code, naming_conventions=None, exported_names=None, unused_symbols=None, select=None, duplicates=None,
+        recover=False,
+    ):
         self.source_code = source_code
         self.source_lines = source_code.splitlines()
-        self.tokens = list(tokenize.tokenize(BytesIO(source_code.encode('utf-8')).readline))
+        self._tokens = None
+        self._tokens_source = None
+        # (buffer, text decoded from it) when the linter was built with from_bytes
+        self._source_bytes = None
+        self._comment_lines = None
+        self._tree = None
+        self._tree_source = None
+        # With recover, a file that doesn't parse is linted statement by statement: the
+        # SyntaxError of the whole file, and the RecoveredModule it was linted from
+        self.recover = recover
+        self.syntax_error = None
+        self._recovered = None
+        self._line_table = None
+        # The source the symbol and usage tables were last filled in from
+        self._tables_source = None
+        self._suppressions = None
+        self._suppressions_source = None
+        self._fixing = False
+        self.fix_passes = 0
         self.messages = []
+        self.diagnostics = []
+        # Project-wide view supplied by ProjectIndex: names other modules import from this
+        # file, and top-level definitions nothing in the project uses
+        self.exported_names = set(exported_names or ())
+        self.unused_symbols = dict(unused_symbols or {})
+        # [line, name, other path, other line, other name] per function copied elsewhere in the tree
+        self.duplicates = list(duplicates or ())
+        self.naming_conventions = dict(DEFAULT_NAMING_CONVENTIONS)
+        for kind, convention in (naming_conventions or {}).items():
+            if kind not in DEFAULT_NAMING_CONVENTIONS:
+                raise ValueError(f"Unknown definition kind '{kind}' in naming_conventions.")
+            if convention is not None and convention not in NAMING_CONVENTIONS:
+                raise ValueError(f"Unknown naming convention '{convention}' for '{kind}'.")
+            self.naming_conventions[kind] = convention
+        # Plugin rules picked by code prefix, and those running in the current lint()
+        self.plugin_rules = load_rules(tuple(select)) if select else None
+        self._plugins = None
+        # A RuleTimings that lint() adds the time of every rule to, when metrics are collected
+        self.rule_timings = None
+        self._reset_tables()
+
+    @classmethod
+    def from_bytes(cls, data, encoding=None, **options):
+        """
+        Build a linter over encoded source in any buffer (bytes, bytearray, memoryview,
+        mmap). The encoding is taken from a BOM or PEP 263 cookie unless given. The
+        buffer is decoded once and tokenized as it is, without encoding the text back.
+        """
+        linter = cls(decode_source(data, encoding), **options)
+        linter._source_bytes = (data, linter.source_code)
+        return linter
+
+    def _reset_tables(self):
+        # Symbol and usage tables filled in by the visitor and the unused-code checks
         self.import_lines = []
         self.imported_names = set()
+        self.import_bindings = {}
         self.used_names = set()
         self.function_args = {}
+        self.function_lines = {}
         self.unused_imports = set()
         self.unused_variables = set()
         self.class_attributes = {}
         self.used_class_attributes = set()
         self.unused_variables_lines = []
         self.current_class = None
+        self._method_nodes = set()
+        self._function_nodes = []
+        self.returns = ReturnRules()
+        # Nodes whose code the last remove_unused_code() deleted
+        self.removed_nodes = []
+
+    @property
+    def tokens(self):
+        # Only the comment rule and the signature fixer need the token stream, so most fix passes never tokenize
+        if self._tokens is None or self._tokens_source is not self.source_code:
+            import tokenize
+            from io import BytesIO, StringIO
+            if self._source_bytes is not None and self._source_bytes[1] is self.source_code:
+                data = self._source_bytes[0]
+                if hasattr(data, 'readline'):
+                    # An mmap is read in place rather than copied into a BytesIO
+                    data.seek(0)
+                    readline = data.readline
+                else:
+                    readline = BytesIO(data).readline
+                self._tokens = list(tokenize.tokenize(readline))
+            else:
+                # Text, e.g. a fixer's output, is tokenized as text: encoding it again and letting
+                # tokenize decode it by the file's coding cookie would shift the token columns
+                self._tokens = list(tokenize.generate_tokens(StringIO(self.source_code).readline))
+            self._tokens_source = self.source_code
+            self._comment_lines = None
+        return self._tokens
+
+    def _parse(self):
+        # Share one tree between the visitor, the unused-code checks and the fixer
+        if self._tree is None or self._tree_source is not self.source_code:
+            try:
+                self._tree = ast.parse(self.source_code)
+                self.syntax_error = self._recovered = None
+            except SyntaxError as e:
+                if not self.recover:
+                    raise
+                self._recover(e)
+            self._tree_source = self.source_code
+        return self._tree
+
+    def _recover(self, error):
+        # The statements that parse on their own make up the tree, and the token stream is
+        # what the tokenizer got through, so every rule still runs on the rest of the file
+        from src.lexing.logic.recovery import recover_module
+        recovered = recover_module(self.source_lines)
+        self.syntax_error = error
+        self._recovered = recovered
+        self._tree = recovered.tree
+        self._tokens = recovered.tokens
+        self._tokens_source = self.source_code
+        self._comment_lines = None
+
+    @property
+    def line_table(self):
+        # Rebuilt whenever a fixer replaces source_lines
+        if self._line_table is None or self._line_table.lines is not self.source_lines:
+            self._line_table = LineTable(self.source_lines)
+        return self._line_table
+
+    @property
+    def suppressions(self):
+        # Only tokenize for suppressions when the source can contain a suppression comment
+        if self._suppressions is None or self._suppressions_source is not self.source_code:
+            tokens = self.tokens if 'jay_lint:' in self.source_code else []
+            self._suppressions = SuppressionIndex(tokens, len(self.source_lines))
+            self._suppressions_source = self.source_code
+        return self._suppressions
+
+    def _rule_enabled(self, *codes):
+        # False when every code is disabled for the whole file, so the rule need not run
+        suppressions = self.suppressions
+        return not all(suppressions.is_file_suppressed(code) for code in codes)
+
+    def report(self, code, lineno, message):
+        # Only codes some suppression comment names are looked up line by line
+        suppressions = self.suppressions
+        if suppressions.mentions(code) and suppressions.is_suppressed(code, lineno):
+            return
+        self.messages.append(message)
+        self.diagnostics.append(Diagnostic(code, lineno, message))
+
+    def report_many(self, findings):
+        # report() for many (code, line, message) findings; suppressions are only looked up
+        # line by line for codes the file has suppression comments for
+        suppressions = self.suppressions
+        mentioned = {}
+        messages, diagnostics = self.messages, self.diagnostics
+        for code, lineno, message in findings:
+            check = mentioned.get(code)
+            if check is None:
+                check = mentioned[code] = suppressions.mentions(code)
+            if check and suppressions.is_suppressed(code, lineno):
+                continue
+            messages.append(message)
+            diagnostics.append(Diagnostic(code, lineno, message))
+
+    def visit(self, node):
+        # Plugin rules see each node during the same traversal as the built-in rules
+        plugins = self._plugins
+        if plugins is not None:
+            for handler in plugins.node_handlers.get(node.__class__, ()):
+                handler(self, node)
+        return getattr(self, 'visit_' + node.__class__.__name__, self.generic_visit)(node)
 
     def _has_preceding_comment(self, func_lineno):
-        for token in self.tokens:
-            if token.start[0] == func_lineno - 1 and token.type == tokenize.COMMENT:
-                return True
-        return False
+        tokens = self.tokens
+        if self._comment_lines is None:
+            self._comment_lines = {token.start[0] for token in tokens if token.type == COMMENT}
+        return func_lineno - 1 in self._comment_lines
+
+    def _check_naming(self, node, kind):
+        if self._fixing or not self._rule_enabled('JL102'):
+            return
+        # Dunder names such as __init__ are dictated by the language, not by the author
+        if node.name.startswith('__') and node.name.endswith('__'):
+            return
+        if kind != 'class' and id(node) in self._method_nodes:
+            kind = 'method'
+        convention = self.naming_conventions[kind]
+        if convention is None:
+            return
+        description = NAMING_CONVENTIONS[convention][1]
+        if not naming_pattern(convention).match(node.name):
+            self.report('JL102', node.lineno, f"Line {node.lineno}: {NAMING_KIND_LABELS[kind]} '{node.name}' should use {description}.")
 
     def visit_FunctionDef(self, node):
-        if not self._has_preceding_comment(node.lineno):
-            self.messages.append(f"Function '{node.name}' lacks a preceding comment.")
+        if not self._fixing and self._rule_enabled('JL101') and not self._has_preceding_comment(node.lineno):
+            self.report('JL101', node.lineno, f"Function '{node.name}' lacks a preceding comment.")
+        self._check_naming(node, 'function')
         
-        arg_names = {arg.arg for arg in node.args.args}
-        self.function_args[node.name] = arg_names
+        self.function_args[node.name] = self._arg_names(node)
+        self.function_lines[node.name] = node.lineno
+        self._function_nodes.append(node)
         
         self.generic_visit(node)
 
+    @staticmethod
+    def _arg_names(node):
+        # Every parameter the def binds, including *args, **kwargs and keyword-only ones
+        args = node.args
+        names = {arg.arg for arg in args.posonlyargs + args.args + args.kwonlyargs}
+        names.update(arg.arg for arg in (args.vararg, args.kwarg) if arg is not None)
+        return names
+
+    def _removable_args(self, node):
+        # Unused parameters of node a fix may delete; a method's first one (self or cls) is
+        # always passed by the call, so it stays even when nothing reads it
+        unused = self._arg_names(node) - self.used_names
+        positional = node.args.posonlyargs + node.args.args
+        if unused and positional and id(node) in self._method_nodes:
+            unused.discard(positional[0].arg)
+        return unused
+
+    def visit_AsyncFunctionDef(self, node):
+        self._check_naming(node, 'async_function')
+        self.generic_visit(node)
+
     def visit_ClassDef(self, node):
+        self._check_naming(node, 'class')
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._method_nodes.add(id(child))
         self.current_class = node.name
         self.class_attributes[self.current_class] = set()
         self.generic_visit(node)
@@ -46,6 +315,7 @@ class JayLinter(ast.NodeVisitor):
         for alias in node.names:
             self.import_lines.append((alias.name, node.lineno))
             self.imported_names.add(alias.name)
+            self.import_bindings[alias.name] = alias.asname or alias.name.split('.')[0]
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node):
@@ -53,6 +323,7 @@ class JayLinter(ast.NodeVisitor):
             full_name = f"{node.module}.{alias.name}" if node.module else alias.name
             self.import_lines.append((full_name, node.lineno))
             self.imported_names.add(full_name)
+            self.import_bindings[full_name] = alias.asname or alias.name
         self.generic_visit(node)
 
     def visit_Name(self, node):
@@ -69,40 +340,71 @@ class JayLinter(ast.NodeVisitor):
         self.generic_visit(node)
 
     def visit_Return(self, node):
-        # Check for blank lines before return statements
-        return_lineno = node.lineno
-        if return_lineno > 1 and self.source_lines[return_lineno - 2].strip() == "":
-            self.messages.append(f"Line {return_lineno} has a blank line before 'return' statement.")
+        self.returns.add(node)
         self.generic_visit(node)
 
+    def check_blank_lines_before_return(self):
+        for code, lineno, message in self.returns.diagnostics(self.line_table):
+            self.report(code, lineno, message)
+
     def check_import_order(self):
         sorted_imports = sorted(self.import_lines, key=lambda x: x[0])
         if self.import_lines != sorted_imports:
-            self.messages.append("Imports are not in lexicographical order.")
+            self.report('JL201', self.import_lines[0][1], "Imports are not in lexicographical order.")
 
     def check_trailing_whitespace(self):
+        # A plain loop over the lines: the tests are too cheap for the line table to pay off
+        findings = []
         for i, line in enumerate(self.source_lines, start=1):
-            if line.rstrip() != line:
-                self.messages.append(f"Line {i} has trailing whitespace.")
-            if line == '' and i != 1:
-                self.messages.append(f"Line {i} is empty.")
+            if not line:
+                if i != 1:
+                    findings.append(('JL302', i, f"Line {i} is empty."))
+            elif line[-1].isspace():
+                findings.append(('JL301', i, f"Line {i} has trailing whitespace."))
+        self.report_many(findings)
 
     def check_unused_imports(self):
-        self.unused_imports = self.imported_names - self.used_names
-        for name in self.unused_imports:
+        # An import is used when the name it binds is read; imports re-exported to other
+        # modules, or listed in __all__, are used even if this file never reads them
+        used = self.used_names | self.exported_names | self._dunder_all()
+        self.unused_imports = {name for name in self.imported_names if self.import_bindings[name] not in used}
+        for name in sorted(self.unused_imports):
             lineno = next(line for (imp, line) in self.import_lines if imp == name)
-            self.messages.append(f"Import '{name}' on line {lineno} is not used.")
+            if self.suppressions.is_suppressed('JL202', lineno):
+                # A suppressed unused import is kept by the fixer as well
+                self.unused_imports.discard(name)
+                continue
+            self.report('JL202', lineno, f"Import '{name}' on line {lineno} is not used.")
+
+    def _dunder_all(self):
+        for node in self._parse().body:
+            if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == '__all__' for t in node.targets):
+                if isinstance(node.value, (ast.List, ast.Tuple)):
+                    return {elt.value for elt in node.value.elts if isinstance(elt, ast.Constant) and isinstance(elt.value, str)}
+        return set()
+
+    def check_unused_symbols(self):
+        for name, lineno in sorted(self.unused_symbols.items(), key=lambda item: item[1]):
+            self.report('JL205', lineno, f"'{name}' defined on line {lineno} is not used anywhere in the project.")
+
+    def check_duplicate_functions(self):
+        for lineno, name, other_path, other_line, other_name in self.duplicates:
+            self.report(
+                'JL601', lineno,
+                f"Function '{name}' on line {lineno} duplicates '{other_name}' in {other_path} on line {other_line}.",
+            )
 
     def check_unused_function_args(self):
         for func_name, args in self.function_args.items():
             unused_args = args - self.used_names
             for arg in unused_args:
-                self.messages.append(f"Function '{func_name}' has an unused argument '{arg}'.")
+                self.report('JL203', self.function_lines.get(func_name, 0), f"Function '{func_name}' has an unused argument '{arg}'.")
 
     def check_unused_variables(self):
-        tree = ast.parse(self.source_code)
+        tree = self._parse()
         assigned_names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)}
-        self.unused_variables = assigned_names - self.used_names
+        # Names other modules, or other notebook cells, read are used too
+        self.unused_variables = assigned_names - self.used_names - self.exported_names
         self.unused_variables_lines = []  # Ensure it's a list
 
         for node in ast.walk(tree):
@@ -110,99 +412,87 @@ class JayLinter(ast.NodeVisitor):
                 for target in node.targets:
                     if isinstance(target, ast.Name) and target.id in self.unused_variables:
                         lineno = node.lineno
-                        self.messages.append(f"Variable '{target.id}' assigned on line {lineno} is not used.")
+                        if self.suppressions.is_suppressed('JL204', lineno):
+                            continue
+                        self.report('JL204', lineno, f"Variable '{target.id}' assigned on line {lineno} is not used.")
                         self.unused_variables_lines.append(lineno-1)
 
     def check_empty_lines(self):
         previous_line_empty = False
         previous_line_was_import = False
         previous_line_was_function = False
+        flags = self.line_table.flags
+        findings = []
 
-        for i, line in enumerate(self.source_lines, start=1):
-            stripped_line = line.strip()
-            if stripped_line == '':
+        for i, line_flags in enumerate(flags, start=1):
+            if line_flags & BLANK:
                 previous_line_empty = True
                 continue
 
             if previous_line_empty:
                 previous_line_empty = False
-                if previous_line_was_import and not stripped_line.startswith(('import ', 'from ')):
+                if previous_line_was_import and not line_flags & IMPORT:
                     previous_line_was_import = False
                     continue
 
-                if previous_line_was_function and not stripped_line.startswith('def '):
+                if previous_line_was_function and not line_flags & DEF:
                     previous_line_was_function = False
                     continue
 
-                self.messages.append(f"Line {i} should be empty.")
+                findings.append(('JL303', i, f"Line {i} should be empty."))
             else:
-                if stripped_line.startswith(('import ', 'from ')):
+                if line_flags & IMPORT:
                     previous_line_was_import = True
-                elif stripped_line.startswith('def '):
+                elif line_flags & DEF:
                     if previous_line_was_function:
-                        self.messages.append(f"Line {i-1} should be empty between functions.")
+                        findings.append(('JL303', i - 1, f"Line {i-1} should be empty between functions."))
                     previous_line_was_function = True
                 elif not previous_line_was_function and not previous_line_was_import:
-                    self.messages.append(f"Line {i} should be empty.")
+                    findings.append(('JL303', i, f"Line {i} should be empty."))
+        self.report_many(findings)
 
         # Check if the last line is not empty
-        if self.source_lines and self.source_lines[-1].strip() != '':
-            self.messages.append("File should end with an empty line.")
+        if flags and not flags[-1] & BLANK:
+            self.report('JL304', len(flags), "File should end with an empty line.")
 
     def check_first_line_empty(self):
         if not self.source_lines:
             return
-        if self.source_lines[0].strip() == '':
-            self.messages.append("The first line is empty.")
+        if self.line_table.is_blank(0):
+            self.report('JL305', 1, "The first line is empty.")
     
-    def check_case_conventions(self):
-        lower_camel_case_pattern = re.compile(r'^[a-z]+([A-Z][a-z0-9]*)*$')
-        upper_camel_case_pattern = re.compile(r'^[A-Z]([A-Z0-9]*[a-z][a-z0-9]*[A-Z]|[a-z0-9]*[A-Z][A-Z0-9]*[a-z])[A-Za-z0-9]*$')
-
-        def is_lower_camel_case(name):
-            return bool(lower_camel_case_pattern.match(name))
-
-        def is_upper_camel_case(name):
-            return bool(upper_camel_case_pattern.match(name))
-
-        for i, line in enumerate(self.source_lines, start=1):
-            stripped_line = line.strip()
-            if stripped_line.startswith('def '):
-                method_name = stripped_line.split()[1].split('(')[0]
-                if not is_lower_camel_case(method_name):
-                    self.messages.append(f"Line {i}: Method '{method_name}' should use lower camel case.")
-
-            if stripped_line.startswith('class '):
-                class_name = stripped_line.split()[1].split('(')[0]
-                if not is_upper_camel_case(class_name):
-                    self.messages.append(f"Line {i}: Class '{class_name}' should use upper camel case.")
-        
     def check_line_length(self):
         max_length = 100
-        for i, line in enumerate(self.source_lines, start=1):
-            if len(line) > max_length:
-                self.messages.append(f"Line {i} exceeds the maximum line length of {max_length} characters.")
+        self.report_many(
+            ('JL307', i, f"Line {i} exceeds the maximum line length of {max_length} characters.")
+            for i, line in enumerate(self.source_lines, start=1) if len(line) > max_length
+        )
 
     def remove_unused_code(self):
-        updated_lines = self.source_lines.copy()
-        tree = ast.parse(self.source_code)
+        # Lines are split from source_code so they line up with the tree and the tokens;
+        # lines to delete are collected in dropped and removed after the tree-driven edits.
+        # flags is kept up to date with every edit, so the line table is never rebuilt, and
+        # the nodes whose code is deleted are kept in removed_nodes for fix().
+        if self._tables_source is not None and self._tables_source is not self.source_code:
+            # The tables describe an earlier source, e.g. fix() stopped without analyzing its result
+            self._analyze()
+        original_lines = self.source_lines
+        table = self.line_table
+        if "\n".join(original_lines) != self.source_code:
+            original_lines = self.source_code.splitlines()
+            table = LineTable(original_lines)
+        updated_lines = list(original_lines)
+        flags = bytearray(table.flags)
+        tree = self._parse()
+        dropped = set()
+        removed = self.removed_nodes = []
+        self.remove_unused_args(tree, updated_lines, dropped, removed)
 
         # Detect if a class is present
         contains_class = any(isinstance(node, ast.ClassDef) for node in ast.walk(tree))
 
         if contains_class:
             # Handle self attributes separately if a class is present
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    function_line = updated_lines[node.lineno - 1]
-                    unused_args = set(self.function_args.get(node.name, [])) - self.used_names
-                    if unused_args:
-                        for arg in unused_args:
-                            function_line = re.sub(r'\b' + re.escape(arg) + r'\b\s*,?\s*', '', function_line)
-                        function_line = re.sub(r',\s*\)', ')', function_line)  # Remove trailing commas
-                        function_line = re.sub(r'\(\s*,', '(', function_line)  # Remove leading commas
-                        updated_lines[node.lineno - 1] = function_line
-
             # Remove assignments of unused self attributes
             for class_name, attrs in self.class_attributes.items():
                 unused_attrs = attrs - self.used_class_attributes
@@ -211,82 +501,218 @@ class JayLinter(ast.NodeVisitor):
                         for target in node.targets:
                             if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id == 'self' and target.attr in unused_attrs:
                                 updated_lines[node.lineno - 1] = ''
-
-            # Remove extra blank lines around removed lines
-            updated_lines = self.remove_extra_blank_lines(updated_lines)
+                                removed.append(node)
 
         else:
             # Normal procedure for removing unused function arguments and variables
             for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    function_line = updated_lines[node.lineno - 1]
-                    unused_args = set(self.function_args.get(node.name, [])) - self.used_names
-                    if unused_args:
-                        for arg in unused_args:
-                            function_line = re.sub(r'\b' + re.escape(arg) + r'\b\s*,?\s*', '', function_line)
-                        function_line = re.sub(r',\s*\)', ')', function_line)  # Remove trailing commas
-                        function_line = re.sub(r'\(\s*,', '(', function_line)  # Remove leading commas
-                        updated_lines[node.lineno - 1] = function_line
-
                 # Remove assignments of unused variables
                 if isinstance(node, ast.Assign):
                     assigned_vars = {target.id for target in node.targets if isinstance(target, ast.Name)}
-                    if assigned_vars.issubset(self.unused_variables):
+                    if assigned_vars.issubset(self.unused_variables) and not self.suppressions.is_suppressed('JL204', node.lineno):
                         updated_lines[node.lineno - 1] = ''
+                        removed.append(node)
                         # Remove blank line if it exists after removing unused variable
                         if node.lineno < len(updated_lines) - 1 and updated_lines[node.lineno].strip() == '':
-                            del updated_lines[node.lineno]
-                        # Ensure the next line isn't left blank
-                        elif node.lineno < len(updated_lines) - 1 and updated_lines[node.lineno] == '':
-                            del updated_lines[node.lineno]
+                            dropped.add(node.lineno)
 
             # Remove usages of unused variables in return statements
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Return):
-                    new_return_line = updated_lines[node.lineno - 1]
-                    for var in self.unused_variables:
-                        new_return_line = re.sub(r'\b' + re.escape(var) + r'\b\s*\+\s*', '', new_return_line)
-                        new_return_line = re.sub(r'\s*\+\s*' + re.escape(var) + r'\b', '', new_return_line)
-                    updated_lines[node.lineno - 1] = new_return_line
+            self.returns.remove_unused_variables(updated_lines, self.unused_variables)
+
+        # Blank lines above return statements go along with the other deleted lines
+        self.returns.drop_blank_lines_before(updated_lines, dropped)
+        refresh_flags(flags, updated_lines, edited_lines(original_lines, updated_lines))
+        updated_lines, flags = self._drop_lines(updated_lines, dropped, flags)
+        if contains_class:
+            # Remove extra blank lines around removed lines
+            updated_lines, flags = self._remove_extra_blank_lines(updated_lines, flags)
 
         # Remove lines with unused imports
         for i, line in enumerate(updated_lines):
-            if line.strip().startswith(('import ', 'from ')):
+            if flags[i] & IMPORT:
                 parts = line.split()
                 if len(parts) < 2:
                     continue  # Skip lines that don't match expected format
                 if parts[0] == 'import':
                     import_name = parts[1]
                 elif parts[0] == 'from' and len(parts) >= 4:
-                    import_name = f"{parts[1]}.{parts[3]}"
+                    # Relative imports are recorded without their leading dots
+                    module = parts[1].lstrip('.')
+                    import_name = f"{module}.{parts[3]}" if module else parts[3]
                 else:
                     continue  # Skip lines that don't match expected format
                 
                 if import_name in self.unused_imports:
                     updated_lines[i] = ''  # Remove the entire line
+                    flags[i] = BLANK
 
         # Apply formatting for blank lines
-        formatted_lines = self.ensure_blank_lines_between_functions(updated_lines)
-
-        # Remove blank lines before return statements
-        formatted_lines = self.remove_blank_lines_before_return(formatted_lines)
-
-        formatted_lines = self.remove_extra_blank_lines(formatted_lines)
+        formatted_lines, flags = self._ensure_blank_lines_between_functions(updated_lines, flags)
+        formatted_lines, flags = self._remove_extra_blank_lines(formatted_lines, flags)
+        formatted_lines, flags = self._separate_imports(formatted_lines, flags)
 
         self.source_lines = formatted_lines
-        self.source_code = "\n".join(self.source_lines).strip()
+        joined = "\n".join(self.source_lines)
+        self.source_code = joined.strip()
+        if len(self.source_code) == len(joined):
+            # Nothing was stripped, so the flags still describe the lines of the new source
+            self._line_table = LineTable.from_flags(formatted_lines, flags)
         self.reorder_imports()
         
         return self.source_code
 
+    def remove_unused_args(self, tree, lines, dropped, removed=None):
+        """
+        Delete unused parameters from every def signature in lines, using token positions
+        so multi-line signatures, annotations, defaults, *args, **kwargs and keyword-only
+        parameters are cut exactly. Lines a signature no longer needs are added to dropped,
+        and the deleted annotations and defaults to removed when it is given.
+        """
+        starts = None
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.FunctionDef):
+                continue
+            unused_args = self._removable_args(node)
+            if not unused_args or self.suppressions.is_suppressed('JL203', node.lineno):
+                continue
+            if starts is None:
+                starts = [token.start for token in self.tokens]
+            self._delete_spans(lines, self._signature_spans(node, unused_args, starts), dropped)
+            if removed is not None:
+                removed.extend(self._arg_expressions(node, unused_args))
+
+    @staticmethod
+    def _arg_expressions(node, names):
+        # The annotations and defaults of the parameters of node named in names
+        args = node.args
+        positional = args.posonlyargs + args.args
+        defaults = dict(zip([arg.arg for arg in positional[len(positional) - len(args.defaults):]], args.defaults))
+        defaults.update((arg.arg, default) for arg, default in zip(args.kwonlyargs, args.kw_defaults) if default is not None)
+        expressions = [defaults[name] for name in names if name in defaults]
+        for arg in positional + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None and arg.arg in names and arg.annotation is not None:
+                expressions.append(arg.annotation)
+        return expressions
+
+    def _signature_items(self, node, starts):
+        # The def's parentheses and its parameters as (kind, name token, start, end), where
+        # kind is 'name', '*' or '**' for a named parameter and '/' or 'star' for a bare marker
+        tokens = self.tokens
+        i = bisect_left(starts, (node.lineno, 0))
+        while not (tokens[i].type == OP and tokens[i].string == '('):
+            i += 1
+        open_paren = tokens[i]
+
+        groups, current, depth = [], [], 0
+        for i in range(i + 1, len(tokens)):
+            token = tokens[i]
+            if token.type == OP:
+                if token.string in ('(', '[', '{'):
+                    depth += 1
+                elif token.string in (')', ']', '}'):
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif token.string == ',' and depth == 0:
+                    groups.append(current)
+                    current = []
+                    continue
+            if token.type not in (NL, COMMENT):
+                current.append(token)
+        if current:
+            groups.append(current)
+        close_paren = tokens[i]
+
+        items = []
+        for group in groups:
+            first = group[0]
+            if first.type == OP and first.string in ('*', '**', '/'):
+                if len(group) > 1 and group[1].type == NAME:
+                    items.append((first.string, group[1], first.start, group[-1].end))
+                else:
+                    items.append(('star' if first.string == '*' else '/', None, first.start, group[-1].end))
+            else:
+                items.append(('name', first, first.start, group[-1].end))
+        return open_paren, close_paren, items
+
+    def _signature_spans(self, node, unused_args, starts):
+        # (start, end) token positions to delete so the signature loses unused_args
+        open_paren, close_paren, items = self._signature_items(node, starts)
+        removed = [name is not None and name.string in unused_args for _, name, _, _ in items]
+        spans = []
+
+        # Keyword-only parameters still need a * in front of them once *args is gone,
+        # and a bare * or / with nothing left to mark has to go
+        star = next((i for i, item in enumerate(items) if item[0] in ('*', 'star')), None)
+        if star is not None:
+            keyword_only = any(not removed[j] and items[j][0] == 'name' for j in range(star + 1, len(items)))
+            kind, name, _, end = items[star]
+            if kind == 'star':
+                removed[star] = not keyword_only
+            elif removed[star] and keyword_only:
+                removed[star] = False
+                spans.append((name.start, end))
+        for i, (kind, _, _, _) in enumerate(items):
+            if kind == '/':
+                removed[i] = all(removed[:i])
+
+        kept = [i for i in range(len(items)) if not removed[i]]
+        if not kept:
+            return [(open_paren.end, close_paren.start)]
+        last_kept = kept[-1]
+        for i in range(last_kept):
+            if removed[i]:
+                spans.append((items[i][2], items[i + 1][2]))
+        if last_kept < len(items) - 1:
+            # Cut a trailing run from the end of the last kept parameter, before its comma
+            spans.append((items[last_kept][3], items[-1][3]))
+        return spans
+
+    @staticmethod
+    def _delete_spans(lines, spans, dropped):
+        # Delete disjoint (line, col) spans from lines, blanking lines the text no longer
+        # reaches instead of removing them so later line numbers stay valid
+        if not spans:
+            return
+        first = min(start[0] for start, _ in spans)
+        last = max(end[0] for _, end in spans)
+        offsets = [0]
+        for line in lines[first - 1:last - 1]:
+            offsets.append(offsets[-1] + len(line) + 1)
+        text = '\n'.join(lines[first - 1:last])
+        for start, end in sorted(spans, reverse=True):
+            text = text[:offsets[start[0] - first] + start[1]] + text[offsets[end[0] - first] + end[1]:]
+        new_lines = text.split('\n')
+        lines[first - 1:first - 1 + len(new_lines)] = new_lines
+        for index in range(first - 1 + len(new_lines), last):
+            lines[index] = ''
+            dropped.add(index)
+
+    def _drop_lines(self, lines, dropped, flags):
+        # Remove the dropped line indexes from lines and their flags, keeping
+        # unused_variables_lines pointing at the same lines
+        if not dropped:
+            return lines, flags
+        order = sorted(dropped)
+        self.unused_variables_lines = [i - bisect_left(order, i) for i in self.unused_variables_lines if i not in dropped]
+        kept = [i not in dropped for i in range(len(lines))]
+        return list(compress(lines, kept)), bytearray(compress(flags, kept))
+
     def remove_extra_blank_lines(self, lines):
+        return self._remove_extra_blank_lines(lines, LineTable(lines).flags)[0]
+
+    def _remove_extra_blank_lines(self, lines, flags):
+        # The lines without extra blank lines, and their flags
         result = []
+        result_flags = []
+        origins = []
         skip_next = False
         unused_variable_lines_set = set(self.unused_variables_lines)
 
         for i, line in enumerate(lines):
-            if line.strip() == "":
-                if skip_next or i == 0 or i == len(lines) - 1 or (i + 1 < len(lines) and lines[i + 1].strip() == ""):
+            line_flags = flags[i]
+            if line_flags & BLANK:
+                if skip_next or i == 0 or i == len(lines) - 1 or (i + 1 < len(lines) and flags[i + 1] & BLANK):
                     continue
                 if i in unused_variable_lines_set:
                     continue
@@ -294,42 +720,101 @@ class JayLinter(ast.NodeVisitor):
             else:
                 skip_next = False
             result.append(line)
+            result_flags.append(line_flags)
+            origins.append(i)
             
             # Remove any blank lines after the line with the unused variable
             if i + 1 in unused_variable_lines_set:
-                while result and result[-1].strip() == "":
+                while result and result_flags[-1] & BLANK:
                     result.pop()
+                    result_flags.pop()
+                    origins.pop()
 
         # Remove leading and trailing blank lines
-        while result and result[0].strip() == "":
-            result.pop(0)
-        while result and result[-1].strip() == "":
+        start = 0
+        while start < len(result) and result_flags[start] & BLANK:
+            start += 1
+        while len(result) > start and result_flags[-1] & BLANK:
             result.pop()
+            result_flags.pop()
 
-        return result
+        self._follow_lines(origins[start:len(result)])
+        return result[start:], bytearray(result_flags[start:])
+
+    def _separate_imports(self, lines, flags):
+        # The lines with two blank lines between a top-level import and a definition right
+        # below it, rather than the one every definition gets, and their flags
+        before = [
+            i for i in range(2, len(lines))
+            if flags[i] & (DEF | CLASS) and flags[i - 1] & BLANK and flags[i - 2] & IMPORT
+            and not lines[i - 2][:1].isspace()
+        ]
+        if not before:
+            return lines, flags
+        result = []
+        result_flags = bytearray()
+        origins = []
+        start = 0
+        for i in before:
+            result.extend(lines[start:i])
+            result_flags.extend(flags[start:i])
+            origins.extend(range(start, i))
+            result.append('')
+            result_flags.append(BLANK)
+            origins.append(None)
+            start = i
+        result.extend(lines[start:])
+        result_flags.extend(flags[start:])
+        origins.extend(range(start, len(lines)))
+        self._follow_lines(origins)
+        return result, result_flags
+
+    def _follow_lines(self, origins):
+        # Point unused_variables_lines at the lines they moved to, given the index in the
+        # input of every output line (None for inserted lines)
+        marked = set(self.unused_variables_lines)
+        if marked:
+            self.unused_variables_lines = [i for i, origin in enumerate(origins) if origin in marked]
 
     def ensure_blank_lines_between_functions(self, lines):
+        return self._ensure_blank_lines_between_functions(lines, LineTable(lines).flags)[0]
+
+    def _ensure_blank_lines_between_functions(self, lines, flags):
+        # The lines with one blank line before each function and class, and their flags
         formatted_lines = []
+        formatted_flags = []
+        origins = []
         last_line_was_import = False
         last_line_was_func_or_class = False
 
         for i, line in enumerate(lines):
-            stripped_line = line.strip()
+            line_flags = flags[i]
 
-            if stripped_line == "":
-                if last_line_was_import or last_line_was_func_or_class:
-                    # Avoid appending too many blank lines after imports or functions
+            if line_flags & BLANK:
+                if last_line_was_func_or_class:
+                    # Avoid appending too many blank lines after functions
+                    continue
+                if last_line_was_import:
+                    # Keep one blank line after imports, e.g. between import groups
+                    if not formatted_flags[-1] & BLANK:
+                        formatted_lines.append(line)
+                        formatted_flags.append(line_flags)
+                        origins.append(i)
                     continue
 
-            if stripped_line.startswith(('def ', 'class ')):
-                if last_line_was_import or (formatted_lines and formatted_lines[-1].strip() != ""):
+            if line_flags & (DEF | CLASS):
+                if last_line_was_import or (formatted_lines and not formatted_flags[-1] & BLANK):
                     # Ensure exactly one blank line before functions
-                    if formatted_lines and formatted_lines[-1].strip() == "":
+                    if formatted_lines and formatted_flags[-1] & BLANK:
                         formatted_lines.pop()
+                        formatted_flags.pop()
+                        origins.pop()
                     formatted_lines.append("")
+                    formatted_flags.append(BLANK)
+                    origins.append(None)
                 last_line_was_func_or_class = True
                 last_line_was_import = False
-            elif stripped_line.startswith(('import ', 'from ')):
+            elif line_flags & IMPORT:
                 last_line_was_import = True
                 last_line_was_func_or_class = False
             else:
@@ -337,46 +822,54 @@ class JayLinter(ast.NodeVisitor):
                 last_line_was_import = False
 
             formatted_lines.append(line)
+            formatted_flags.append(line_flags)
+            origins.append(i)
 
         # Remove any leading or trailing blank lines
-        while formatted_lines and formatted_lines[0].strip() == "":
-            formatted_lines.pop(0)
-        while formatted_lines and formatted_lines[-1].strip() == "":
+        start = 0
+        while start < len(formatted_lines) and formatted_flags[start] & BLANK:
+            start += 1
+        while len(formatted_lines) > start and formatted_flags[-1] & BLANK:
             formatted_lines.pop()
+            formatted_flags.pop()
 
-        return formatted_lines
+        self._follow_lines(origins[start:len(formatted_lines)])
+        return formatted_lines[start:], bytearray(formatted_flags[start:])
 
     def reorder_imports(self):
-        stdlib_imports, third_party_imports, local_imports = [], [], []
-        for line in self.source_lines:
-            if line.startswith(('import ', 'from ')):
-                if self.is_standard_library_import(line):
-                    stdlib_imports.append(line)
-                elif self.is_third_party_import(line):
-                    third_party_imports.append(line)
-                else:
-                    local_imports.append(line)
-
-        ordered_imports = (
-            sorted(stdlib_imports) +
-            ([""] if stdlib_imports and third_party_imports else []) +
-            sorted(third_party_imports) +
-            ([""] if third_party_imports and local_imports else []) +
-            sorted(local_imports)
-        )
-
-        non_import_lines = [line for line in self.source_lines if not line.strip().startswith(('import ', 'from '))]
-        
-        self.source_lines = ordered_imports + [''] + non_import_lines
-        self.source_code = "\n".join(self.source_lines).strip()
+        # Sort each top-level block of consecutive imports where it stands; imports elsewhere,
+        # e.g. in functions or try blocks, are never moved, and sorted files are not rewritten
+        if 'import' not in self.source_code:
+            return self.source_code
+        try:
+            tree = self._parse()
+        except SyntaxError:
+            return self.source_code
+        lines = self.source_code.splitlines()
+        reordered = reorder_import_blocks(tree, lines, self.import_group)
+        if reordered is not None:
+            self.source_lines = reordered
+            self.source_code = "\n".join(reordered)
         return self.source_code
 
+    def import_group(self, node, import_line):
+        # Sort group of a top-level import: __future__, standard library, third party, local
+        if isinstance(node, ast.ImportFrom):
+            if node.module == '__future__':
+                return 0
+            if node.level:
+                return 3
+        if self.is_standard_library_import(import_line):
+            return 1
+        if self.is_local_import(import_line):
+            return 3
+        return 2
+
     def is_standard_library_import(self, import_line):
-        stdlib_module_names = set(sys.stdlib_module_names)
-        for module in stdlib_module_names:
-            if import_line.startswith(f'import {module}') or import_line.startswith(f'from {module}'):
-                return True
-        return False
+        parts = import_line.split()
+        if len(parts) < 2 or parts[0] not in ('import', 'from'):
+            return False
+        return parts[1].rstrip(',').split('.')[0] in sys.stdlib_module_names
 
     def is_third_party_import(self, import_line):
         return not self.is_standard_library_import(import_line) and not self.is_local_import(import_line)
@@ -384,33 +877,164 @@ class JayLinter(ast.NodeVisitor):
     def is_local_import(self, import_line):
         return 'local_module' in import_line  # Assuming 'local_module' is a placeholder for actual local module names
 
+    def check_syntax_errors(self):
+        # The statements recover mode couldn't parse; the rest of the file was linted without them
+        if self._recovered is None:
+            return
+        errors = self._recovered.errors or [(self.syntax_error.lineno or 1, self.syntax_error.msg)]
+        for lineno, message in errors:
+            ending = '' if message.endswith(('.', '?')) else '.'
+            self.report('JL001', lineno, f"Line {lineno} has a syntax error: {message}{ending}")
+
+    def check_plugin_lines(self, plugins):
+        handlers = plugins.line_handlers
+        for lineno, line in enumerate(self.source_lines, start=1):
+            for handler in handlers:
+                handler(self, lineno, line)
+
+    def apply_plugin_fixes(self):
+        for fixer in self.plugin_rules.fixers:
+            fixed_code = fixer(self)
+            if fixed_code is not None and fixed_code != self.source_code:
+                self.source_code = fixed_code
+                self.source_lines = fixed_code.splitlines()
+        return self.source_code
+
+    def _timed(self, rule, function, *args):
+        start = perf_counter()
+        result = function(*args)
+        self.rule_timings.add(rule, perf_counter() - start)
+        return result
+
     def lint(self):
-        tree = ast.parse(self.source_code)
-        self.visit(tree)
-        self.check_import_order()
-        self.check_trailing_whitespace()
-        self.check_unused_imports()
-        self.check_unused_function_args()
-        self.check_unused_variables()
-        self.check_first_line_empty()
-        self.check_empty_lines()
-        self.check_case_conventions()
-        self.check_line_length()
+        timings = self.rule_timings
+        self._tables_source = self.source_code
+        tree = self._parse() if timings is None else self._timed('parse', self._parse)
+        plugins = None
+        if self.plugin_rules is not None:
+            # Plugin rules disabled for the whole file are left out of the traversal
+            plugins = self._plugins = self.plugin_rules.enabled(self._rule_enabled)
+        try:
+            if timings is None:
+                self.visit(tree)
+            else:
+                # The naming, comment and plugin node rules all run during the traversal
+                self._timed('traversal', self.visit, tree)
+        finally:
+            self._plugins = None
+        if self._recovered is not None:
+            # Whatever the broken statements mention counts as used
+            self.used_names.update(self._recovered.names)
+        # Rules whose codes are all disabled with disable-file are never run
+        for check, codes in (
+            (self.check_syntax_errors, ('JL001',)),
+            (self.check_blank_lines_before_return, ('JL306',)),
+            (self.check_import_order, ('JL201',)),
+            (self.check_trailing_whitespace, ('JL301', 'JL302')),
+            (self.check_unused_imports, ('JL202',)),
+            (self.check_unused_function_args, ('JL203',)),
+            (self.check_unused_variables, ('JL204',)),
+            (self.check_unused_symbols, ('JL205',)),
+            (self.check_first_line_empty, ('JL305',)),
+            (self.check_empty_lines, ('JL303', 'JL304')),
+            (self.check_line_length, ('JL307',)),
+            (self.check_duplicate_functions, ('JL601',)),
+        ):
+            if not self._rule_enabled(*codes):
+                continue
+            if timings is None:
+                check()
+            else:
+                self._timed(check.__name__[len('check_'):], check)
+        if plugins is not None and plugins.line_handlers:
+            if timings is None:
+                self.check_plugin_lines(plugins)
+            else:
+                self._timed('plugin_lines', self.check_plugin_lines, plugins)
         return self.messages
     
-    def fix(self):
-        self.lint()  # Ensure all checks are run and data is populated
-        self.source_code = self.remove_unused_code()  # Fix the code and update source_code
+    def _analyze(self):
+        # Rebuild only the tables remove_unused_code relies on, skipping the text rules
+        self._reset_tables()
+        self._tables_source = self.source_code
+        self.messages = []
+        self.diagnostics = []
+        self._fixing = True
+        try:
+            self.visit(self._parse())
+            if self._rule_enabled('JL202'):
+                self.check_unused_imports()
+            if self._rule_enabled('JL204'):
+                self.check_unused_variables()
+        finally:
+            self._fixing = False
+
+    def _removable(self):
+        # Whether remove_unused_code() would delete anything from the analyzed source
+        if self.unused_imports or self.unused_variables_lines:
+            return True
+        if any(attrs - self.used_class_attributes for attrs in self.class_attributes.values()):
+            return True
+        return any(self._removable_args(node) for node in self._function_nodes)
+
+    @staticmethod
+    def _lost_last_use(tree, removed):
+        # Whether the removed nodes of tree held the last read of some name or attribute,
+        # the only way deleting them can leave more code unused. The names listed in a
+        # removed __all__ count as used by it, so that always does.
+        names, attributes = Counter(), Counter()
+        for node in removed:
+            if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == '__all__' for t in node.targets):
+                return True
+            for child in ast.walk(node):
+                if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+                    names[child.id] += 1
+                elif isinstance(child, ast.Attribute) and isinstance(child.ctx, ast.Load):
+                    attributes[child.attr] += 1
+        if not names and not attributes:
+            return False
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                if node.id in names:
+                    names[node.id] -= 1
+            elif isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Load):
+                if node.attr in attributes:
+                    attributes[node.attr] -= 1
+        return 0 in names.values() or 0 in attributes.values()
 
-    def remove_blank_lines_before_return(self, lines):
+    def fix(self, max_passes=MAX_FIX_PASSES):
         """
-        Remove any blank lines immediately before return statements.
+        Apply fixes until nothing removable is left, or max_passes is reached. Removing
+        code can leave other code unused, so one pass is not always enough: the source is
+        analyzed again only when the code a pass deleted held the last read of a name,
+        and the next pass only runs when that analysis finds something to remove.
+        Returns the number of passes run, also kept in self.fix_passes.
         """
-        result = []
-        for i, line in enumerate(lines):
-            stripped_line = line.strip()
-            if stripped_line.startswith('return'):
-                if i > 0 and lines[i - 1].strip() == '':
-                    result.pop()
-            result.append(line)
-        return result
+        self.lint()  # Ensure all checks are run and data is populated
+        if self.syntax_error is not None:
+            # Fixing a file only partly parsed could rewrite it around its broken statements
+            raise self.syntax_error
+        messages, diagnostics = self.messages, self.diagnostics
+        # Plugin fixers can change anything, so with them every pass is analyzed again
+        # and fixing stops when a pass leaves the source unchanged
+        plugin_fixers = self.plugin_rules is not None and bool(self.plugin_rules.fixers)
+        self.fix_passes = 0
+        while True:
+            previous_source = self.source_code
+            tree = self._parse()
+            self.source_code = self.remove_unused_code()  # Fix the code and update source_code
+            if plugin_fixers:
+                self.source_code = self.apply_plugin_fixes()
+            self.fix_passes += 1
+            if self.source_code == previous_source or self.fix_passes >= max_passes:
+                break
+            if not plugin_fixers and not self._lost_last_use(tree, self.removed_nodes):
+                break
+            self._analyze()
+            if not plugin_fixers and not self._removable():
+                break
+        # A fix must never leave code that no longer parses, even when no analysis followed it
+        self._parse()
+        # Keep the findings of the original source rather than those of the intermediate passes
+        self.messages, self.diagnostics = messages, diagnostics
+        return self.fix_passes
@@ -0,0 +1,81 @@
+from array import array
+from itertools import compress
+from operator import is_not
+
+# Bit flags stored per line in LineTable.flags
+BLANK = 1
+IMPORT = 2
+DEF = 4
+CLASS = 8
+RETURN = 16
+
+# Statements a flag is kept for; their first letters let most lines skip the prefix test
+_KEYWORDS = ('import ', 'from ', 'def ', 'class ', 'return')
+_KEYWORD_FIRSTS = 'ifdcr'
+_KEYWORD_FLAGS = {'i': IMPORT, 'f': IMPORT, 'd': DEF, 'c': CLASS}
+
+def edited_lines(before, after):
+    # Indexes of the lines in after, an edited copy of the list before, that were replaced
+    return list(compress(range(len(after)), map(is_not, before, after)))
+
+def refresh_flags(flags, lines, indexes):
+    # Recompute the flags of the lines at indexes, e.g. those edited_lines() found
+    if indexes:
+        for i, value in zip(indexes, LineTable([lines[i] for i in indexes]).flags):
+            flags[i] = value
+
+class LineTable:
+    """
+    Per-line flags shared by the blank-line rules and fixers, so they don't each strip
+    and test the same lines again. Built in one pass that stores nothing but a flags
+    byte per line; the indents are only worked out when something asks for them.
+    """
+    def __init__(self, lines):
+        self.lines = lines
+        flags = bytearray(len(lines))
+        for i, line in enumerate(lines):
+            content = line.lstrip()
+            if not content:
+                flags[i] = BLANK
+            elif content[0] in _KEYWORD_FIRSTS and content.startswith(_KEYWORDS):
+                first = content[0]
+                if first != 'r':
+                    flags[i] = _KEYWORD_FLAGS[first]
+                elif not content[6:7].isidentifier() and not content[6:7].isdigit():
+                    # Not names that merely start with it, such as returned_value
+                    flags[i] = RETURN
+        self.flags = array('B', flags)
+        self._indent = None
+
+    @classmethod
+    def from_flags(cls, lines, flags):
+        # A table for lines whose flags were kept up to date while editing them
+        table = cls.__new__(cls)
+        table.lines = lines
+        table.flags = array('B', flags)
+        table._indent = None
+        return table
+
+    @property
+    def indent(self):
+        if self._indent is None:
+            self._indent = array('I', [len(line) - len(line.lstrip()) for line in self.lines])
+        return self._indent
+
+    def __len__(self):
+        return len(self.flags)
+
+    def is_blank(self, i):
+        return self.flags[i] & BLANK != 0
+
+    def is_import(self, i):
+        return self.flags[i] & IMPORT != 0
+
+    def is_def(self, i):
+        return self.flags[i] & DEF != 0
+
+    def is_class(self, i):
+        return self.flags[i] & CLASS != 0
+
+    def is_return(self, i):
+        return self.flags[i] & RETURN != 0
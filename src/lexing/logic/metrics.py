@@ -0,0 +1,143 @@
+import json
+import sys
+from bisect import bisect_left
+
+from src.lexing.logic.source_io import write_source_file
+
+# Upper bounds, in seconds, of the buckets of the per-file rule time histograms
+RULE_TIME_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+class RuleTimings:
+    """
+    How long each rule took per file, as histograms over RULE_TIME_BUCKETS, and the
+    number of lines linted. Cheap enough to fill for every file: the linter adds one
+    observation per rule, workers fill one per batch and the parent merges them.
+    """
+    __slots__ = ('rules', 'lines')
+
+    def __init__(self):
+        # rule -> [count per bucket, the last one unbounded; total seconds]
+        self.rules = {}
+        self.lines = 0
+
+    def add(self, rule, seconds):
+        entry = self.rules.get(rule)
+        if entry is None:
+            entry = self.rules[rule] = [[0] * (len(RULE_TIME_BUCKETS) + 1), 0.0]
+        entry[0][bisect_left(RULE_TIME_BUCKETS, seconds)] += 1
+        entry[1] += seconds
+
+    def merge(self, other):
+        for rule, (counts, seconds) in other.rules.items():
+            entry = self.rules.get(rule)
+            if entry is None:
+                self.rules[rule] = [list(counts), seconds]
+            else:
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += seconds
+        self.lines += other.lines
+
+def peak_rss():
+    # Largest resident set size in bytes of this process and of any of its worker processes
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss is in kilobytes, except on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    )
+
+class RunMetrics:
+    """
+    Counters of one run, written out as OpenMetrics text or JSON at its end. engine.run
+    fills rule_timings and the cache counters; add_result sees every result.
+    """
+    def __init__(self, workers=1):
+        self.workers = workers
+        self.wall = 0.0
+        self.files = 0
+        self.errors = 0
+        # Seconds spent on files, summed over all workers
+        self.busy = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.rule_timings = RuleTimings()
+
+    def add_result(self, result):
+        self.files += 1
+        self.busy += result.elapsed
+        if result.error:
+            self.errors += 1
+
+    def _rate(self, count):
+        return count / self.wall if self.wall else 0.0
+
+    def snapshot(self):
+        parent_rss, worker_rss = peak_rss()
+        rules = {}
+        for rule, (counts, seconds) in sorted(self.rule_timings.rules.items()):
+            cumulative, buckets = 0, {}
+            for bound, count in zip(RULE_TIME_BUCKETS + ('+Inf',), counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            rules[rule] = {'count': cumulative, 'sum': seconds, 'buckets': buckets}
+        return {
+            'files': self.files,
+            'errors': self.errors,
+            'lines': self.rule_timings.lines,
+            'wall_seconds': self.wall,
+            'files_per_second': self._rate(self.files),
+            'lines_per_second': self._rate(self.rule_timings.lines),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'workers': self.workers,
+            'worker_utilization': self.busy / (self.workers * self.wall) if self.wall else 0.0,
+            'peak_rss_bytes': parent_rss,
+            'worker_peak_rss_bytes': worker_rss,
+            'rules': rules,
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2) + '\n'
+
+    def to_openmetrics(self):
+        data = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, value, suffix=''):
+            if value is None:
+                return
+            lines.append(f"# TYPE jay_lint_{name} {kind}")
+            lines.append(f"# HELP jay_lint_{name} {help_text}")
+            lines.append(f"jay_lint_{name}{suffix} {value}")
+
+        metric('files', 'counter', "Files processed.", data['files'], '_total')
+        metric('errors', 'counter', "Files that could not be processed.", data['errors'], '_total')
+        metric('lines', 'counter', "Lines linted; files taken from a cache are not counted.", data['lines'], '_total')
+        metric('wall_seconds', 'gauge', "Duration of the run.", data['wall_seconds'])
+        metric('files_per_second', 'gauge', "Files processed per second.", data['files_per_second'])
+        metric('lines_per_second', 'gauge', "Lines linted per second.", data['lines_per_second'])
+        metric('cache_hits', 'counter', "Results taken from a cache.", data['cache_hits'], '_total')
+        metric('cache_misses', 'counter', "Results not found in a cache.", data['cache_misses'], '_total')
+        metric('workers', 'gauge', "Worker processes used.", data['workers'])
+        metric('worker_utilization', 'gauge', "Share of the workers' time spent on files.", data['worker_utilization'])
+        metric('peak_rss_bytes', 'gauge', "Peak resident set size of the main process.", data['peak_rss_bytes'])
+        metric('worker_peak_rss_bytes', 'gauge', "Peak resident set size of the largest worker.", data['worker_peak_rss_bytes'])
+
+        if data['rules']:
+            lines.append("# TYPE jay_lint_rule_seconds histogram")
+            lines.append("# HELP jay_lint_rule_seconds Time each rule took per file.")
+            for rule, histogram in data['rules'].items():
+                for bound, count in histogram['buckets'].items():
+                    lines.append(f'jay_lint_rule_seconds_bucket{{rule="{rule}",le="{bound}"}} {count}')
+                lines.append(f'jay_lint_rule_seconds_sum{{rule="{rule}"}} {histogram["sum"]}')
+                lines.append(f'jay_lint_rule_seconds_count{{rule="{rule}"}} {histogram["count"]}')
+        lines.append("# EOF")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        # JSON for .json files, OpenMetrics (Prometheus) text format for anything else
+        write_source_file(path, self.to_json() if path.endswith('.json') else self.to_openmetrics())
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import re
+import struct
+
+from src.lexing.logic.engine import lint_source
+from src.lexing.logic.lexing import Diagnostic
+from src.lexing.logic.results import FileResult, decode_results, encode_results
+from src.lexing.logic.shared_cache import DirectoryCache, content_key
+
+# The notebook JSON is scanned with these and bytes.find rather than decoded, so outputs
+# (images, long logs) are stepped over in C without ever becoming Python objects
+_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+_STRUCTURE = re.compile(rb'["\[\]{}]')
+_SCALAR = re.compile(rb'[^,\]}\s]*')
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+def default_cell_cache_path():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'jay_lint', 'cells')
+
+def open_cell_cache():
+    # Every process opens its own; entries are replaced atomically, so workers can share the directory
+    return DirectoryCache(default_cell_cache_path())
+
+def _skip_whitespace(data, pos):
+    return _WHITESPACE.match(data, pos).end()
+
+def _string_end(data, pos):
+    # Index just past the string whose opening quote is at pos; a quote preceded by an odd
+    # number of backslashes is escaped
+    end = pos
+    while True:
+        end = data.find(b'"', end + 1)
+        if end == -1:
+            raise ValueError("unterminated string in notebook")
+        backslashes = 0
+        while data[end - 1 - backslashes] == 0x5c:
+            backslashes += 1
+        if not backslashes % 2:
+            return end + 1
+
+def _value_end(data, pos):
+    # Index just past the JSON value starting at pos
+    first = data[pos:pos + 1]
+    if first == b'"':
+        return _string_end(data, pos)
+    if first not in (b'[', b'{'):
+        return _SCALAR.match(data, pos).end()
+    depth = 0
+    while True:
+        match = _STRUCTURE.search(data, pos)
+        if match is None:
+            raise ValueError("unexpected end of notebook")
+        char = data[match.start():match.end()]
+        if char == b'"':
+            pos = _string_end(data, match.start())
+            continue
+        pos = match.end()
+        depth += 1 if char in (b'[', b'{') else -1
+        if depth == 0:
+            return pos
+
+def _expect(data, pos, char):
+    pos = _skip_whitespace(data, pos)
+    if data[pos:pos + 1] != char:
+        raise ValueError(f"expected {char.decode()!r} at offset {pos} of the notebook")
+    return pos + 1
+
+def _members(data, pos):
+    # (key, value start, value end) of the object starting at pos; values are left undecoded
+    pos = _expect(data, pos, b'{')
+    pos = _skip_whitespace(data, pos)
+    if data[pos:pos + 1] == b'}':
+        return
+    while True:
+        pos = _skip_whitespace(data, pos)
+        key_end = _value_end(data, pos)
+        key = json.loads(bytes(data[pos:key_end]))
+        start = _skip_whitespace(data, _expect(data, key_end, b':'))
+        end = _value_end(data, start)
+        yield key, start, end
+        pos = _skip_whitespace(data, end)
+        if data[pos:pos + 1] == b'}':
+            return
+        pos = _expect(data, pos, b',')
+
+def _elements(data, pos):
+    # Start of each value of the array starting at pos
+    pos = _expect(data, pos, b'[')
+    pos = _skip_whitespace(data, pos)
+    if data[pos:pos + 1] == b']':
+        return
+    while True:
+        pos = _skip_whitespace(data, pos)
+        yield pos
+        pos = _skip_whitespace(data, _value_end(data, pos))
+        if data[pos:pos + 1] == b']':
+            return
+        pos = _expect(data, pos, b',')
+
+def code_cells(data):
+    """
+    (cell number, source) of every code cell of an nbformat 4 notebook in data (bytes or
+    an mmap), numbered from 1 over all cells as they appear in the notebook. Only cell types
+    and code cell sources are decoded.
+    """
+    for key, start, _ in _members(data, _skip_whitespace(data, 0)):
+        if key != 'cells':
+            continue
+        cells = []
+        for number, cell_start in enumerate(_elements(data, start), start=1):
+            cell_type, source = None, None
+            for cell_key, value_start, value_end in _members(data, cell_start):
+                if cell_key == 'cell_type':
+                    cell_type = json.loads(bytes(data[value_start:value_end]))
+                elif cell_key == 'source':
+                    source = json.loads(bytes(data[value_start:value_end]))
+            if cell_type == 'code' and source is not None:
+                cells.append((number, source if isinstance(source, str) else ''.join(source)))
+        return cells
+    raise ValueError("not a Jupyter notebook in nbformat 4")
+
+def python_source(cell_source):
+    """
+    The Python code of a cell, with IPython line magics and shell commands turned into
+    comments of the same length so line numbers and lengths still match. None for cells
+    run by a cell magic such as %%bash, which are not Python.
+    """
+    stripped = cell_source.lstrip()
+    if stripped.startswith('%%'):
+        return None
+    lines = cell_source.split('\n')
+    for i, line in enumerate(lines):
+        code = line.lstrip()
+        if code.startswith(('%', '!')):
+            indent = len(line) - len(code)
+            lines[i] = line[:indent] + '#' + code[1:]
+    return '\n'.join(lines)
+
+def _cache_key(path):
+    return hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=16).hexdigest()
+
+def lint_notebook(data, path, linter_options=None, fingerprints=False, rule_timings=None, cell_cache=None):
+    """
+    Lint the code cells of the notebook in data, each as a module of its own. Names a cell
+    binds count as used when another cell mentions them, as cells share one namespace.
+    Findings are prefixed with their cell number and keep the line within the cell.
+
+    cell_cache is a SharedCache holding the results of the notebook's cells from the last
+    run, one entry per notebook; cells whose code and options did not change since are
+    not linted again.
+    """
+    try:
+        cells = [(number, python_source(source)) for number, source in code_cells(data)]
+    except (ValueError, UnicodeDecodeError) as e:
+        return FileResult(path, error=str(e))
+    cells = [(number, source) for number, source in cells if source is not None]
+
+    words = [set(_IDENTIFIER.findall(source)) for _, source in cells]
+    counts = {}
+    for cell_words in words:
+        for word in cell_words:
+            counts[word] = counts.get(word, 0) + 1
+    base_exported = set((linter_options or {}).get('exported_names') or ())
+
+    if fingerprints:
+        from src.lexing.logic.baseline import fingerprint
+    settings = {'fingerprints': fingerprints}
+    jobs = []
+    for (number, source), cell_words in zip(cells, words):
+        options = dict(linter_options or {})
+        options['exported_names'] = base_exported | {word for word in cell_words if counts[word] > 1}
+        jobs.append((number, source, options, content_key(source.encode('utf-8'), path, settings, options)))
+
+    stored = {}
+    notebook_key = _cache_key(path)
+    if cell_cache is not None:
+        blob = cell_cache.get_many([notebook_key]).get(notebook_key)
+        if blob is not None:
+            try:
+                stored = {result.path: result for result in decode_results(blob)}
+            except (ValueError, IndexError, struct.error):
+                stored = {}
+
+    messages, diagnostics, prints, cell_results = [], [], [], []
+    for number, source, options, key in jobs:
+        result = stored.get(key)
+        if result is None:
+            result = lint_source(source, path, options, fingerprints, rule_timings)
+            if cell_cache is not None:
+                cell_cache.misses += 1
+        elif cell_cache is not None:
+            cell_cache.hits += 1
+        cell_results.append(result._replace(path=key, elapsed=0.0))
+        if result.error:
+            # A cell that doesn't parse is a finding of its own rather than an error of the notebook
+            diagnostic = Diagnostic('JL001', 0, f"Cell {number}: could not be parsed: {result.error}")
+            messages.append(diagnostic.message)
+            diagnostics.append(diagnostic)
+            if fingerprints:
+                prints.append(fingerprint(diagnostic, path, ()))
+            continue
+        messages.extend(f"Cell {number}: {message}" for message in result.messages)
+        diagnostics.extend(
+            Diagnostic(code, line, f"Cell {number}: {message}") for code, line, message in result.diagnostics
+        )
+        prints.extend(result.fingerprints)
+
+    if cell_cache is not None and [result.path for result in cell_results] != list(stored):
+        cell_cache.put_many({notebook_key: encode_results(cell_results)})
+    return FileResult(path, messages=messages, diagnostics=diagnostics, fingerprints=prints)
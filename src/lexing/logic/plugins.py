@@ -0,0 +1,106 @@
+import sys
+from functools import lru_cache
+
+from src.lexing.logic.suppressions import ALL_RULES
+
+# Entry point group other packages register rules in. Each entry point is named after
+# the rule's code and loads a Rule subclass, e.g. in setup.py:
+#   entry_points={'jay_lint.rules': ['ACME101 = acme_lint.rules:NoPrint']}
+ENTRY_POINT_GROUP = 'jay_lint.rules'
+
+class Rule:
+    """
+    Base class for plugin rules. A rule handles any of:
+    - the AST node classes in node_types, passed to visit_node during the linter's own
+      traversal of the tree rather than in a pass of its own;
+    - every source line, passed to check_line;
+    - fixing, by returning new source from fix (None leaves the source as it is).
+    Findings go through linter.report(self.code, lineno, message), so suppression
+    comments apply to plugin rules like to the built-in ones.
+    """
+    code = None
+    node_types = ()
+
+    def visit_node(self, linter, node):
+        pass
+
+    def check_line(self, linter, lineno, line):
+        pass
+
+    def fix(self, linter):
+        return None
+
+def _overrides(rule, method):
+    return getattr(type(rule), method, None) is not getattr(Rule, method)
+
+class RuleSet:
+    # Selected rules with their handlers grouped the way the linter calls them
+    def __init__(self, rules):
+        self.rules = rules
+        self.codes = {rule.code for rule in rules}
+        # AST node class -> visit_node methods, looked up once per node by the linter
+        self.node_handlers = {}
+        for rule in rules:
+            for node_type in rule.node_types:
+                self.node_handlers.setdefault(node_type, []).append(rule.visit_node)
+        self.line_handlers = [rule.check_line for rule in rules if _overrides(rule, 'check_line')]
+        self.fixers = [rule.fix for rule in rules if _overrides(rule, 'fix')]
+
+    def enabled(self, is_enabled):
+        # The rules whose code is_enabled accepts, e.g. leaving out those disabled for a file
+        rules = [rule for rule in self.rules if is_enabled(rule.code)]
+        return self if len(rules) == len(self.rules) else RuleSet(rules)
+
+def is_selected(code, select):
+    return any(selector == ALL_RULES or code.startswith(selector) for selector in select)
+
+@lru_cache(maxsize=None)
+def load_rules(select):
+    """
+    The RuleSet of installed plugin rules whose code starts with one of the select
+    prefixes (a tuple; 'all' picks every rule). Only those entry points are imported,
+    once per process. Raises ValueError when a selected plugin fails to load.
+    """
+    from importlib.metadata import entry_points
+
+    rules = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if not is_selected(entry_point.name, select):
+            continue
+        try:
+            rule = entry_point.load()
+        except Exception as e:
+            raise ValueError(f"Could not load the rule plugin '{entry_point.name}': {e}") from e
+        if isinstance(rule, type):
+            rule = rule()
+        if getattr(rule, 'code', None) is None:
+            rule.code = entry_point.name
+        rules.append(rule)
+    return RuleSet(rules)
+
+@lru_cache(maxsize=None)
+def plugins_digest(select):
+    """
+    Hash of the plugin rules select picks: each entry point with the version of the
+    distribution providing it, and the source of the module its rule comes from, which
+    changes even when an editable install keeps its version.
+    """
+    import hashlib
+    from importlib.metadata import entry_points
+
+    digest = hashlib.blake2b(digest_size=16)
+    for entry_point in sorted(entry_points(group=ENTRY_POINT_GROUP), key=lambda entry_point: entry_point.name):
+        if is_selected(entry_point.name, select):
+            dist = getattr(entry_point, 'dist', None)
+            version = f"{dist.metadata['Name']}=={dist.version}" if dist is not None else ''
+            digest.update(f"{entry_point.name}={entry_point.value} {version}\0".encode('utf-8'))
+    modules = {type(rule).__module__ for rule in load_rules(select).rules}
+    for name in sorted(modules):
+        path = getattr(sys.modules.get(name), '__file__', None)
+        if path:
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                pass
+    return digest.digest()
@@ -0,0 +1,198 @@
+import ast
+import os
+
+from src.lexing.logic.file_index import FileIndex
+from src.lexing.logic.source_io import read_source_file
+
+DEFAULT_INDEX_NAME = '.jay_lint_index.json'
+
+def module_name(path, root):
+    relative = os.path.relpath(path, root)
+    parts = relative[:-len('.py')].split(os.sep)
+    if parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join(parts)
+
+def _resolve_relative(module, level, current_module, is_package):
+    # Turn "from ..x import y" into an absolute module name
+    if not level:
+        return module or ''
+    package = current_module.split('.') if current_module else []
+    if not is_package:
+        package = package[:-1]
+    if level > 1:
+        package = package[:len(package) - (level - 1)]
+    if module:
+        package.append(module)
+    return '.'.join(package)
+
+def _dotted(node):
+    # "a.b.c" for an attribute chain rooted at a name, else None
+    attrs = []
+    while isinstance(node, ast.Attribute):
+        attrs.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    attrs.append(node.id)
+    return '.'.join(reversed(attrs))
+
+def summarize_module(path, root):
+    """
+    Reduce one file to what the project graph needs: its top-level definitions, the
+    names its imports bind, the dotted names it loads through those bindings and its
+    __all__. The AST is dropped as soon as the summary is built.
+    """
+    current = module_name(path, root)
+    is_package = os.path.basename(path) == '__init__.py'
+    tree = ast.parse(read_source_file(path))
+
+    definitions = {}
+    bindings = {}
+    exports = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            definitions[node.name] = node.lineno
+        elif isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == '__all__' for t in node.targets):
+            if isinstance(node.value, (ast.List, ast.Tuple)):
+                exports = [elt.value for elt in node.value.elts if isinstance(elt, ast.Constant) and isinstance(elt.value, str)]
+
+    stars = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    bindings[alias.asname] = alias.name
+                else:
+                    root_name = alias.name.split('.')[0]
+                    bindings[root_name] = root_name
+        elif isinstance(node, ast.ImportFrom):
+            source = _resolve_relative(node.module, node.level, current, is_package)
+            for alias in node.names:
+                if alias.name == '*':
+                    stars.append(source)
+                else:
+                    bindings[alias.asname or alias.name] = f"{source}.{alias.name}" if source else alias.name
+
+    local_uses = set()
+    uses = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            local_uses.add(node.id)
+            if node.id in bindings:
+                uses.add(bindings[node.id])
+        elif isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Load):
+            dotted = _dotted(node)
+            if dotted:
+                head, _, rest = dotted.partition('.')
+                if head in bindings:
+                    uses.add(f"{bindings[head]}.{rest}")
+
+    return {
+        'module': current,
+        'package': is_package,
+        'definitions': definitions,
+        'bindings': bindings,
+        'exports': exports,
+        'stars': sorted(stars),
+        'uses': sorted(uses),
+        'local_uses': sorted(local_uses),
+    }
+
+class ProjectIndex(FileIndex):
+    """
+    Module import/export graph for every .py file under root, kept on disk as a compact
+    JSON index of per-file summaries. update() only re-reads files whose size or mtime
+    changed, so keeping the index current on a large tree is cheap.
+    """
+    default_name = DEFAULT_INDEX_NAME
+    summarize = staticmethod(summarize_module)
+
+    def __init__(self, root, index_path=None):
+        super().__init__(root, index_path)
+        self._external_uses = None
+
+    def _summarize_args(self, path):
+        return (path, self.root)
+
+    def _changed(self):
+        self._external_uses = None
+
+    def _summaries(self):
+        return {entry[2]['module']: entry[2] for entry in self.files.values()}
+
+    def external_uses(self):
+        """
+        Map each project module to the set of its names that other modules use, following
+        re-exports: using pkg.name where pkg re-exports it from pkg.mod also uses pkg.mod.name.
+        """
+        if self._external_uses is not None:
+            return self._external_uses
+
+        summaries = self._summaries()
+        used = {module: set() for module in summaries}
+        pending = []
+
+        def split(dotted):
+            # Find the longest project module prefix of a dotted name
+            parts = dotted.split('.')
+            for i in range(len(parts) - 1, 0, -1):
+                module = '.'.join(parts[:i])
+                if module in summaries:
+                    return module, parts[i]
+            return None
+
+        for module, summary in summaries.items():
+            for dotted in summary['uses']:
+                target = split(dotted)
+                if target and target[0] != module:
+                    pending.append(target)
+            for star in summary['stars']:
+                if star in summaries and star != module:
+                    star_summary = summaries[star]
+                    names = star_summary['exports'] or [n for n in list(star_summary['definitions']) + list(star_summary['bindings']) if not n.startswith('_')]
+                    pending.extend((star, name) for name in names)
+
+        while pending:
+            module, name = pending.pop()
+            if name in used[module]:
+                continue
+            used[module].add(name)
+            # A used re-export also uses whatever it was imported from
+            dotted = summaries[module]['bindings'].get(name)
+            if dotted:
+                target = split(dotted)
+                if target:
+                    pending.append(target)
+
+        self._external_uses = used
+        return used
+
+    def exported_names(self, path):
+        """Names bound in path that the rest of the project relies on."""
+        summary = self._summary_for(path)
+        if summary is None:
+            return set()
+        return self.external_uses().get(summary['module'], set()) | set(summary['exports'])
+
+    def unused_symbols(self, path):
+        """Top-level functions and classes in path that nothing in the project uses, with their lines."""
+        summary = self._summary_for(path)
+        if summary is None:
+            return {}
+        keep = self.exported_names(path) | set(summary['local_uses'])
+        return {
+            name: line for name, line in summary['definitions'].items()
+            if name not in keep and not (name.startswith('__') and name.endswith('__'))
+        }
+
+    def linter_options(self, path):
+        # Keyword arguments for JayLinter that carry the project-wide view of path
+        return {
+            'exported_names': sorted(self.exported_names(path)),
+            'unused_symbols': self.unused_symbols(path),
+        }
+
+    def _summary_for(self, path):
+        entry = self.files.get(os.path.relpath(os.path.abspath(path), self.root))
+        return entry[2] if entry else None
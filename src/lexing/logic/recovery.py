@@ -0,0 +1,122 @@
+import ast
+import re
+import tokenize
+from collections import namedtuple
+from functools import partial
+from token import COMMENT, DEDENT, ENDMARKER, INDENT, NEWLINE, NL, OP
+
+# Keywords that can't appear in an expression: one at the start of a line inside a bracket
+# left open is taken to begin a new statement, so the bracket doesn't swallow the file
+_STATEMENT_KEYWORDS = frozenset((
+    'assert', 'class', 'def', 'del', 'from', 'global', 'import', 'nonlocal', 'pass', 'raise', 'return', 'try',
+    'while', 'with',
+))
+
+# Keywords that also start comprehension clauses, so inside a bracket they only count as
+# starting a statement on a line that ends like a compound statement's header
+_HEADER_KEYWORDS = frozenset(('async', 'for', 'if'))
+
+# Keywords that continue the compound statement above them rather than start one
+_CONTINUATIONS = frozenset(('elif', 'else', 'except', 'finally'))
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+# tree: a Module of the statements that parse, with their line numbers in the file;
+# errors: (line, message) per statement that doesn't; names: identifiers in those
+# statements; tokens: the token stream of the file as far as it could be tokenized
+RecoveredModule = namedtuple('RecoveredModule', ['tree', 'errors', 'names', 'tokens'])
+
+def _resume_line(lines, index, end):
+    # Index of the first line in lines[index:end] that starts at column 0 with code and
+    # doesn't continue a compound statement, or end
+    for i in range(index, end):
+        line = lines[i]
+        if line[:1] not in ('', ' ', '\t', '\n', '\x0c', '#') and line.split(None, 1)[0].rstrip(':') not in _CONTINUATIONS:
+            return i
+    return end
+
+def _scan(lines, offset, starts, tokens):
+    """
+    Tokenize lines[offset:], adding the line number of every top-level statement to starts
+    and the tokens, with their rows in the file, to tokens. Returns the index to tokenize
+    from again after an error or a bracket left open, or len(lines) at the end.
+    """
+    readline = partial(next, iter(lines[offset:]), '')
+    statement_start = True
+    decorated = False
+    depth = 0
+    try:
+        for token in tokenize.generate_tokens(readline):
+            row, column = token.start
+            kind = token.type
+            if column == 0 and kind not in (COMMENT, NL, NEWLINE, INDENT, DEDENT, ENDMARKER):
+                if statement_start:
+                    # Decorators and else/except clauses stay with their statement
+                    if not decorated and token.string not in _CONTINUATIONS:
+                        starts.append(offset + row)
+                    decorated = token.string == '@'
+                elif depth and (
+                    token.string in _STATEMENT_KEYWORDS
+                    or token.string in _HEADER_KEYWORDS and token.line.rstrip().endswith(':')
+                ):
+                    return offset + row - 1
+            tokens.append(token._replace(start=(offset + row, column), end=(offset + token.end[0], token.end[1])))
+            if kind == NEWLINE:
+                statement_start = True
+                continue
+            if kind == OP:
+                if token.string in ('(', '[', '{'):
+                    depth += 1
+                elif token.string in (')', ']', '}'):
+                    depth = max(depth - 1, 0)
+            if kind not in (COMMENT, NL, INDENT, DEDENT):
+                statement_start = False
+    except tokenize.TokenError as e:
+        row = e.args[1][0]
+    except SyntaxError as e:
+        row = e.lineno or 1
+    else:
+        return len(lines)
+    return _resume_line(lines, max(offset + row, offset + 1), len(lines))
+
+def statement_starts(lines, tokens=None):
+    """
+    Line numbers (from 1) where the top-level statements of lines start, going by the token
+    stream. Where the tokenizer fails, it starts over at the next line beginning with code;
+    tokens, if given, collects what it produced.
+    """
+    lines = [line + '\n' for line in lines]
+    starts = []
+    tokens = [] if tokens is None else tokens
+    offset = 0
+    while offset < len(lines):
+        offset = _scan(lines, offset, starts, tokens)
+    return starts
+
+def recover_module(lines):
+    """
+    Parse each top-level statement of lines on its own, for source that doesn't parse as a
+    whole. Statements that parse keep their line numbers in the file, so every rule can
+    run over the tree as if the broken statements weren't there.
+    """
+    tokens = []
+    starts = statement_starts(lines, tokens)
+    body, errors, names = [], [], set()
+    for start, end in zip(starts, starts[1:] + [len(lines) + 1]):
+        while start < end:
+            try:
+                module = ast.parse('\n'.join(lines[start - 1:end - 1]))
+            except SyntaxError as e:
+                line = start - 1 + (e.lineno or 1)
+                errors.append((line, e.msg))
+                # An open bracket can make the tokenizer take later statements for part of
+                # the broken one: go on from the next line after the error that starts one
+                resume = _resume_line(lines, line, end - 1) + 1
+                # Names used only by a broken statement are not reported as unused
+                names.update(_IDENTIFIER.findall('\n'.join(lines[start - 1:resume - 1])))
+                start = resume
+                continue
+            ast.increment_lineno(module, start - 1)
+            body.extend(module.body)
+            break
+    return RecoveredModule(ast.Module(body=body, type_ignores=[]), errors, names, tokens)
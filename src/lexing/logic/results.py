@@ -0,0 +1,135 @@
+import struct
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+from itertools import accumulate
+
+from src.lexing.logic.lexing import Diagnostic
+
+# messages is the lint output, or the original findings when fixing; diagnostics carry the
+# rule codes of the same findings and fingerprints (when asked for) their baseline keys;
+# diff is only set for --diff and fixed_source only when fixing a buffer rather than a file;
+# elapsed is the seconds spent on the file, 0 when it came from a cache
+FileResult = namedtuple(
+    'FileResult',
+    ['path', 'messages', 'diagnostics', 'fingerprints', 'changed', 'passes', 'diff', 'error', 'fixed_source', 'elapsed'],
+    defaults=((), (), (), False, 0, None, None, None, 0.0),
+)
+
+class PackedDiagnostics(Sequence):
+    """
+    The diagnostics of a decoded result, kept as the batch's string table and columns of
+    code indexes, lines and messages. Diagnostic tuples are only built when read: most
+    reporters just print messages, and building a tuple per finding would cost the
+    parent more than the transfer itself.
+    """
+    __slots__ = ('strings', 'codes', 'lines', 'messages')
+
+    def __init__(self, strings, codes, lines, messages):
+        self.strings = strings
+        self.codes = codes
+        self.lines = lines
+        self.messages = messages
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Diagnostic(self.strings[self.codes[index]], self.lines[index], self.messages[index])
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+# Packed batch header: how many integers follow, then how many strings
+_HEADER = struct.Struct('<II')
+
+# Fixed integers at the start of every packed result
+_RESULT_FIELDS = 8
+
+# elapsed travels as whole microseconds in 32 bits
+_MAX_MICROSECONDS = 2 ** 32 - 1
+
+def encode_results(results):
+    """
+    Pack FileResults into one bytes object for the trip back from a worker process.
+    Every distinct string, rule codes included, is stored once, and all numbers and
+    string references go into a single array of 32-bit integers. messages are left
+    out: each one is the message of the diagnostic at the same index.
+    """
+    strings = {}
+    ints = array('I')
+
+    def intern(text):
+        return strings.setdefault(text, len(strings))
+
+    def optional(text):
+        # 0 stands for None, so present strings are stored one up
+        return 0 if text is None else intern(text) + 1
+
+    for result in results:
+        ints.extend((
+            intern(result.path), result.changed, result.passes, optional(result.error),
+            optional(result.diff), optional(result.fixed_source),
+            min(round(result.elapsed * 1e6), _MAX_MICROSECONDS), len(result.diagnostics),
+        ))
+        for code, line, message in result.diagnostics:
+            ints.extend((intern(code), line, intern(message)))
+        ints.append(len(result.fingerprints))
+        ints.extend(intern(fingerprint) for fingerprint in result.fingerprints)
+
+    # Strings travel as one UTF-8 blob plus their lengths in characters, so the receiving
+    # side decodes once and slices. Paths that are not valid UTF-8 reach Python as lone
+    # surrogates, which must survive the trip
+    lengths = array('I', map(len, strings))
+    blob = ''.join(strings).encode('utf-8', 'surrogatepass')
+    return b''.join((_HEADER.pack(len(ints), len(lengths)), ints.tobytes(), lengths.tobytes(), blob))
+
+def decode_results(data):
+    """Unpack the output of encode_results, yielding its FileResults in order."""
+    view = memoryview(data)
+    int_count, string_count = _HEADER.unpack_from(view)
+    offset = _HEADER.size
+    ints = array('I')
+    ints.frombytes(view[offset:offset + int_count * ints.itemsize])
+    offset += int_count * ints.itemsize
+    lengths = array('I')
+    lengths.frombytes(view[offset:offset + string_count * lengths.itemsize])
+    offset += string_count * lengths.itemsize
+
+    text = str(view[offset:], 'utf-8', 'surrogatepass')
+    bounds = list(accumulate(lengths, initial=0))
+    strings = [text[start:end] for start, end in zip(bounds, bounds[1:])]
+    string_at = strings.__getitem__
+
+    def optional(index):
+        return None if index == 0 else strings[index - 1]
+
+    position = 0
+    while position < int_count:
+        path, changed, passes, error, diff, fixed_source, elapsed, count = ints[position:position + _RESULT_FIELDS]
+        position += _RESULT_FIELDS
+        end = position + 3 * count
+        messages = list(map(string_at, ints[position + 2:end:3]))
+        diagnostics = PackedDiagnostics(strings, ints[position:end:3], ints[position + 1:end:3], messages)
+        count = ints[end]
+        fingerprints = list(map(string_at, ints[end + 1:end + 1 + count]))
+        position = end + 1 + count
+        yield FileResult(
+            strings[path],
+            messages=messages,
+            diagnostics=diagnostics,
+            fingerprints=fingerprints or (),
+            changed=bool(changed),
+            passes=passes,
+            diff=optional(diff),
+            error=optional(error),
+            fixed_source=optional(fixed_source),
+            elapsed=elapsed / 1e6,
+        )
@@ -0,0 +1,177 @@
+import sqlite3
+import time
+from itertools import repeat
+
+from src.lexing.logic.results import PackedDiagnostics
+
+# Bump when the tables change; a database in another format is refused rather than misread
+SCHEMA_VERSION = 1
+
+# Files whose results are written in one transaction
+RESULTS_DB_BATCH = 512
+
+# Every index on diagnostics is updated for each of a run's many findings, so it only has
+# the one rows arrive nearly in order for; queries by rule or by path across runs go to
+# the per-run totals in rules and files instead
+_SCHEMA = """
+CREATE TABLE runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL,
+    files INTEGER NOT NULL DEFAULT 0,
+    findings INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    busy REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE files (
+    run INTEGER NOT NULL REFERENCES runs (id),
+    path TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    findings INTEGER NOT NULL,
+    error TEXT
+);
+CREATE TABLE diagnostics (
+    run INTEGER NOT NULL REFERENCES runs (id),
+    path TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE TABLE rules (
+    run INTEGER NOT NULL REFERENCES runs (id),
+    rule TEXT NOT NULL,
+    findings INTEGER NOT NULL
+);
+CREATE INDEX files_run ON files (run, path);
+CREATE INDEX files_path ON files (path, run);
+CREATE INDEX rules_run ON rules (run, rule);
+CREATE INDEX rules_rule ON rules (rule, run);
+CREATE INDEX diagnostics_run ON diagnostics (run, path);
+"""
+
+def _diagnostic_rows(run, path, diagnostics):
+    if isinstance(diagnostics, PackedDiagnostics):
+        # Straight from the decoded columns, without building a Diagnostic per finding
+        codes = map(diagnostics.strings.__getitem__, diagnostics.codes)
+        return zip(repeat(run), repeat(path), codes, diagnostics.lines, diagnostics.messages)
+    return ((run, path, code, line, message) for code, line, message in diagnostics)
+
+def _rule_filter(rule):
+    # SQL condition and parameters limiting diagnostics to codes starting with rule
+    if not rule:
+        return '', ()
+    return ' AND rule LIKE ?', (rule.replace('%', '').replace('_', '') + '%',)
+
+class ResultsDatabase:
+    """
+    Lint results kept in SQLite for queries across runs: a row per run, per file with the
+    time it took, per rule and per finding. The parent records results as the engine
+    yields them and writes them a batch of files per transaction, so the workers never
+    wait on it.
+    """
+    def __init__(self, path):
+        self.path = path
+        try:
+            self.connection = sqlite3.connect(path, timeout=30)
+            version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+            if version == 0:
+                # WAL lets reports read while a run writes, and commits skip the fsync
+                self.connection.execute('PRAGMA journal_mode = WAL')
+                with self.connection:
+                    self.connection.executescript(_SCHEMA)
+                    self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            elif version != SCHEMA_VERSION:
+                raise ValueError(f"'{path}' holds results in another format (version {version})")
+            self.connection.execute('PRAGMA synchronous = NORMAL')
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"'{path}' is not a results database: {e}") from e
+        self.run = None
+        self.files = 0
+        self.findings = 0
+        self.errors = 0
+        self.busy = 0.0
+        self._pending_files = []
+        self._pending_diagnostics = []
+
+    def start_run(self):
+        with self.connection:
+            self.run = self.connection.execute('INSERT INTO runs (started) VALUES (?)', (time.time(),)).lastrowid
+        return self.run
+
+    def add_result(self, result):
+        diagnostics = result.diagnostics
+        self.files += 1
+        self.findings += len(diagnostics)
+        self.busy += result.elapsed
+        if result.error:
+            self.errors += 1
+        self._pending_files.append((self.run, result.path, result.elapsed, len(diagnostics), result.error))
+        if diagnostics:
+            self._pending_diagnostics.extend(_diagnostic_rows(self.run, result.path, diagnostics))
+        if len(self._pending_files) >= RESULTS_DB_BATCH:
+            self.flush()
+
+    def flush(self):
+        if not self._pending_files:
+            return
+        with self.connection:
+            self.connection.executemany('INSERT INTO files VALUES (?, ?, ?, ?, ?)', self._pending_files)
+            self.connection.executemany('INSERT INTO diagnostics VALUES (?, ?, ?, ?, ?)', self._pending_diagnostics)
+        self._pending_files = []
+        self._pending_diagnostics = []
+
+    def finish_run(self):
+        self.flush()
+        with self.connection:
+            self.connection.execute(
+                'INSERT INTO rules SELECT run, rule, COUNT(*) FROM diagnostics WHERE run = ? GROUP BY rule', (self.run,),
+            )
+            self.connection.execute(
+                'UPDATE runs SET finished = ?, files = ?, findings = ?, errors = ?, busy = ? WHERE id = ?',
+                (time.time(), self.files, self.findings, self.errors, self.busy, self.run),
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def runs(self, limit):
+        # (id, started, files, findings, errors) of the last limit finished runs, newest first
+        return self.connection.execute(
+            'SELECT id, started, files, findings, errors FROM runs WHERE finished IS NOT NULL ORDER BY id DESC LIMIT ?',
+            (limit,),
+        ).fetchall()
+
+    def rule_counts(self, runs, rule=None):
+        # run -> {rule: findings} for each of runs
+        condition, parameters = _rule_filter(rule)
+        counts = {run: {} for run in runs}
+        for run in runs:
+            rows = self.connection.execute(f'SELECT rule, findings FROM rules WHERE run = ?{condition}', (run, *parameters))
+            counts[run].update(rows)
+        return counts
+
+    def path_history(self, path, limit):
+        # (run, findings, seconds) of path in the last limit runs that linted it, newest first
+        return self.connection.execute(
+            'SELECT run, findings, elapsed FROM files WHERE path = ? ORDER BY run DESC LIMIT ?', (path, limit),
+        ).fetchall()
+
+    def top_paths(self, run, limit, rule=None):
+        # (path, findings) of the files with the most findings in run
+        if not rule:
+            return self.connection.execute(
+                'SELECT path, findings FROM files WHERE run = ? AND findings ORDER BY findings DESC, path LIMIT ?',
+                (run, limit),
+            ).fetchall()
+        condition, parameters = _rule_filter(rule)
+        return self.connection.execute(
+            f'SELECT path, COUNT(*) AS findings FROM diagnostics WHERE run = ?{condition}'
+            ' GROUP BY path ORDER BY findings DESC, path LIMIT ?',
+            (run, *parameters, limit),
+        ).fetchall()
+
+    def slowest_files(self, run, limit):
+        # (path, seconds) of the files that took longest to lint in run
+        return self.connection.execute(
+            'SELECT path, elapsed FROM files WHERE run = ? ORDER BY elapsed DESC, path LIMIT ?', (run, limit),
+        ).fetchall()
@@ -0,0 +1,44 @@
+import re
+
+class ReturnRules:
+    """
+    The return-statement rules, run over the Return nodes the linter's visitor collects
+    during its one traversal of the tree. Checks and fixes both work from the nodes'
+    line spans, so nothing walks the tree again or looks for lines starting with 'return'.
+    """
+    def __init__(self):
+        self.nodes = []
+
+    def add(self, node):
+        self.nodes.append(node)
+
+    def diagnostics(self, table):
+        # (code, line, message) for every return statement with a blank line right above it
+        for node in self.nodes:
+            lineno = node.lineno
+            if lineno > 1 and table.is_blank(lineno - 2):
+                yield 'JL306', lineno, f"Line {lineno} has a blank line before 'return' statement."
+
+    def remove_unused_variables(self, lines, unused_variables):
+        # Drop "var +" and "+ var" terms of unused variables from the lines each return spans
+        if not unused_variables:
+            return
+        patterns = []
+        for var in unused_variables:
+            patterns.append(re.compile(r'\b' + re.escape(var) + r'\b\s*\+\s*'))
+            patterns.append(re.compile(r'\s*\+\s*' + re.escape(var) + r'\b'))
+        for node in self.nodes:
+            for i in range(node.lineno - 1, node.end_lineno):
+                line = lines[i]
+                for pattern in patterns:
+                    line = pattern.sub('', line)
+                lines[i] = line
+
+    def drop_blank_lines_before(self, lines, dropped):
+        # Add the blank lines, including lines the fixer has emptied, directly above each
+        # return statement to dropped; lines must still line up with the tree
+        for node in self.nodes:
+            i = node.lineno - 2
+            while i >= 0 and not lines[i].strip():
+                dropped.add(i)
+                i -= 1
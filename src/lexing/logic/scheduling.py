@@ -0,0 +1,83 @@
+import json
+import os
+
+from src.lexing.logic.source_io import write_source_file
+
+# Lint time assumed per byte of source until the history has measured some files
+DEFAULT_SECONDS_PER_BYTE = 2e-6
+
+# Batches are sized to about this fraction of one worker's share of the predicted work,
+# so the pool can still even out mispredictions near the end of a run
+BATCHES_PER_WORKER = 4
+
+# Bump when the history layout changes so stale files are ignored instead of misread
+HISTORY_VERSION = 1
+
+def default_history_path():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'jay_lint', 'timings.json')
+
+class RuntimeHistory:
+    """
+    How long each file took to lint in earlier runs, kept as a small JSON file mapping
+    absolute paths to [size, seconds]. A file that changed size since it was measured
+    is predicted by scaling its old time; files never measured fall back to their size
+    times the average rate of the files that were.
+    """
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+        self.files = {}
+        self.changed = False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == HISTORY_VERSION:
+            self.files = data['files']
+
+    def seconds_per_byte(self):
+        total_size = sum(size for size, _ in self.files.values())
+        if not total_size:
+            return DEFAULT_SECONDS_PER_BYTE
+        return sum(seconds for _, seconds in self.files.values()) / total_size
+
+    def predict(self, path, size, seconds_per_byte):
+        entry = self.files.get(path)
+        if entry is None:
+            return size * seconds_per_byte
+        old_size, seconds = entry
+        return seconds * size / old_size if old_size else seconds
+
+    def record(self, path, size, seconds):
+        self.files[path] = [size, round(seconds, 6)]
+        self.changed = True
+
+    def save(self):
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = {'version': HISTORY_VERSION, 'files': self.files}
+        write_source_file(self.path, json.dumps(data, separators=(',', ':')))
+        self.changed = False
+
+def plan_batches(costs, jobs, max_batch_size):
+    """
+    Group task indexes into batches for a pool of jobs workers, most expensive first.
+    Costly files get a batch of their own and start right away, so no worker picks up
+    a huge file just as the others run out of work; the cheap tail is packed into
+    batches of up to max_batch_size files to keep the per-batch overhead down.
+    """
+    order = sorted(range(len(costs)), key=costs.__getitem__, reverse=True)
+    target = sum(costs) / (jobs * BATCHES_PER_WORKER)
+    batches = []
+    current, current_cost = [], 0.0
+    for index in order:
+        if current and (current_cost + costs[index] > target or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_cost = [], 0.0
+        current.append(index)
+        current_cost += costs[index]
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from src.lexing.logic.results import decode_results, encode_results
+
+# Part of every key; bump it when the stored layout changes so old entries just miss
+CACHE_FORMAT = 1
+
+# Requests the HTTP backend keeps in flight at once
+HTTP_CONNECTIONS = 8
+
+# Seconds before an HTTP request is given up on; a slow cache must not stall the run
+HTTP_TIMEOUT = 5.0
+
+@lru_cache(maxsize=None)
+def linter_digest(select=()):
+    # Results are only valid for the linter that produced them, so its code, and that of the
+    # plugin rules selected, is part of every key
+    if select:
+        from src.lexing.logic.plugins import plugins_digest
+        digest = hashlib.blake2b(linter_digest(), digest_size=16)
+        digest.update(plugins_digest(tuple(select)))
+        return digest.digest()
+    digest = hashlib.blake2b(str(CACHE_FORMAT).encode('ascii'), digest_size=16)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.py'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                digest.update(name.encode('utf-8'))
+                digest.update(f.read())
+    return digest.digest()
+
+def content_key(data, path, settings, linter_options):
+    """
+    Key for linting data (bytes or any buffer): a hash of the content, the linter options,
+    the run settings and the code of the linter and of the plugin rules selected, so it is
+    the same on every machine. The path only counts when fingerprints are asked for, since
+    they embed it.
+    """
+    context = {'fingerprints': settings['fingerprints'], 'options': linter_options or {}}
+    if settings['fingerprints']:
+        from src.lexing.logic.baseline import normalize_path
+        context['path'] = normalize_path(path)
+    digest = hashlib.blake2b(linter_digest(tuple(context['options'].get('select') or ())), digest_size=20)
+    # Sets such as exported_names are sorted so the key doesn't depend on hash order
+    digest.update(json.dumps(context, sort_keys=True, default=sorted).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(data)
+    return digest.hexdigest()
+
+def pack_result(result):
+    # Stored without the path, which differs between checkouts, in the packed encoding
+    return zlib.compress(encode_results([result._replace(path='', elapsed=0.0)]))
+
+def unpack_result(blob, path):
+    # None when the entry is damaged, which is then treated as a miss
+    try:
+        result, = decode_results(zlib.decompress(blob))
+    except (zlib.error, struct.error, ValueError, IndexError):
+        return None
+    return result._replace(path=path)
+
+class SharedCache(ABC):
+    """
+    Lint results stored under content keys by a backend that outlives the machine, so
+    fresh CI runners reuse what earlier jobs linted. Backends implement get_many, which
+    returns the entries found for a list of keys, and put_many, which stores a dict of
+    entries; both work in batches and swallow errors, since a cache must never fail a run.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def get_many(self, keys):
+        pass
+
+    @abstractmethod
+    def put_many(self, entries):
+        pass
+
+    def close(self):
+        pass
+
+class DirectoryCache(SharedCache):
+    # One file per key under root, e.g. on a volume the runners share; written atomically
+    def __init__(self, root):
+        super().__init__()
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get_many(self, keys):
+        found = {}
+        for key in keys:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    found[key] = f.read()
+            except OSError:
+                pass
+        return found
+
+    def put_many(self, entries):
+        import tempfile
+        for key, blob in entries.items():
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(prefix='.jay_lint-', suffix='.tmp', dir=os.path.dirname(path))
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(blob)
+                    os.replace(temp_path, path)
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
+            except OSError:
+                pass
+
+class HttpCache(SharedCache):
+    """
+    Results kept by an HTTP key/value server: GET url/<key> returns an entry (404 when
+    there is none) and PUT url/<key> stores one, which is what bazel-remote or nginx with
+    WebDAV provide. A batch is spread over a few keep-alive connections. After a request
+    fails twice the cache is switched off for the rest of the run, so an unreachable
+    server costs one timeout rather than one per file.
+    """
+    def __init__(self, url, connections=HTTP_CONNECTIONS, timeout=HTTP_TIMEOUT):
+        from urllib.parse import urlsplit
+        super().__init__()
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Not an HTTP cache URL: '{url}'")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.connections = connections
+        self.timeout = timeout
+        self.available = True
+        self._local = threading.local()
+        self._executor = None
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            import http.client
+            connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            connection = self._local.connection = connection_class(self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def _request(self, method, key, body=None):
+        # (status, body), or None when the server can't be reached
+        import http.client
+        # A kept-alive connection the server has since closed fails once, so retry on a new one
+        for _ in range(2):
+            if not self.available:
+                return None
+            connection = self._connection()
+            try:
+                connection.request(method, f"{self.prefix}/{key}", body=body)
+                response = connection.getresponse()
+                return response.status, response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                self._local.connection = None
+        self.available = False
+        return None
+
+    def _map(self, function, items):
+        if len(items) <= 1:
+            return [function(item) for item in items]
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(self.connections)
+        return list(self._executor.map(function, items))
+
+    def get_many(self, keys):
+        found = {}
+        for key, response in zip(keys, self._map(lambda key: self._request('GET', key), keys)):
+            if response is not None and response[0] == 200:
+                found[key] = response[1]
+        return found
+
+    def put_many(self, entries):
+        self._map(lambda item: self._request('PUT', item[0], item[1]), list(entries.items()))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+def open_shared_cache(location):
+    # An http(s):// URL selects the HTTP backend, anything else is a directory
+    if location.startswith(('http://', 'https://')):
+        return HttpCache(location)
+    return DirectoryCache(location)
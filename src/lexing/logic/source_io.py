@@ -0,0 +1,98 @@
+import os
+from codecs import BOM_UTF8
+
+# Files at least this large are memory-mapped instead of read into a bytes object
+MMAP_THRESHOLD = 1 << 20
+
+NOTEBOOK_SUFFIX = '.ipynb'
+
+# Files the command line lints: Python modules and Jupyter notebooks
+LINTED_SUFFIXES = ('.py', NOTEBOOK_SUFFIX)
+
+def read_source_bytes(file_path):
+    """
+    Return the raw content of file_path: bytes for small files, a read-only mmap for
+    files of MMAP_THRESHOLD bytes or more. Callers close the mmap when done.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return f.read()
+        import mmap
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def source_encoding(data):
+    """
+    The encoding of Python source in a buffer, following PEP 263: a UTF-8 BOM or a
+    coding cookie on one of the first two lines, else UTF-8.
+    """
+    finder = data if hasattr(data, 'find') else bytes(data)
+    end = finder.find(b'\n')
+    if end != -1:
+        end = finder.find(b'\n', end + 1)
+    head = bytes(data[:end + 1 if end != -1 else len(data)])
+    # Almost no file has a cookie, so tokenize is only imported for those that might
+    if b'coding' not in head:
+        return 'utf-8-sig' if head.startswith(BOM_UTF8) else 'utf-8'
+    import tokenize
+    lines = iter(head.splitlines(keepends=True))
+    return tokenize.detect_encoding(lambda: next(lines, b''))[0]
+
+def decode_source(data, encoding=None):
+    # Text of a source buffer, with newlines normalized like a file opened in text mode
+    text = str(data, encoding or source_encoding(data))
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def close_source(data):
+    # Release a buffer from read_source_bytes; plain bytes need nothing
+    if hasattr(data, 'close'):
+        data.close()
+
+def read_source_file(file_path):
+    data = read_source_bytes(file_path)
+    try:
+        return decode_source(data)
+    finally:
+        close_source(data)
+
+def write_source_file(file_path, source_code, encoding='utf-8'):
+    """
+    Replace file_path with source_code atomically: the new content is written to a
+    temporary file in the same directory and moved over the original with os.replace,
+    so a crash mid-write never leaves a truncated file behind. An existing file keeps
+    its mode.
+    """
+    import tempfile
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.jay_lint-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, newline='') as f:
+            f.write(source_code)
+        try:
+            mode = os.stat(file_path).st_mode & 0o7777
+        except FileNotFoundError:
+            # mkstemp creates the file as 0o600; a new file gets the mode open() would give it
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def iter_python_files(paths, suffixes=('.py',)):
+    # Expand directories into the files with one of suffixes they contain, in a stable order
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d != '__pycache__')
+                for name in sorted(files):
+                    if name.endswith(suffixes):
+                        yield os.path.join(root, name)
+        else:
+            yield path
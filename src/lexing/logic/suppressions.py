@@ -0,0 +1,130 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from token import COMMENT, DEDENT, ENCODING, ENDMARKER, INDENT, NEWLINE, NL, OP
+
+# Matches "# jay_lint: disable=JL301,JL202", "# jay_lint: enable=JL301" and "# jay_lint: disable-file=all"
+SUPPRESSION_PATTERN = r'#\s*jay_lint:\s*(disable|enable|disable-file)\s*=\s*([\w\-]+(?:\s*,\s*[\w\-]+)*)'
+
+# Pseudo code that matches every rule
+ALL_RULES = 'all'
+
+@lru_cache(maxsize=None)
+def suppression_pattern():
+    # Compiled on first use: most files have no suppression comments at all
+    return re.compile(SUPPRESSION_PATTERN)
+
+class SuppressionIndex:
+    """
+    Line ranges in which rule codes are silenced, built once from the comments in the
+    token stream. A disable comment after code silences that line only; on a line of its
+    own it silences the rest of the enclosing block, or up to a matching enable comment;
+    disable-file silences the code in the whole file.
+    """
+    def __init__(self, tokens, line_count):
+        self.file_codes = set()
+        # code -> (sorted interval starts, interval ends); intervals are merged and disjoint
+        self._intervals = {}
+
+        code_indents = self._code_indents(tokens)
+        ranges = {}
+        open_blocks = {}
+        for token in tokens:
+            if token.type != COMMENT:
+                continue
+            match = suppression_pattern().search(token.string)
+            if not match:
+                continue
+            action = match.group(1)
+            codes = [code.strip() for code in match.group(2).split(',')]
+            lineno, col = token.start
+            own_line = token.line[:col].strip() == ''
+
+            if action == 'disable-file':
+                self.file_codes.update(codes)
+            elif action == 'enable':
+                # Cut every open block for these codes short at the enable comment
+                for code in codes:
+                    for start, end in open_blocks.pop(code, []):
+                        ranges.setdefault(code, []).append((start, min(end, lineno)))
+            elif own_line:
+                end = self._block_end(code_indents, lineno, col, line_count)
+                for code in codes:
+                    open_blocks.setdefault(code, []).append((lineno, end))
+            else:
+                for code in codes:
+                    ranges.setdefault(code, []).append((lineno, lineno))
+
+        for code, blocks in open_blocks.items():
+            ranges.setdefault(code, []).extend(blocks)
+
+        for code, intervals in ranges.items():
+            self._intervals[code] = self._merge(intervals)
+
+    @staticmethod
+    def _code_indents(tokens):
+        # Sorted (line, indent) of the first token on every logical line of code
+        indents = []
+        at_line_start = True
+        depth = 0
+        for token in tokens:
+            if token.type == NEWLINE or (token.type == NL and depth == 0):
+                at_line_start = True
+                continue
+            if token.type == OP:
+                if token.string in '([{':
+                    depth += 1
+                elif token.string in ')]}':
+                    depth = max(depth - 1, 0)
+            if token.type in (COMMENT, NL, INDENT, DEDENT, ENCODING, ENDMARKER):
+                continue
+            elif at_line_start:
+                indents.append((token.start[0], token.start[1]))
+                at_line_start = False
+        return indents
+
+    @staticmethod
+    def _block_end(code_indents, lineno, col, line_count):
+        # The block ends just before the first later line of code indented less than the comment
+        start = bisect_right(code_indents, (lineno, float('inf')))
+        for code_line, indent in code_indents[start:]:
+            if indent < col:
+                return code_line - 1
+        return line_count
+
+    @staticmethod
+    def _merge(intervals):
+        intervals.sort()
+        starts, ends = [], []
+        for start, end in intervals:
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        return starts, ends
+
+    def _in_interval(self, code, lineno):
+        intervals = self._intervals.get(code)
+        if intervals is None:
+            return False
+        starts, ends = intervals
+        i = bisect_right(starts, lineno) - 1
+        return i >= 0 and lineno <= ends[i]
+
+    def mentions(self, code):
+        # False when no suppression comment names code or all, so none of its findings is silenced
+        return (
+            code in self.file_codes or ALL_RULES in self.file_codes
+            or code in self._intervals or ALL_RULES in self._intervals
+        )
+
+    def is_file_suppressed(self, code):
+        return code in self.file_codes or ALL_RULES in self.file_codes
+
+    def is_suppressed(self, code, lineno):
+        if self.is_file_suppressed(code):
+            return True
+        if not lineno:
+            return False
+        return self._in_interval(code, lineno) or self._in_interval(ALL_RULES, lineno)
@@ -0,0 +1,97 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from src.cli import main
+from src.lexing.logic import engine
+from src.lexing.logic.baseline import Baseline, fingerprint
+from src.lexing.logic.lexing import Diagnostic, JayLinter
+
+class TestBaseline(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def fingerprints(self, code, path='module.py'):
+        linter = JayLinter(code)
+        linter.lint()
+        return [fingerprint(diagnostic, path, linter.source_lines) for diagnostic in linter.diagnostics]
+
+    def test_fingerprint_ignores_line_shifts(self):
+        diagnostic = Diagnostic('JL301', 1, "Line 1 has trailing whitespace.")
+        shifted = Diagnostic('JL301', 3, "Line 3 has trailing whitespace.")
+        self.assertEqual(
+            fingerprint(diagnostic, 'module.py', ["a = 1 "]),
+            fingerprint(shifted, 'module.py', ["", "", "a = 1 "]),
+        )
+
+    def test_only_new_findings_are_kept(self):
+        baseline = Baseline()
+        baseline.add(self.fingerprints("a = 1 \n"))
+        new = self.fingerprints("a = 1 \nb = 2 \n")
+        kept = [new[i] for i in baseline.filter_new(new)]
+        # Everything about "b = 2" is new, and the end-of-file finding moved to its line
+        self.assertEqual(sorted(key.split('\t')[0] for key in kept), ['JL204', 'JL301', 'JL303', 'JL304'])
+
+    def test_duplicate_findings_are_counted(self):
+        baseline = Baseline()
+        baseline.add(['JL301\tmodule.py\tabc'])
+        self.assertEqual(baseline.filter_new(['JL301\tmodule.py\tabc', 'JL301\tmodule.py\tabc']), [1])
+
+    def test_save_and_load(self):
+        path = os.path.join(self.directory.name, 'baseline.txt')
+        baseline = Baseline()
+        baseline.add(['JL302\tb.py\t1', 'JL301\ta.py\t2', 'JL301\ta.py\t2'])
+        baseline.save(path)
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[1:], ['JL301\ta.py\t2\t2', 'JL302\tb.py\t1\t1'])
+        self.assertEqual(Baseline.load(path).counts, baseline.counts)
+
+    def test_apply_baseline_to_engine_results(self):
+        path = os.path.join(self.directory.name, 'module.py')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("a = 1 \n")
+        [result] = engine.run([path], fingerprints=True)
+        baseline = Baseline()
+        baseline.add(result.fingerprints)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\nb = 2\na = 1 \n")
+        [result] = engine.run([path], fingerprints=True)
+        result = engine.apply_baseline(result, baseline)
+        self.assertNotIn("Line 3 has trailing whitespace.", result.messages)
+        self.assertIn("The first line is empty.", result.messages)
+
+class TestBaselineCommandLine(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.source = os.path.join(self.directory.name, 'module.py')
+        with open(self.source, 'w', encoding='utf-8') as f:
+            f.write("a = 1 \n")
+
+    def assert_usage_error(self, *argv):
+        error = io.StringIO()
+        with redirect_stdout(io.StringIO()), redirect_stderr(error), self.assertRaises(SystemExit) as raised:
+            main(['-j', '1', *argv, self.source])
+        self.assertEqual(raised.exception.code, 2)
+        return error.getvalue()
+
+    def test_missing_baseline(self):
+        missing = os.path.join(self.directory.name, 'nope.txt')
+        self.assertIn("--baseline: could not read", self.assert_usage_error('--baseline', missing))
+
+    def test_malformed_baseline(self):
+        path = os.path.join(self.directory.name, 'baseline.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("# jay_lint baseline v1\nJL301\tmodule.py\tabc\tmany\n")
+        self.assertIn("line 2: not a baseline entry", self.assert_usage_error('--baseline', path))
+
+    def test_unwritable_baseline(self):
+        path = os.path.join(self.directory.name, 'missing', 'baseline.txt')
+        self.assertIn("--write-baseline: could not write", self.assert_usage_error('--write-baseline', path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from src import daemon
+
+UNUSED_IMPORT_CODE = """import os
+
+def my_function():
+    return "Hello, World!"
+"""
+
+CLEAN_CODE = """def my_function():
+    return "Hello, World!"
+"""
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.socket_path = os.path.join(self.directory.name, 'daemon.sock')
+        self.addCleanup(daemon.stop_daemon, self.socket_path)
+
+    def write(self, name, code):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(code)
+        return path
+
+    def run_client(self, *argv):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            status = daemon.run_client(list(argv), self.socket_path)
+        return status, output.getvalue()
+
+    def test_client_starts_daemon_and_relays_output(self):
+        path = self.write('a.py', UNUSED_IMPORT_CODE)
+        status, output = self.run_client(path)
+        self.assertEqual(status, 0)
+        self.assertTrue(output.startswith("Linting results:\n"))
+        self.assertIn("Import 'os' on line 1 is not used.", output)
+        self.assertTrue(os.path.exists(self.socket_path))
+
+    def test_daemon_sees_file_changes(self):
+        path = self.write('a.py', UNUSED_IMPORT_CODE)
+        self.run_client(path)
+        self.write('a.py', CLEAN_CODE)
+        _, output = self.run_client(path)
+        self.assertNotIn("Import 'os'", output)
+
+    def test_fix_through_daemon(self):
+        path = self.write('a.py', UNUSED_IMPORT_CODE)
+        _, output = self.run_client('--fix', path)
+        self.assertIn(f"Fixed and saved the file: {path} (1 pass)", output)
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), CLEAN_CODE)
+
+    def test_usage_errors_are_relayed(self):
+        status, _ = self.run_client('--jobs', 'many', 'a.py')
+        self.assertEqual(status, 2)
+
+    def test_client_environment_is_used(self):
+        path = self.write('a.py', UNUSED_IMPORT_CODE)
+        database = os.path.join(self.directory.name, 'results.db')
+        with mock.patch.dict(os.environ, {'JAY_LINT_RESULTS_DB': database}):
+            self.run_client(path)
+        # The daemon doesn't keep the previous client's value
+        with mock.patch.dict(os.environ):
+            os.environ.pop('JAY_LINT_RESULTS_DB', None)
+            self.run_client(path)
+
+        from src.lexing.logic.results_db import ResultsDatabase
+        results = ResultsDatabase(database)
+        self.addCleanup(results.close)
+        self.assertEqual(len(results.runs(10)), 1)
+
+    def test_stop(self):
+        path = self.write('a.py', CLEAN_CODE)
+        self.run_client(path)
+        self.assertTrue(daemon.stop_daemon(self.socket_path))
+        self.assertFalse(daemon.stop_daemon(self.socket_path))
+
+    def test_idle_timeout(self):
+        client = daemon.start_daemon(self.socket_path, idle_timeout=0.2)
+        self.assertIsNotNone(client)
+        client.close()
+        deadline = time.monotonic() + 5
+        while os.path.exists(self.socket_path) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(os.path.exists(self.socket_path))
+
+class TestSocketSafety(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_default_socket_is_in_a_private_directory(self):
+        with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': self.directory.name}):
+            path = daemon.default_socket_path()
+            directory = os.path.dirname(path)
+            self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+            os.chmod(directory, 0o755)
+            with self.assertRaises(PermissionError):
+                daemon.default_socket_path()
+
+    def test_lock_does_not_follow_symlinks(self):
+        target = os.path.join(self.directory.name, 'target')
+        with open(target, 'w') as f:
+            f.write("keep")
+        socket_path = os.path.join(self.directory.name, 'daemon.sock')
+        os.symlink(target, socket_path + '.lock')
+        with self.assertRaises(OSError):
+            daemon.LintDaemon(socket_path).serve()
+        with open(target) as f:
+            self.assertEqual(f.read(), "keep")
+
+    def test_sockets_of_other_users_are_refused(self):
+        socket_path = os.path.join(self.directory.name, 'daemon.sock')
+        open(socket_path, 'w').close()
+        with mock.patch.object(daemon.os, 'getuid', return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                daemon.run_client(['a.py'], socket_path)
+
+class TestResultCache(unittest.TestCase):
+    def test_oldest_entries_are_dropped(self):
+        cache = daemon.ResultCache()
+        for i in range(daemon.MAX_CACHED_RESULTS + 1):
+            cache[i] = i
+        self.assertEqual(len(cache), daemon.MAX_CACHED_RESULTS)
+        self.assertNotIn(0, cache)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from src.cli import main
+from src.lexing.logic.duplicates import DuplicateIndex, kgram_hashes, winnow
+from src.lexing.logic.lexing import JayLinter
+
+FILES = {
+    'pkg/parsing.py': """def parse_pairs(text, separator='='):
+    \"\"\"Split key=value lines into a dict.\"\"\"
+    result = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        key, _, value = line.partition(separator)
+        result[key.strip()] = value.strip()
+    return result
+
+def total(values):
+    return sum(values)
+""",
+    # The same function with other names, literals and docstring
+    'pkg/config.py': """def read_settings(content, sep=':'):
+    settings = {}
+    for row in content.splitlines():
+        row = row.strip()
+        if not row or row.startswith(';'):
+            continue
+        name, _, setting = row.partition(sep)
+        settings[name.strip()] = setting.strip()
+    return settings
+""",
+    'pkg/other.py': """def render(items, width):
+    lines = []
+    for index, item in enumerate(items):
+        if index % 2:
+            lines.append(str(item).rjust(width))
+        else:
+            lines.append(str(item).ljust(width))
+    while len(lines) < 3:
+        lines.append(' ' * width)
+    return '\\n'.join(lines)
+""",
+}
+
+class TestFingerprints(unittest.TestCase):
+    def test_kgram_hashes(self):
+        self.assertEqual(kgram_hashes([1, 2, 3], k=4), [])
+        hashes = kgram_hashes([1, 2, 3, 1, 2, 3], k=3)
+        self.assertEqual(len(hashes), 4)
+        self.assertEqual(hashes[0], hashes[3])
+
+    def test_winnow_keeps_the_minimum_of_every_window(self):
+        hashes = [5, 3, 9, 7, 1, 8, 6, 4]
+        self.assertEqual(winnow(hashes, window=3), {3, 1, 4})
+        self.assertEqual(winnow([2, 1], window=3), {1})
+        self.assertEqual(winnow([]), set())
+
+class TestDuplicateIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = self.directory.name
+        for name, code in FILES.items():
+            self.write(name, code)
+
+    def write(self, name, code):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(code)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def test_renamed_copies_find_each_other(self):
+        index = DuplicateIndex(self.root)
+        index.update(jobs=1)
+        self.assertEqual(index.duplicates(self.path('pkg/parsing.py')), [[1, 'parse_pairs', 'pkg/config.py', 1, 'read_settings']])
+        self.assertEqual(index.duplicates(self.path('pkg/config.py')), [[1, 'read_settings', 'pkg/parsing.py', 1, 'parse_pairs']])
+        self.assertEqual(index.duplicates(self.path('pkg/other.py')), [])
+
+    def test_nested_function_is_not_a_copy_of_its_parent(self):
+        code = "def outer():\n" + "".join("    " + line + "\n" for line in FILES['pkg/other.py'].splitlines())
+        code += "    return render\n"
+        self.write('pkg/other.py', code)
+        index = DuplicateIndex(self.root)
+        index.update(jobs=1)
+        self.assertEqual(index.duplicates(self.path('pkg/other.py')), [])
+
+    def test_duplicate_is_reported(self):
+        index = DuplicateIndex(self.root)
+        index.update(jobs=1)
+        linter = JayLinter(FILES['pkg/config.py'], **index.linter_options(self.path('pkg/config.py')))
+        self.assertIn(
+            "Function 'read_settings' on line 1 duplicates 'parse_pairs' in pkg/parsing.py on line 1.",
+            linter.lint(),
+        )
+
+    def test_update_is_incremental_and_persisted(self):
+        index = DuplicateIndex(self.root)
+        self.assertEqual(index.update(jobs=2), 3)
+        self.assertEqual(index.update(jobs=1), 0)
+
+        reloaded = DuplicateIndex(self.root)
+        self.assertEqual(reloaded.update(jobs=1), 0)
+        self.assertEqual(len(reloaded.duplicates(self.path('pkg/config.py'))), 1)
+
+        self.write('pkg/config.py', "def read_settings(content):\n    return dict(content)\n")
+        self.assertEqual(reloaded.update(jobs=1), 1)
+        self.assertEqual(reloaded.duplicates(self.path('pkg/parsing.py')), [])
+
+    def test_command_line(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main(['-j', '1', '--duplicates', self.root, self.path('pkg/parsing.py')])
+        self.assertIn("duplicates 'read_settings' in pkg/config.py on line 1.", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
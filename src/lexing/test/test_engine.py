@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from src.lexing.logic import engine
+from src.lexing.logic.source_io import iter_python_files, write_source_file
+
+UNUSED_IMPORT_CODE = """import os
+
+def my_function():
+    return "Hello, World!"
+"""
+
+CLEAN_CODE = """def my_function():
+    return "Hello, World!"
+"""
+
+class TestEngine(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, code):
+        path = os.path.join(self.directory.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(code)
+        return path
+
+    def read(self, path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_fix_rewrites_changed_file(self):
+        path = self.write('a.py', UNUSED_IMPORT_CODE)
+        [result] = engine.run([path], fix=True)
+        self.assertTrue(result.changed)
+        self.assertEqual(self.read(path), CLEAN_CODE)
+        self.assertEqual(os.listdir(self.directory.name), ['a.py'])
+
+    def test_fix_skips_unchanged_file(self):
+        path = self.write('a.py', CLEAN_CODE)
+        os.utime(path, (1000000000, 1000000000))
+        [result] = engine.run([path], fix=True)
+        self.assertFalse(result.changed)
+        self.assertEqual(os.stat(path).st_mtime, 1000000000)
+
+    def test_diff_does_not_write(self):
+        path = self.write('a.py', UNUSED_IMPORT_CODE)
+        [result] = engine.run([path], diff=True)
+        self.assertEqual(self.read(path), UNUSED_IMPORT_CODE)
+        self.assertIn(f"--- a/{path}", result.diff)
+        self.assertIn("-import os", result.diff)
+
+    def test_parallel_fix_keeps_input_order(self):
+        paths = [self.write(f'pkg/m{i}.py', UNUSED_IMPORT_CODE) for i in range(6)]
+        results = list(engine.run(paths, fix=True, jobs=2))
+        self.assertEqual([result.path for result in results], paths)
+        for path in paths:
+            self.assertEqual(self.read(path), CLEAN_CODE)
+
+    def test_syntax_error_is_reported_per_file(self):
+        broken = self.write('broken.py', "def broken(:\n")
+        clean = self.write('clean.py', CLEAN_CODE)
+        results = list(engine.run([broken, clean], jobs=1))
+        self.assertIsNotNone(results[0].error)
+        self.assertIsNone(results[1].error)
+
+    def test_iter_python_files_expands_directories(self):
+        self.write('pkg/a.py', CLEAN_CODE)
+        self.write('pkg/notes.txt', '')
+        self.write('pkg/__pycache__/a.py', CLEAN_CODE)
+        files = list(iter_python_files([self.directory.name]))
+        self.assertEqual(files, [os.path.join(self.directory.name, 'pkg', 'a.py')])
+
+    def test_write_source_file_keeps_permissions(self):
+        path = self.write('a.py', CLEAN_CODE)
+        os.chmod(path, 0o640)
+        write_source_file(path, UNUSED_IMPORT_CODE)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+        self.assertEqual(self.read(path), UNUSED_IMPORT_CODE)
+
+    def test_cache_reuses_results_of_unchanged_files(self):
+        path = self.write('a.py', UNUSED_IMPORT_CODE)
+        cache = {}
+        [first] = engine.run([path], cache=cache)
+        self.assertEqual(len(cache), 1)
+        [second] = engine.run([path], cache=cache)
+        self.assertIs(second.diagnostics, first.diagnostics)
+        self.assertEqual(second.elapsed, 0.0)
+
+        self.write('a.py', CLEAN_CODE)
+        os.utime(path, ns=(0, 0))
+        [third] = engine.run([path], cache=cache)
+        self.assertIsNot(third.diagnostics, first.diagnostics)
+        self.assertNotIn('JL202', [d.code for d in third.diagnostics])
+
+if __name__ == '__main__':
+    unittest.main()
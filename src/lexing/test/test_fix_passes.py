@@ -0,0 +1,113 @@
+import unittest
+from src.lexing.logic.lexing import JayLinter
+from src.lexing.logic.lines import LineTable
+
+class TestJayLinterFixPasses(unittest.TestCase):
+    def test_fix_removes_import_left_unused_by_removed_variable(self):
+        code = """
+import os
+
+def my_function():
+    path = os.getcwd()
+    return "done"
+"""
+        expected_fixed_code = """
+def my_function():
+    return "done"
+"""
+        linter = JayLinter(source_code=code)
+        passes = linter.fix()
+        self.assertEqual(linter.source_code.strip(), expected_fixed_code.strip())
+        # The second pass deletes nothing that anything read, so no confirming pass follows
+        self.assertEqual(passes, 2)
+        self.assertEqual(linter.fix_passes, 2)
+
+    def test_fix_stops_at_max_passes(self):
+        code = """
+import os
+
+def my_function():
+    path = os.getcwd()
+    return "done"
+"""
+        linter = JayLinter(source_code=code)
+        passes = linter.fix(max_passes=1)
+        self.assertEqual(passes, 1)
+        self.assertIn("import os", linter.source_code)
+
+    def test_fix_keeps_messages_of_original_source(self):
+        code = """
+import os
+
+def my_function():
+    path = os.getcwd()
+    return "done"
+"""
+        linter = JayLinter(source_code=code)
+        linter.fix()
+        self.assertIn("Variable 'path' assigned on line 5 is not used.", linter.messages)
+
+    def test_fix_without_cascade_runs_one_pass(self):
+        code = """
+import os
+
+def my_function(unused, value=os.sep):
+    extra = len(value)
+    return value
+"""
+        linter = JayLinter(source_code=code)
+        # The deleted assignment and parameter only read names that are still read elsewhere
+        self.assertEqual(linter.fix(), 1)
+        self.assertIn("import os", linter.source_code)
+        self.assertNotIn("extra", linter.source_code)
+
+    def test_fix_after_deleted_default_removes_import(self):
+        code = """
+import os
+
+def my_function(unused=os.sep):
+    return "done"
+"""
+        linter = JayLinter(source_code=code)
+        self.assertEqual(linter.fix(), 2)
+        self.assertEqual(linter.source_code, 'def my_function():\n    return "done"')
+
+    def test_fix_keeps_self_after_its_last_use_is_deleted(self):
+        code = """
+class A:
+    def __init__(self, unused):
+        self.x = 1
+        return None
+"""
+        linter = JayLinter(source_code=code)
+        linter.fix()
+        self.assertIn("def __init__(self):", linter.source_code)
+        self.assertNotIn("unused", linter.source_code)
+
+    def test_line_table_follows_the_fixes(self):
+        code = """
+import os
+import sys
+
+class Greeter:
+    def greet(self, name, unused):
+
+        return name
+def other(value):
+    path = os.getcwd()
+    return value
+"""
+        linter = JayLinter(source_code=code)
+        linter.fix()
+        lines = linter.source_code.splitlines()
+        self.assertEqual(linter.line_table.flags, LineTable(lines).flags)
+        self.assertEqual(list(linter.line_table.indent), list(LineTable(lines).indent))
+
+    def test_fix_clean_code_runs_one_pass(self):
+        code = """def my_function():
+    return "done\""""
+        linter = JayLinter(source_code=code)
+        self.assertEqual(linter.fix(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
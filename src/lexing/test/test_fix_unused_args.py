@@ -49,6 +49,69 @@ def my_function(used_arg):
         fixed_code = self.fix_code(code)
         self.assertEqual(fixed_code.strip(), expected_fixed_code.strip())
     
+    def test_fix_removes_unused_argument_from_multiline_signature(self):
+        code = """
+def my_function(
+    used_arg: int,
+    unused_arg: str = ",",  # explained
+    other: dict = {"a": (1, 2)},
+):
+    return used_arg + other
+"""
+        expected_fixed_code = """
+def my_function(
+    used_arg: int,
+    other: dict = {"a": (1, 2)},
+):
+    return used_arg + other
+"""
+        fixed_code = self.fix_code(code)
+        self.assertEqual(fixed_code.strip(), expected_fixed_code.strip())
+
+    def test_fix_keeps_star_for_keyword_only_arguments(self):
+        code = """
+def my_function(used_arg, unused: dict = {"a, b": 1}, *args, key=None, **kwargs):
+    return used_arg + key
+"""
+        expected_fixed_code = """
+def my_function(used_arg, *, key=None):
+    return used_arg + key
+"""
+        fixed_code = self.fix_code(code)
+        self.assertEqual(fixed_code.strip(), expected_fixed_code.strip())
+
+    def test_fix_drops_markers_with_nothing_left_to_mark(self):
+        code = """
+def my_function(unused, /, used_arg, *, other=None):
+    return used_arg
+"""
+        expected_fixed_code = """
+def my_function(used_arg):
+    return used_arg
+"""
+        fixed_code = self.fix_code(code)
+        self.assertEqual(fixed_code.strip(), expected_fixed_code.strip())
+
+    def test_fix_removes_every_argument_of_multiline_signature(self):
+        code = """
+class MyClass:
+    def myMethod(
+        self,
+        unused,
+    ):
+        return self
+"""
+        expected_fixed_code = """
+class MyClass:
+
+    def myMethod(
+        self,
+    ):
+        return self
+"""
+        fixed_code = self.fix_code(code)
+        self.assertEqual(fixed_code.strip(), expected_fixed_code.strip())
+    
     def test_fix_removes_unused_variables_3_variables(self):
         code = """
 def my_function():
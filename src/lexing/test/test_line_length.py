@@ -24,3 +24,9 @@ class myClass:
     """
         message = self.lint_code(code)
         self.assertIn("Line 4 exceeds the maximum line length of 100 characters.", message)
+
+    def test_limit_is_inclusive(self):
+        code = "x = '" + "a" * 94 + "'\n" + "y = '" + "a" * 95 + "'\n"
+        messages = self.lint_code(code)
+        self.assertNotIn("Line 1 exceeds the maximum line length of 100 characters.", messages)
+        self.assertIn("Line 2 exceeds the maximum line length of 100 characters.", messages)
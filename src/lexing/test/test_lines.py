@@ -0,0 +1,37 @@
+import unittest
+from src.lexing.logic.lines import LineTable
+
+class TestLineTable(unittest.TestCase):
+    def test_flags(self):
+        lines = [
+            "import os",
+            "",
+            "class MyClass:",
+            "    def method(self):",
+            "        from sys import path",
+            "        return path",
+            "    returned_value = 1",
+        ]
+        table = LineTable(lines)
+        self.assertEqual(len(table), 7)
+        self.assertTrue(table.is_import(0))
+        self.assertTrue(table.is_blank(1))
+        self.assertTrue(table.is_class(2))
+        self.assertTrue(table.is_def(3))
+        self.assertTrue(table.is_import(4))
+        self.assertTrue(table.is_return(5))
+        self.assertFalse(table.is_return(6))
+
+    def test_indent(self):
+        table = LineTable(["def f():", "    return 1", "   "])
+        self.assertEqual(list(table.indent), [0, 4, 3])
+        self.assertTrue(table.is_blank(2))
+
+    def test_from_flags(self):
+        lines = ["import os", "", "def f():", "    return os"]
+        table = LineTable.from_flags(lines, LineTable(lines).flags)
+        self.assertEqual(list(table.indent), [0, 0, 0, 4])
+        self.assertTrue(table.is_def(2))
+
+if __name__ == '__main__':
+    unittest.main()
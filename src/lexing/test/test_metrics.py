@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from src.cli import main
+from src.lexing.logic import engine
+from src.lexing.logic.metrics import RULE_TIME_BUCKETS, RuleTimings, RunMetrics
+
+CODE = "import os\n\ndef f(a):\n    return 1\n"
+
+class TestRuleTimings(unittest.TestCase):
+    def test_add_and_merge(self):
+        first = RuleTimings()
+        first.add('line_length', 0.00005)
+        first.add('line_length', 2.0)
+        first.lines = 10
+        second = RuleTimings()
+        second.add('line_length', 0.002)
+        second.add('parse', 0.02)
+        second.lines = 5
+        first.merge(second)
+
+        counts, seconds = first.rules['line_length']
+        self.assertEqual(counts[0], 1)
+        self.assertEqual(counts[RULE_TIME_BUCKETS.index(0.005)], 1)
+        self.assertEqual(counts[-1], 1)
+        self.assertAlmostEqual(seconds, 2.00205)
+        self.assertIn('parse', first.rules)
+        self.assertEqual(first.lines, 15)
+
+class TestRunMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp.name, f"file{i}.py")
+            with open(path, 'w') as f:
+                f.write(CODE)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_with_metrics(self, jobs, cache=None):
+        metrics = RunMetrics(engine.worker_count(jobs, len(self.paths)))
+        for result in engine.run(self.paths, jobs=jobs, cache=cache, metrics=metrics):
+            metrics.add_result(result)
+        metrics.wall = 1.0
+        return metrics
+
+    def test_single_process(self):
+        snapshot = self.run_with_metrics(jobs=1).snapshot()
+        self.assertEqual(snapshot['files'], 3)
+        self.assertEqual(snapshot['lines'], 12)
+        self.assertEqual(snapshot['lines_per_second'], 12.0)
+        self.assertEqual(snapshot['rules']['traversal']['count'], 3)
+        self.assertEqual(snapshot['rules']['unused_imports']['buckets']['+Inf'], 3)
+
+    def test_workers_send_timings_back(self):
+        snapshot = self.run_with_metrics(jobs=2).snapshot()
+        self.assertEqual(snapshot['workers'], 2)
+        self.assertEqual(snapshot['lines'], 12)
+        self.assertEqual(snapshot['rules']['parse']['count'], 3)
+        self.assertGreater(snapshot['worker_utilization'], 0)
+
+    def test_cache_hits(self):
+        cache = {}
+        self.run_with_metrics(jobs=1, cache=cache)
+        metrics = self.run_with_metrics(jobs=1, cache=cache)
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (3, 0))
+        self.assertEqual(metrics.rule_timings.lines, 0)
+
+    def test_cli_writes_both_formats(self):
+        prom = os.path.join(self.tmp.name, 'lint.prom')
+        report = os.path.join(self.tmp.name, 'lint.json')
+        with redirect_stdout(io.StringIO()):
+            main(['-j', '1', '--metrics', prom, '--metrics', report] + self.paths)
+        with open(report) as f:
+            self.assertEqual(json.load(f)['files'], 3)
+        with open(prom) as f:
+            text = f.read()
+        self.assertIn("jay_lint_files_total 3\n", text)
+        self.assertIn('jay_lint_rule_seconds_count{rule="line_length"} 3\n', text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+if __name__ == '__main__':
+    unittest.main()
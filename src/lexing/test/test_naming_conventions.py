@@ -14,7 +14,7 @@ class MySecondClass:
     pass
     """
         message = self.lint_code(code)
-        self.assertIn("Line 2: Class 'myClass:' should use upper camel case.", message)
+        self.assertIn("Line 2: Class 'myClass' should use upper camel case.", message)
 
     def test_case_conventions_function(self):
         code = """
@@ -25,3 +25,64 @@ def mySecond_method():
     """
         message = self.lint_code(code)
         self.assertIn("Line 4: Method 'mySecond_method' should use lower camel case.", message)
+
+    def test_case_conventions_async_function(self):
+        code = """
+async def fetch_data():
+    pass
+    """
+        message = self.lint_code(code)
+        self.assertIn("Line 2: Method 'fetch_data' should use lower camel case.", message)
+
+    def test_case_conventions_decorated_one_liner_and_multi_line_signature(self):
+        code = """
+@decorator
+def one_liner(): pass
+def multi_line(
+    a,
+):
+    return a
+    """
+        message = self.lint_code(code)
+        self.assertIn("Line 3: Method 'one_liner' should use lower camel case.", message)
+        self.assertIn("Line 4: Method 'multi_line' should use lower camel case.", message)
+
+    def test_case_conventions_nested_and_methods(self):
+        code = """
+class MyFirstClass:
+    def __init__(self):
+        pass
+    def my_method(self):
+        def inner_helper():
+            pass
+        return inner_helper
+    """
+        message = self.lint_code(code)
+        self.assertIn("Line 5: Method 'my_method' should use lower camel case.", message)
+        self.assertIn("Line 6: Method 'inner_helper' should use lower camel case.", message)
+        self.assertFalse(any("'__init__' should use" in m for m in message))
+
+    def test_configurable_conventions(self):
+        code = """
+class MyFirstClass:
+    def my_method(self):
+        pass
+def myFunction():
+    pass
+    """
+        linter = JayLinter(source_code=code, naming_conventions={'method': 'snake_case', 'function': 'snake_case'})
+        message = linter.lint()
+        self.assertFalse(any("'my_method' should use" in m for m in message))
+        self.assertIn("Line 5: Method 'myFunction' should use snake case.", message)
+
+    def test_disabled_convention(self):
+        code = """
+class myClass:
+    pass
+    """
+        linter = JayLinter(source_code=code, naming_conventions={'class': None})
+        self.assertFalse(any("'myClass' should use" in m for m in linter.lint()))
+
+    def test_unknown_convention(self):
+        with self.assertRaises(ValueError):
+            JayLinter(source_code="", naming_conventions={'class': 'kebab_case'})
@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from src.cli import main
+from src.lexing.logic.notebooks import code_cells, lint_notebook, python_source
+from src.lexing.logic.shared_cache import DirectoryCache
+
+def notebook(*cells):
+    return json.dumps({'cells': list(cells), 'metadata': {}, 'nbformat': 4, 'nbformat_minor': 5}, indent=1).encode()
+
+def code(source, outputs=()):
+    return {'cell_type': 'code', 'execution_count': None, 'metadata': {}, 'outputs': list(outputs), 'source': source}
+
+def markdown(source):
+    return {'cell_type': 'markdown', 'metadata': {}, 'source': source}
+
+# An output full of what the scanner must step over: escaped quotes, backslashes and brackets
+NOISY_OUTPUT = {'output_type': 'stream', 'name': 'stdout', 'text': ['a "quoted" \\ line } ] {\n'] * 50}
+
+class TestCodeCells(unittest.TestCase):
+    def test_extracts_code_cells_only(self):
+        data = notebook(
+            markdown(["# Title\n"]),
+            code(["import os\n", "print(os.sep)"], [NOISY_OUTPUT]),
+            code("x = '\\\"'\n"),
+        )
+        self.assertEqual(code_cells(data), [(2, "import os\nprint(os.sep)"), (3, "x = '\\\"'\n")])
+
+    def test_rejects_other_json(self):
+        with self.assertRaises(ValueError):
+            code_cells(b'{"worksheets": []}')
+        with self.assertRaises(ValueError):
+            code_cells(b'{"cells": [')
+
+    def test_magics(self):
+        self.assertEqual(python_source("%matplotlib inline\nif x:\n    !ls\n"), "#matplotlib inline\nif x:\n    #ls\n")
+        self.assertIsNone(python_source("%%bash\nls\n"))
+
+class TestLintNotebook(unittest.TestCase):
+    def test_findings_name_their_cell(self):
+        data = notebook(
+            code(["import os\n", "import sys\n", "value = 1 \n"]),
+            markdown("Text"),
+            code("print(value, os.sep)\n"),
+            code("def broken(:\n"),
+        )
+        result = lint_notebook(data, 'analysis.ipynb')
+        self.assertIsNone(result.error)
+        self.assertIn("Cell 1: Line 3 has trailing whitespace.", result.messages)
+        self.assertIn("Cell 1: Import 'sys' on line 2 is not used.", result.messages)
+        # Used by a later cell
+        self.assertNotIn("Cell 1: Import 'os' on line 1 is not used.", result.messages)
+        self.assertFalse(any("Variable 'value'" in message for message in result.messages))
+        self.assertIn(('JL301', 3, "Cell 1: Line 3 has trailing whitespace."), result.diagnostics)
+        self.assertEqual(result.diagnostics[-1].code, 'JL001')
+        self.assertTrue(result.messages[-1].startswith("Cell 4: could not be parsed:"))
+
+    def test_fingerprints_line_up_with_diagnostics(self):
+        data = notebook(code("import os \n"), code("def broken(:\n"))
+        result = lint_notebook(data, 'analysis.ipynb', fingerprints=True)
+        self.assertEqual(len(result.fingerprints), len(result.diagnostics))
+
+    def test_only_changed_cells_are_linted_again(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cells = [code("import os\n"), code("import sys\n"), code("import json\n")]
+            cache = DirectoryCache(directory)
+            first = lint_notebook(notebook(*cells), 'analysis.ipynb', cell_cache=cache)
+            self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+            cells[1] = code("import re\n")
+            cache = DirectoryCache(directory)
+            second = lint_notebook(notebook(*cells), 'analysis.ipynb', cell_cache=cache)
+            self.assertEqual((cache.hits, cache.misses), (2, 1))
+            self.assertEqual(first.messages[0], second.messages[0])
+            self.assertIn("Cell 2: Import 're' on line 1 is not used.", second.messages)
+
+class TestNotebookCommandLine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.dict(os.environ, {'XDG_CACHE_HOME': os.path.join(self.tmp.name, 'cache')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = os.path.join(self.tmp.name, 'analysis.ipynb')
+        with open(self.path, 'wb') as f:
+            f.write(notebook(code("import os\n", [NOISY_OUTPUT])))
+
+    def run_main(self, *args):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main(['-j', '1', *args])
+        return output.getvalue()
+
+    def test_directories_include_notebooks(self):
+        self.assertIn("- Cell 1: Import 'os' on line 1 is not used.", self.run_main(self.tmp.name))
+
+    def test_fix_leaves_notebooks_alone(self):
+        with open(self.path, 'rb') as f:
+            before = f.read()
+        self.assertIn("No changes needed", self.run_main('--fix', self.path))
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), before)
+
+if __name__ == '__main__':
+    unittest.main()
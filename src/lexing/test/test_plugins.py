@@ -0,0 +1,163 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from src.cli import main
+from src.lexing.logic import engine
+from src.lexing.logic.lexing import JayLinter
+from src.lexing.logic.plugins import load_rules, plugins_digest
+from src.lexing.logic.shared_cache import content_key, linter_digest
+
+RULES_MODULE = '''
+import ast
+from src.lexing.logic.plugins import Rule
+
+class NoPrint(Rule):
+    node_types = (ast.Call,)
+
+    def visit_node(self, linter, node):
+        if isinstance(node.func, ast.Name) and node.func.id == 'print':
+            linter.report(self.code, node.lineno, f"Line {node.lineno} calls print().")
+
+class NoTodo(Rule):
+    def check_line(self, linter, lineno, line):
+        if 'TODO' in line:
+            linter.report(self.code, lineno, f"Line {lineno} has a TODO.")
+
+class NoTabs(Rule):
+    def fix(self, linter):
+        return linter.source_code.replace('\\t', '    ')
+'''
+
+# Importing this module shows a rule was loaded although it was not selected
+OTHER_MODULE = '''
+from src.lexing.logic.plugins import Rule
+
+class Other(Rule):
+    pass
+'''
+
+ENTRY_POINTS = '''[jay_lint.rules]
+ACME101 = acme_rules:NoPrint
+ACME102 = acme_rules:NoTodo
+ACME201 = acme_rules:NoTabs
+OTHER101 = acme_other:Other
+BROKEN101 = acme_rules:Missing
+'''
+
+CODE = """# Greets
+def greet(name):
+    # TODO: localise
+    print(name)
+    return name
+"""
+
+class TestPlugins(unittest.TestCase):
+    def setUp(self):
+        # Install a package with rule entry points by putting its dist-info on sys.path
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.root = root
+        for name, text in (('acme_rules.py', RULES_MODULE), ('acme_other.py', OTHER_MODULE)):
+            with open(os.path.join(root, name), 'w') as f:
+                f.write(text)
+        dist_info = os.path.join(root, 'acme_rules-1.0.dist-info')
+        os.mkdir(dist_info)
+        with open(os.path.join(dist_info, 'METADATA'), 'w') as f:
+            f.write("Metadata-Version: 2.1\nName: acme_rules\nVersion: 1.0\n")
+        with open(os.path.join(dist_info, 'entry_points.txt'), 'w') as f:
+            f.write(ENTRY_POINTS)
+        sys.path.insert(0, root)
+        self.clear_caches()
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        for module in ('acme_rules', 'acme_other'):
+            sys.modules.pop(module, None)
+        self.clear_caches()
+        self.tmp.cleanup()
+
+    def clear_caches(self):
+        for cached in (load_rules, plugins_digest, linter_digest):
+            cached.cache_clear()
+
+    def edit(self, name, old, new):
+        path = os.path.join(self.root, name)
+        with open(path) as f:
+            text = f.read()
+        with open(path, 'w') as f:
+            f.write(text.replace(old, new))
+        sys.modules.pop('acme_rules', None)
+        self.clear_caches()
+
+    def test_cache_key_follows_selected_plugins(self):
+        settings = {'fix': False, 'diff': False, 'fingerprints': False}
+        def key():
+            return content_key(CODE.encode(), 'greet.py', settings, {'select': ('ACME101',)})
+
+        first = key()
+        self.assertNotEqual(first, content_key(CODE.encode(), 'greet.py', settings, None))
+        # A new version of the plugin, or new code under the same version, gives new keys
+        self.edit('acme_rules-1.0.dist-info/METADATA', "Version: 1.0", "Version: 1.1")
+        second = key()
+        self.assertNotEqual(first, second)
+        self.edit('acme_rules.py', "calls print()", "prints")
+        self.assertNotEqual(second, key())
+        # Rules that aren't selected don't count
+        before = content_key(CODE.encode(), 'greet.py', settings, {'select': ('OTHER',)})
+        self.edit('acme_rules.py', "has a TODO", "has a todo")
+        self.assertEqual(before, content_key(CODE.encode(), 'greet.py', settings, {'select': ('OTHER',)}))
+
+    def test_only_selected_rules_are_loaded(self):
+        rules = load_rules(('ACME1',))
+        self.assertEqual(rules.codes, {'ACME101', 'ACME102'})
+        self.assertNotIn('acme_other', sys.modules)
+
+    def test_node_and_line_rules(self):
+        linter = JayLinter(CODE, select=['ACME1'])
+        messages = linter.lint()
+        self.assertIn("Line 4 calls print().", messages)
+        self.assertIn("Line 3 has a TODO.", messages)
+        self.assertIn(('ACME101', 4), [(d.code, d.line) for d in linter.diagnostics])
+
+    def test_plugin_rules_are_off_unless_selected(self):
+        self.assertNotIn("Line 4 calls print().", JayLinter(CODE).lint())
+
+    def test_suppression_comments_apply(self):
+        code = CODE.replace("print(name)", "print(name)  # jay_lint: disable=ACME101")
+        self.assertNotIn("Line 4 calls print().", JayLinter(code, select=['ACME']).lint())
+        code = "# jay_lint: disable-file=ACME101\n" + CODE
+        self.assertNotIn("Line 5 calls print().", JayLinter(code, select=['ACME']).lint())
+
+    def test_fixer(self):
+        linter = JayLinter("# Greets\ndef greet(name):\n\treturn name\n", select=['ACME201'])
+        linter.fix()
+        self.assertIn("\n    return name", linter.source_code)
+        self.assertNotIn("\t", linter.source_code)
+
+    def test_broken_plugin_raises(self):
+        with self.assertRaises(ValueError):
+            load_rules(('BROKEN',))
+
+    def test_engine_and_cli(self):
+        path = os.path.join(self.tmp.name, 'greet.py')
+        with open(path, 'w') as f:
+            f.write(CODE)
+        result, = engine.run([path], jobs=1, options={path: {'select': ('ACME101',)}})
+        self.assertIn("Line 4 calls print().", result.messages)
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            main(['--select', 'ACME101', path])
+        self.assertIn("- Line 4 calls print().", out.getvalue())
+
+    def test_cli_rejects_unknown_selection(self):
+        err = io.StringIO()
+        with redirect_stderr(err), self.assertRaises(SystemExit):
+            main(['--select', 'NOPE', __file__])
+        self.assertIn("no rule code starts with 'NOPE'", err.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from src.lexing.logic.lexing import JayLinter
+from src.lexing.logic.project import ProjectIndex
+
+FILES = {
+    'pkg/__init__.py': """from .core import helper
+from .core import spare
+""",
+    'pkg/core.py': """import os
+
+def helper():
+    return os.getcwd()
+
+def spare():
+    return 1
+
+def orphan():
+    return 2
+
+def usedLocally():
+    return 3
+
+VALUE = usedLocally()
+""",
+    'app.py': """import pkg.core
+from pkg import helper
+
+def main():
+    return helper() + pkg.core.VALUE
+""",
+}
+
+class TestProjectIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = self.directory.name
+        for name, code in FILES.items():
+            self.write(name, code)
+
+    def write(self, name, code):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(code)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def test_reexports_are_exported(self):
+        index = ProjectIndex(self.root)
+        index.update(jobs=1)
+        self.assertIn('helper', index.exported_names(self.path('pkg/__init__.py')))
+        self.assertNotIn('spare', index.exported_names(self.path('pkg/__init__.py')))
+
+    def test_unused_symbols_follow_reexports(self):
+        index = ProjectIndex(self.root)
+        index.update(jobs=1)
+        unused = index.unused_symbols(self.path('pkg/core.py'))
+        self.assertEqual(unused, {'spare': 6, 'orphan': 9})
+
+    def test_fix_keeps_reexported_import(self):
+        index = ProjectIndex(self.root)
+        index.update(jobs=1)
+        linter = JayLinter(FILES['pkg/__init__.py'], **index.linter_options(self.path('pkg/__init__.py')))
+        linter.fix()
+        self.assertIn("from .core import helper", linter.source_code)
+        self.assertNotIn("spare", linter.source_code)
+
+    def test_unused_symbol_is_reported(self):
+        index = ProjectIndex(self.root)
+        index.update(jobs=1)
+        linter = JayLinter(FILES['pkg/core.py'], **index.linter_options(self.path('pkg/core.py')))
+        messages = linter.lint()
+        self.assertIn("'orphan' defined on line 9 is not used anywhere in the project.", messages)
+        self.assertFalse(any("'helper' defined" in message for message in messages))
+
+    def test_update_is_incremental_and_persisted(self):
+        index = ProjectIndex(self.root)
+        self.assertEqual(index.update(jobs=2), 3)
+        self.assertEqual(index.update(jobs=1), 0)
+
+        reloaded = ProjectIndex(self.root)
+        self.assertEqual(reloaded.update(jobs=1), 0)
+
+        self.write('app.py', "from pkg.core import orphan\n\norphan()\n")
+        os.remove(self.path('pkg/__init__.py'))
+        self.assertEqual(reloaded.update(jobs=1), 1)
+        self.assertNotIn('pkg/__init__.py', reloaded.files)
+        self.assertEqual(reloaded.unused_symbols(self.path('pkg/core.py')), {'helper': 3, 'spare': 6})
+
+    def test_other_versions_and_broken_files(self):
+        index = ProjectIndex(self.root)
+        index.update(jobs=1)
+        index.version += 1
+        index.save()
+        # An index written by another version is rebuilt rather than misread
+        reloaded = ProjectIndex(self.root)
+        self.assertEqual(reloaded.files, {})
+        self.write('app.py', "def broken(:\n")
+        self.assertEqual(reloaded.update(jobs=1), 3)
+        self.assertNotIn('app.py', reloaded.files)
+        self.assertIn('app.py', reloaded.errors)
+
+    def test_dunder_all_counts_as_used(self):
+        code = """from .core import helper
+
+__all__ = ['helper']
+"""
+        linter = JayLinter(code)
+        linter.lint()
+        self.assertEqual(linter.unused_imports, set())
+
+if __name__ == '__main__':
+    unittest.main()
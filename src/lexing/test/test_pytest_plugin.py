@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import pytest
+from src import pytest_plugin
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# The blank-line layout rules are off so the file lints clean
+CLEAN_CODE = "# jay_lint: disable-file=JL303,JL304\n# Returns one\ndef f():\n    return 1\n"
+
+def run_pytest(directory, *args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    command = [sys.executable, '-m', 'pytest', '-p', 'src.pytest_plugin', '-q', '-rs', *args]
+    return subprocess.run(command, env=env, cwd=directory, capture_output=True, text=True).stdout
+
+class TestPytestPlugin(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clean = os.path.join(self.tmp.name, 'clean.py')
+        with open(self.clean, 'w') as f:
+            f.write(CLEAN_CODE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_findings_fail_the_item(self):
+        with open(os.path.join(self.tmp.name, 'unused.py'), 'w') as f:
+            f.write("import os\n")
+        output = run_pytest(self.tmp.name, '--jay-lint')
+        self.assertIn("1 failed, 1 passed", output)
+        self.assertIn("unused.py::jay-lint", output)
+        self.assertIn("Import 'os' on line 1 is not used.", output)
+
+    def test_unchanged_files_are_skipped(self):
+        self.assertIn("1 passed", run_pytest(self.tmp.name, '--jay-lint'))
+        self.assertIn("previously passed jay-lint checks", run_pytest(self.tmp.name, '--jay-lint'))
+
+        with open(self.clean, 'w') as f:
+            f.write(CLEAN_CODE + "import os\n")
+        self.assertIn("1 failed", run_pytest(self.tmp.name, '--jay-lint'))
+
+    def test_off_without_option(self):
+        self.assertIn("no tests ran", run_pytest(self.tmp.name))
+
+class TestWorkerResults(unittest.TestCase):
+    def make_config(self, **attributes):
+        config = SimpleNamespace(stash=pytest.Stash(), **attributes)
+        state = SimpleNamespace(passed={}, save=lambda: self.saved.append(dict(state.passed)))
+        config.stash[pytest_plugin._state_key] = state
+        return config, state
+
+    def setUp(self):
+        self.saved = []
+
+    def test_workers_hand_results_to_the_controller(self):
+        worker_config, worker_state = self.make_config(workeroutput={})
+        worker_state.passed['a.py'] = [1, 2, 'settings']
+        pytest_plugin.pytest_sessionfinish(SimpleNamespace(config=worker_config))
+        self.assertEqual(self.saved, [])
+
+        controller_config, _ = self.make_config()
+        node = SimpleNamespace(config=controller_config, workeroutput=worker_config.workeroutput)
+        pytest_plugin.pytest_testnodedown(node, None)
+        pytest_plugin.pytest_sessionfinish(SimpleNamespace(config=controller_config))
+        self.assertEqual(self.saved, [{'a.py': [1, 2, 'settings']}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from src.cli import main
+from src.lexing.logic import engine
+from src.lexing.logic.lexing import JayLinter
+from src.lexing.logic.recovery import recover_module, statement_starts
+
+BROKEN_CODE = """import os
+import sys
+
+def broken(:
+    return os.sep
+
+value = 1 
+# Reads the path
+def ok():
+    return sys.path
+"""
+
+class TestStatementStarts(unittest.TestCase):
+    def test_clauses_and_decorators_stay_with_their_statement(self):
+        lines = "@decorator\ndef f():\n    pass\nif a:\n    pass\nelse:\n    pass\n# Comment\nx = [a\nfor a in b]\n".splitlines()
+        self.assertEqual(statement_starts(lines), [1, 4, 9])
+
+    def test_open_bracket_stops_at_next_statement_keyword(self):
+        lines = "call(\n\ndef f():\n    pass\n".splitlines()
+        self.assertEqual(statement_starts(lines), [1, 3])
+
+class TestRecoverModule(unittest.TestCase):
+    def test_broken_statements_are_left_out(self):
+        recovered = recover_module(BROKEN_CODE.splitlines())
+        self.assertEqual(recovered.errors, [(4, 'invalid syntax')])
+        self.assertEqual([node.lineno for node in recovered.tree.body], [1, 2, 7, 9])
+        self.assertIn('os', recovered.names)
+
+    def test_unterminated_string(self):
+        recovered = recover_module('text = """never closed\n\ndef f():\n    return 1\n'.splitlines())
+        self.assertEqual(len(recovered.errors), 1)
+        self.assertEqual([node.lineno for node in recovered.tree.body], [3])
+
+class TestRecoveringLinter(unittest.TestCase):
+    def test_rules_run_on_the_rest_of_the_file(self):
+        linter = JayLinter(BROKEN_CODE, recover=True)
+        messages = linter.lint()
+        self.assertEqual(linter.diagnostics[0], ('JL001', 4, "Line 4 has a syntax error: invalid syntax."))
+        self.assertIn("Line 7 has trailing whitespace.", messages)
+        self.assertIn("Variable 'value' assigned on line 7 is not used.", messages)
+        # Only used by the broken function
+        self.assertFalse(any("Import 'os'" in message for message in messages))
+        self.assertFalse(any("'ok' lacks" in message for message in messages))
+
+    def test_suppressions_after_the_error_apply(self):
+        code = BROKEN_CODE.replace("value = 1 ", "value = 1  # jay_lint: disable=JL301,JL204")
+        messages = JayLinter(code, recover=True).lint()
+        self.assertNotIn("Line 7 has trailing whitespace.", messages)
+        self.assertNotIn("Variable 'value' assigned on line 7 is not used.", messages)
+
+    def test_off_by_default(self):
+        with self.assertRaises(SyntaxError):
+            JayLinter(BROKEN_CODE).lint()
+
+    def test_fix_leaves_broken_files_alone(self):
+        with self.assertRaises(SyntaxError):
+            JayLinter(BROKEN_CODE, recover=True).fix()
+
+    def test_valid_code_is_unaffected(self):
+        code = BROKEN_CODE.replace("broken(:", "broken():")
+        self.assertEqual(JayLinter(code, recover=True).lint(), JayLinter(code).lint())
+
+    def test_engine_and_command_line(self):
+        result = engine.lint_source(BROKEN_CODE.encode(), 'broken.py', {'recover': True})
+        self.assertIsNone(result.error)
+        self.assertEqual(result.diagnostics[0].code, 'JL001')
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main(['--recover', '-'], stdin=BROKEN_CODE.encode())
+        self.assertIn("- Line 4 has a syntax error: invalid syntax.", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
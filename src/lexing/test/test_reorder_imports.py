@@ -16,6 +16,7 @@ import os
 import thirdparty
 from local import local_module
 
+
 def my_function():
     return "Hello, World!"
 """
@@ -43,6 +44,7 @@ import sys
 import thirdparty
 from local import local_module
 
+
 def my_function():
     return "Hello, World!"
 """
@@ -85,5 +87,67 @@ def my_function():
         reordered_code = self.fix_and_reorder_code(code)
         self.assertEqual(reordered_code, expected_fixed_code.strip())
 
+    def test_sorted_file_is_not_rewritten(self):
+        code = "import os\nimport sys\n\ntry:\n    import json\nexcept ImportError:\n    json = None\n\nprint(os, sys, json)"
+        linter = JayLinter(source_code=code)
+        self.assertEqual(linter.reorder_imports(), code)
+
+    def test_nested_imports_stay_in_place(self):
+        code = """
+import sys
+
+
+def load():
+    import json
+    return json
+
+import abc
+"""
+        self.assertEqual(self.fix_and_reorder_code(code), code.strip())
+
+    def test_multi_line_import(self):
+        code = """
+from os.path import (
+    join,
+    split,
+)
+from abc import ABC
+
+x = 1
+"""
+        expected_fixed_code = """
+from abc import ABC
+from os.path import (
+    join,
+    split,
+)
+
+x = 1
+"""
+        self.assertEqual(self.fix_and_reorder_code(code), expected_fixed_code.strip())
+
+    def test_blocks_are_sorted_separately(self):
+        code = """
+from __future__ import annotations
+import sys
+import os
+# Configure the path before the next imports
+sys.path.insert(0, '.')
+import thirdparty
+import abc
+"""
+        expected_fixed_code = """
+from __future__ import annotations
+
+import os
+import sys
+# Configure the path before the next imports
+sys.path.insert(0, '.')
+import abc
+
+import thirdparty
+"""
+        self.assertEqual(self.fix_and_reorder_code(code), expected_fixed_code.strip())
+
 if __name__ == '__main__':
     unittest.main()
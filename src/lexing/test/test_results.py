@@ -0,0 +1,50 @@
+import pickle
+import unittest
+from src.lexing.logic.lexing import Diagnostic, JayLinter
+from src.lexing.logic.results import FileResult, decode_results, encode_results
+
+CODE = """import os
+import sys
+
+def my_function(a, b):
+    x = 1
+    return b
+"""
+
+class TestResultEncoding(unittest.TestCase):
+    def round_trip(self, results):
+        return list(decode_results(encode_results(results)))
+
+    def test_round_trip(self):
+        linter = JayLinter(CODE)
+        linter.lint()
+        results = [
+            FileResult('a.py', messages=linter.messages, diagnostics=linter.diagnostics, fingerprints=['JL202\ta.py\t00ff']),
+            FileResult('b.py', error="invalid syntax (<unknown>, line 1)"),
+            FileResult('c.py', changed=True, passes=2, diff="--- a/c.py\n+++ b/c.py\n", fixed_source="x = 'é'\n"),
+            FileResult('bad-\udcff.py'),
+        ]
+        decoded = self.round_trip(results)
+        self.assertEqual(len(decoded), len(results))
+        for original, result in zip(decoded, results):
+            self.assertEqual(original.path, result.path)
+            self.assertEqual(list(original.messages), list(result.messages))
+            self.assertEqual(list(original.diagnostics), list(result.diagnostics))
+            self.assertEqual(list(original.fingerprints), list(result.fingerprints))
+            self.assertEqual(original[4:], result[4:])
+        self.assertIsInstance(decoded[0].diagnostics[0], Diagnostic)
+
+    def test_empty_batch(self):
+        self.assertEqual(self.round_trip([]), [])
+
+    def test_smaller_than_pickle(self):
+        results = []
+        for i in range(50):
+            # A linter per file, like the workers: pickle can't share the strings between results
+            linter = JayLinter(CODE)
+            linter.lint()
+            results.append(FileResult(f'pkg/module_{i}.py', messages=linter.messages, diagnostics=linter.diagnostics))
+        self.assertLess(len(encode_results(results)), len(pickle.dumps(results)) / 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from src.cli import main
+from src.lexing.logic.lexing import Diagnostic
+from src.lexing.logic.results import FileResult, decode_results, encode_results
+from src.lexing.logic.results_db import ResultsDatabase
+
+def result(path, *codes, elapsed=0.5, error=None):
+    diagnostics = [Diagnostic(code, i + 1, f"{code} on line {i + 1}.") for i, code in enumerate(codes)]
+    return FileResult(path, messages=[d.message for d in diagnostics], diagnostics=diagnostics, elapsed=elapsed, error=error)
+
+class TestResultsDatabase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'results.db')
+
+    def record(self, *results):
+        database = ResultsDatabase(self.path)
+        run = database.start_run()
+        for item in results:
+            database.add_result(item)
+        database.finish_run()
+        database.close()
+        return run
+
+    def test_runs_rules_and_files(self):
+        first = self.record(result('a.py', 'JL301', 'JL301', 'JL202'), result('b.py', 'JL202', elapsed=2.0))
+        # Packed results, as they come back from worker processes
+        packed = decode_results(encode_results([result('a.py', 'JL301'), result('b.py', error='bad', elapsed=0.0)]))
+        second = self.record(*packed)
+
+        database = ResultsDatabase(self.path)
+        self.addCleanup(database.close)
+        self.assertEqual([row[0] for row in database.runs(10)], [second, first])
+        self.assertEqual(database.runs(10)[0][2:], (2, 1, 1))
+        self.assertEqual(database.rule_counts([first, second]), {first: {'JL301': 2, 'JL202': 2}, second: {'JL301': 1}})
+        self.assertEqual(database.rule_counts([first], 'JL2'), {first: {'JL202': 2}})
+        self.assertEqual(database.top_paths(first, 10), [('a.py', 3), ('b.py', 1)])
+        self.assertEqual(database.top_paths(first, 10, 'JL202'), [('a.py', 1), ('b.py', 1)])
+        self.assertEqual(database.slowest_files(first, 1), [('b.py', 2.0)])
+        self.assertEqual(database.path_history('a.py', 10), [(second, 1, 0.5), (first, 3, 0.5)])
+
+    def test_unfinished_runs_are_not_listed(self):
+        database = ResultsDatabase(self.path)
+        self.addCleanup(database.close)
+        database.start_run()
+        database.add_result(result('a.py', 'JL301'))
+        self.assertEqual(database.runs(10), [])
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'w') as f:
+            f.write("not a database" * 100)
+        with self.assertRaises(ValueError):
+            ResultsDatabase(self.path)
+
+class TestReportCommand(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.database = os.path.join(self.directory.name, 'results.db')
+        self.source = os.path.join(self.directory.name, 'module.py')
+        with open(self.source, 'w') as f:
+            f.write("import os\n")
+
+    def run_main(self, *argv):
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(io.StringIO()):
+            main(list(argv))
+        return output.getvalue()
+
+    def test_lint_runs_are_recorded_and_reported(self):
+        self.run_main('-j', '1', '--results-db', self.database, self.source)
+        with open(self.source, 'a') as f:
+            f.write("import sys\n")
+        self.run_main('-j', '1', '--results-db', self.database, self.source)
+        # Fixing doesn't record a run
+        self.run_main('--fix', '--results-db', self.database, self.source)
+
+        report = self.run_main('report', '--db', self.database)
+        lines = report.splitlines()
+        self.assertTrue(lines[1].startswith("2 "))
+        self.assertTrue(lines[2].startswith("1 "))
+        self.assertIn("JL202  unused-import", report)
+        self.assertIn(f"       3  {self.source}", report)
+
+        history = self.run_main('report', '--db', self.database, '--path', self.source).splitlines()
+        self.assertEqual(history[1].split()[:3], ['2', '3', '+1'])
+
+    def test_report_needs_a_database(self):
+        with self.assertRaises(SystemExit):
+            self.run_main('report', '--db', self.database)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -71,5 +71,33 @@ def function_with_blank_line():
         print(f"expected_fixed_code: {expected_fixed_code}")
         self.assertEqual(fixed_code.strip(), expected_fixed_code.strip())
 
+    def test_names_starting_with_return_are_not_returns(self):
+        code = """def function_with_blank_line():
+    total = 1
+
+    returned_value = total
+    return returned_value
+"""
+        self.assertEqual(self.fix_code(code), code.strip())
+
+    def test_return_text_in_strings_is_left_alone(self):
+        code = '''def describe():
+    text = """
+
+return nothing"""
+    return text
+'''
+        self.assertFalse(any("before 'return'" in message for message in self.lint_code(code)))
+        self.assertIn('"""\n\nreturn nothing"""', self.fix_code(code))
+
+    def test_fix_removes_every_blank_line_before_return(self):
+        code = """def function_with_blank_lines():
+    a = 1
+
+
+    return a
+"""
+        self.assertEqual(self.fix_code(code), "def function_with_blank_lines():\n    a = 1\n    return a")
+
 if __name__ == '__main__':
     unittest.main()
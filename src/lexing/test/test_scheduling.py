@@ -0,0 +1,90 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from src.cli import main
+from src.lexing.logic import engine
+from src.lexing.logic.scheduling import DEFAULT_SECONDS_PER_BYTE, RuntimeHistory, plan_batches
+
+class TestPlanBatches(unittest.TestCase):
+    def test_costly_files_go_first_and_alone(self):
+        costs = [1, 1, 100, 1, 50, 1]
+        batches = plan_batches(costs, jobs=2, max_batch_size=256)
+        self.assertEqual(batches[0], [2])
+        self.assertEqual(batches[1], [4])
+        self.assertEqual(sorted(index for batch in batches for index in batch), list(range(len(costs))))
+
+    def test_cheap_files_are_batched(self):
+        batches = plan_batches([1] * 100, jobs=2, max_batch_size=256)
+        # About BATCHES_PER_WORKER batches per worker
+        self.assertIn(len(batches), (8, 9))
+        self.assertTrue(all(len(batch) <= 13 for batch in batches))
+
+    def test_batch_size_is_capped(self):
+        batches = plan_batches([1] * 100, jobs=1, max_batch_size=10)
+        self.assertTrue(all(len(batch) <= 10 for batch in batches))
+
+class TestRuntimeHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'jay_lint', 'timings.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unknown_files_are_predicted_from_size(self):
+        history = RuntimeHistory(self.path)
+        rate = history.seconds_per_byte()
+        self.assertEqual(rate, DEFAULT_SECONDS_PER_BYTE)
+        self.assertEqual(history.predict('/a.py', 1000, rate), 1000 * rate)
+
+    def test_round_trip(self):
+        history = RuntimeHistory(self.path)
+        history.record('/a.py', 100, 0.5)
+        history.save()
+        history = RuntimeHistory(self.path)
+        rate = history.seconds_per_byte()
+        self.assertEqual(rate, 0.005)
+        self.assertEqual(history.predict('/a.py', 100, rate), 0.5)
+        # A file that grew is scaled from its old time
+        self.assertEqual(history.predict('/a.py', 200, rate), 1.0)
+        self.assertEqual(history.predict('/b.py', 10, rate), 0.05)
+
+    def test_corrupt_file_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        self.assertEqual(RuntimeHistory(self.path).files, {})
+
+class TestScheduledRun(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(6):
+            path = os.path.join(self.tmp.name, f"file{i}.py")
+            with open(path, 'w') as f:
+                f.write("import os\n" + "x = 1\n" * (i * 200) + "print(x)\n")
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_results_keep_input_order_and_are_recorded(self):
+        history = RuntimeHistory(os.path.join(self.tmp.name, 'timings.json'))
+        results = list(engine.run(self.paths, jobs=2, history=history))
+        self.assertEqual([result.path for result in results], self.paths)
+        self.assertTrue(all(result.messages for result in results))
+        self.assertEqual(set(history.files), {os.path.abspath(path) for path in self.paths})
+        self.assertTrue(all(result.elapsed > 0 for result in results))
+
+    def test_profile(self):
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            main(['--profile', '-j', '1'] + self.paths)
+        self.assertIn("Profile: 6 files in", err.getvalue())
+        self.assertIn("parallel efficiency", err.getvalue())
+        self.assertIn(self.paths[-1], err.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
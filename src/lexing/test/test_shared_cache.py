@@ -0,0 +1,151 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.lexing.logic import engine
+from src.lexing.logic.shared_cache import DirectoryCache, HttpCache, SharedCache, content_key, open_shared_cache
+
+CODE = "import os\n\ndef f(a):\n    return 1\n"
+
+SETTINGS = {'fix': False, 'diff': False, 'fingerprints': False}
+
+class _KeyValueHandler(BaseHTTPRequestHandler):
+    # A stand-in for a remote cache server: GET and PUT on /<prefix>/<key>
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        blob = self.server.store.get(self.path)
+        self.send_response(404 if blob is None else 200)
+        self.send_header('Content-Length', str(len(blob or b'')))
+        self.end_headers()
+        self.wfile.write(blob or b'')
+
+    def do_PUT(self):
+        self.server.store[self.path] = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+class TestContentKey(unittest.TestCase):
+    def test_key_depends_on_content_and_options(self):
+        key = content_key(CODE.encode(), 'a.py', SETTINGS, None)
+        self.assertEqual(key, content_key(CODE.encode(), 'elsewhere/b.py', SETTINGS, None))
+        self.assertNotEqual(key, content_key(b"x = 1\n", 'a.py', SETTINGS, None))
+        self.assertNotEqual(key, content_key(CODE.encode(), 'a.py', SETTINGS, {'exported_names': {'os'}}))
+
+    def test_fingerprints_make_the_path_count(self):
+        settings = dict(SETTINGS, fingerprints=True)
+        self.assertNotEqual(
+            content_key(CODE.encode(), 'a.py', settings, None), content_key(CODE.encode(), 'b.py', settings, None),
+        )
+
+    def test_backends_must_implement_get_and_put(self):
+        class GetOnly(SharedCache):
+            def get_many(self, keys):
+                return {}
+        with self.assertRaises(TypeError):
+            GetOnly()
+
+class SharedCacheRunTests:
+    # Runs shared by every backend; make_cache returns a fresh client for the same storage
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name in ('one.py', 'two.py'):
+            path = os.path.join(self.tmp.name, name)
+            with open(path, 'w') as f:
+                f.write(CODE)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cold_run_reuses_earlier_results(self):
+        first_cache = self.make_cache()
+        first = list(engine.run(self.paths, jobs=1, shared_cache=first_cache))
+        self.assertEqual((first_cache.hits, first_cache.misses), (0, 2))
+
+        # A "new runner": another client, and the files checked out somewhere else
+        checkout = os.path.join(self.tmp.name, 'checkout')
+        os.mkdir(checkout)
+        moved = [os.path.join(checkout, os.path.basename(path)) for path in self.paths]
+        for old, new in zip(self.paths, moved):
+            os.rename(old, new)
+        second_cache = self.make_cache()
+        second = list(engine.run(moved, jobs=1, shared_cache=second_cache))
+        self.assertEqual((second_cache.hits, second_cache.misses), (2, 0))
+        self.assertEqual([result.path for result in second], moved)
+        self.assertEqual([result.messages for result in second], [result.messages for result in first])
+        self.assertEqual(list(second[0].diagnostics), list(first[0].diagnostics))
+
+    def test_changed_file_is_linted_again(self):
+        list(engine.run(self.paths, jobs=1, shared_cache=self.make_cache()))
+        with open(self.paths[0], 'w') as f:
+            f.write("import sys\n")
+        cache = self.make_cache()
+        results = list(engine.run(self.paths, jobs=1, shared_cache=cache))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIn("Import 'sys' on line 1 is not used.", results[0].messages)
+
+class TestDirectoryCache(SharedCacheRunTests, unittest.TestCase):
+    def make_cache(self):
+        return DirectoryCache(os.path.join(self.tmp.name, 'cache'))
+
+    def test_damaged_entry_is_a_miss(self):
+        list(engine.run(self.paths, jobs=1, shared_cache=self.make_cache()))
+        cache_dir = os.path.join(self.tmp.name, 'cache')
+        for root, _, files in os.walk(cache_dir):
+            for name in files:
+                with open(os.path.join(root, name), 'wb') as f:
+                    f.write(b'not zlib')
+        cache = self.make_cache()
+        results = list(engine.run(self.paths, jobs=1, shared_cache=cache))
+        self.assertEqual(cache.hits, 0)
+        self.assertTrue(results[0].messages)
+
+class TestHttpCache(SharedCacheRunTests, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _KeyValueHandler)
+        self.server.store = {}
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def make_cache(self):
+        client = open_shared_cache(f"http://127.0.0.1:{self.server.server_port}/lint/")
+        self.clients.append(client)
+        return client
+
+    def test_entries_are_stored_under_the_url_prefix(self):
+        list(engine.run(self.paths, jobs=1, shared_cache=self.make_cache()))
+        # Both files have the same content, so they share one key
+        self.assertEqual(len(self.server.store), 1)
+        self.assertTrue(all(path.startswith('/lint/') for path in self.server.store))
+
+    def test_unreachable_server_is_switched_off(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        cache = HttpCache(f"http://127.0.0.1:{port}", timeout=1.0)
+        results = list(engine.run(self.paths, jobs=1, shared_cache=cache))
+        self.assertFalse(cache.available)
+        self.assertTrue(all(result.messages for result in results))
+
+    def test_rejects_other_schemes(self):
+        with self.assertRaises(ValueError):
+            HttpCache("ftp://example.com/cache")
+
+if __name__ == '__main__':
+    unittest.main()
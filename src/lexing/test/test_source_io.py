@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from src.lexing.logic import engine, source_io
+
+LATIN1_CODE = """# -*- coding: latin-1 -*-
+import os
+
+# Says h\xe9llo
+def myFunction():
+    return "h\xe9llo"
+"""
+
+class TestSourceIo(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, data):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_source_encoding(self):
+        self.assertEqual(source_io.source_encoding(b"x = 1\n"), 'utf-8')
+        self.assertEqual(source_io.source_encoding(b"\xef\xbb\xbfx = 1\n"), 'utf-8-sig')
+        self.assertEqual(source_io.source_encoding(b"#!/usr/bin/env python\n# coding: latin-1\n"), 'iso-8859-1')
+        # A cookie only counts on the first two lines
+        self.assertEqual(source_io.source_encoding(b"\n\n# coding: latin-1\n"), 'utf-8')
+
+    def test_decode_source_normalizes_newlines(self):
+        self.assertEqual(source_io.decode_source(b"a = 1\r\nb = 2\r\n"), "a = 1\nb = 2\n")
+
+    def test_lint_file_with_coding_cookie(self):
+        path = self.write('a.py', LATIN1_CODE.encode('latin-1'))
+        [result] = engine.run([path])
+        self.assertIsNone(result.error)
+        self.assertIn('JL202', [d.code for d in result.diagnostics])
+
+    def test_fix_keeps_encoding_and_bom(self):
+        latin1 = self.write('latin1.py', LATIN1_CODE.encode('latin-1'))
+        bom = self.write('bom.py', b'\xef\xbb\xbf' + LATIN1_CODE.split('\n', 1)[1].encode('utf-8'))
+        for result in engine.run([latin1, bom], fix=True, jobs=1):
+            self.assertIsNone(result.error)
+            self.assertTrue(result.changed)
+        self.assertIn('return "h\xe9llo"'.encode('latin-1'), self.read(latin1))
+        self.assertNotIn(b'import os', self.read(latin1))
+        self.assertTrue(self.read(bom).startswith(b'\xef\xbb\xbf'))
+        self.assertIn('h\xe9llo'.encode('utf-8'), self.read(bom))
+
+    def test_fix_signature_after_non_ascii_text(self):
+        # Later passes tokenize the fixed text, whose columns must not shift by the cookie's encoding
+        code = "# -*- coding: latin-1 -*-\ndef f(s='\xe9\xe9', b=1):\n    x = b\n    return s\n"
+        path = self.write('signature.py', code.encode('latin-1'))
+        [result] = engine.run([path], fix=True)
+        self.assertIsNone(result.error)
+        self.assertIn("def f(s='\xe9\xe9'):".encode('latin-1'), self.read(path))
+
+    def test_written_files_keep_or_get_the_usual_mode(self):
+        existing = self.write('existing.py', b"x = 1\n")
+        os.chmod(existing, 0o751)
+        source_io.write_source_file(existing, "x = 2\n")
+        self.assertEqual(os.stat(existing).st_mode & 0o7777, 0o751)
+
+        umask = os.umask(0o027)
+        self.addCleanup(os.umask, umask)
+        created = os.path.join(self.directory.name, 'created.json')
+        source_io.write_source_file(created, "{}")
+        self.assertEqual(os.stat(created).st_mode & 0o7777, 0o640)
+
+    def test_large_files_are_memory_mapped(self):
+        path = self.write('big.py', LATIN1_CODE.encode('latin-1'))
+        threshold = source_io.MMAP_THRESHOLD
+        source_io.MMAP_THRESHOLD = 16
+        self.addCleanup(setattr, source_io, 'MMAP_THRESHOLD', threshold)
+
+        data = source_io.read_source_bytes(path)
+        self.assertFalse(isinstance(data, bytes))
+        source_io.close_source(data)
+        [lint] = engine.run([path])
+        self.assertIn('JL202', [d.code for d in lint.diagnostics])
+        [fixed] = engine.run([path], fix=True)
+        self.assertTrue(fixed.changed)
+        self.assertNotIn(b'import os', self.read(path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Modules that only some runs need and that must not be paid for on every invocation
+HEAVY_MODULES = ['tokenize', 'concurrent.futures', 'difflib', 'tempfile', 'pathlib', 'hashlib']
+
+def loaded_modules(code, *args):
+    # Run code in a fresh interpreter and return the modules it ended up importing
+    script = f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, '-c', script, *args], env=env, cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(output.stdout.split())
+
+class TestStartup(unittest.TestCase):
+    def test_importing_cli_loads_no_linter_code(self):
+        modules = loaded_modules('import src.cli')
+        self.assertNotIn('src.lexing.logic.lexing', modules)
+        self.assertNotIn('ast', modules)
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, modules)
+
+    def test_linting_tiny_file_skips_heavy_modules(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tiny.py')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("a = 1\n")
+            modules = loaded_modules('import sys\nfrom src.cli import main\nsys.argv[1:] = [sys.argv.pop()]\nmain()', path)
+        self.assertIn('src.lexing.logic.lexing', modules)
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, modules)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from src.cli import main
+from src.lexing.logic import engine
+from src.lexing.logic.lexing import JayLinter
+
+UNUSED_CODE = b"""import os
+
+def my_function(unused_arg, used_arg):
+    return used_arg
+"""
+
+FIXED_CODE = """def my_function(used_arg):
+    return used_arg
+"""
+
+class TestStdin(unittest.TestCase):
+    def run_main(self, argv, stdin):
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            status = main(argv, stdin=stdin)
+        return status, out.getvalue(), err.getvalue()
+
+    def test_lint_stdin(self):
+        _, output, _ = self.run_main(['-'], UNUSED_CODE)
+        self.assertIn("Import 'os' on line 1 is not used.", output)
+
+    def test_fix_stdin_prints_only_fixed_code(self):
+        status, output, _ = self.run_main(['-', '--fix'], UNUSED_CODE)
+        self.assertFalse(status)
+        self.assertEqual(output, FIXED_CODE)
+
+    def test_fix_stdin_error_goes_to_stderr(self):
+        status, output, error = self.run_main(['-', '--fix', '--stdin-filename', 'pkg/mod.py'], b"def (\n")
+        self.assertEqual(status, 1)
+        self.assertEqual(output, '')
+        self.assertIn("'pkg/mod.py'", error)
+
+    def test_diff_uses_stdin_filename(self):
+        _, output, _ = self.run_main(['-', '--diff', '--stdin-filename', 'pkg/mod.py'], UNUSED_CODE)
+        self.assertTrue(output.startswith("--- a/pkg/mod.py\n+++ b/pkg/mod.py\n"))
+
+    def test_stdin_cannot_be_mixed_with_files(self):
+        with self.assertRaises(SystemExit):
+            self.run_main(['-', 'other.py'], UNUSED_CODE)
+
+class TestBufferApi(unittest.TestCase):
+    def test_from_bytes_accepts_any_buffer(self):
+        for data in (UNUSED_CODE, bytearray(UNUSED_CODE), memoryview(UNUSED_CODE)):
+            linter = JayLinter.from_bytes(data)
+            self.assertEqual(linter.lint(), JayLinter(UNUSED_CODE.decode('utf-8')).lint())
+
+    def test_from_bytes_tokenizes_the_buffer(self):
+        linter = JayLinter.from_bytes(b'\xef\xbb\xbf# caf\xc3\xa9\nx = 1\n')
+        self.assertEqual(linter.source_code, "# café\nx = 1\n")
+        self.assertEqual(linter.tokens[1].string, "# café")
+
+    def test_fix_source_returns_fixed_text(self):
+        result = engine.fix_source(UNUSED_CODE, 'mod.py')
+        self.assertTrue(result.changed)
+        self.assertEqual(result.fixed_source, FIXED_CODE)
+
+if __name__ == '__main__':
+    unittest.main()
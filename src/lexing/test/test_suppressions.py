@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+from src.lexing.logic.lexing import JayLinter
+
+class TestSuppressions(unittest.TestCase):
+    def lint_code(self, code):
+        linter = JayLinter(source_code=code)
+        return linter.lint()
+
+    def test_line_suppression(self):
+        code = """
+import os  # jay_lint: disable=JL202
+import sys
+"""
+        messages = self.lint_code(code)
+        self.assertNotIn("Import 'os' on line 2 is not used.", messages)
+        self.assertIn("Import 'sys' on line 3 is not used.", messages)
+
+    def test_line_suppression_is_kept_by_fix(self):
+        code = """
+import os  # jay_lint: disable=JL202
+import sys
+
+def myFunction():
+    return 1
+"""
+        linter = JayLinter(source_code=code)
+        linter.fix()
+        self.assertIn("import os", linter.source_code)
+        self.assertNotIn("import sys", linter.source_code)
+
+    def test_block_suppression_ends_with_block(self):
+        code = """
+def myFunction():
+    # jay_lint: disable=JL301
+    a = 1 
+    return a 
+b = 2 
+"""
+        messages = self.lint_code(code)
+        self.assertNotIn("Line 4 has trailing whitespace.", messages)
+        self.assertNotIn("Line 5 has trailing whitespace.", messages)
+        self.assertIn("Line 6 has trailing whitespace.", messages)
+
+    def test_enable_ends_block_suppression(self):
+        code = """
+# jay_lint: disable=JL301,JL307
+a = 1 
+# jay_lint: enable=JL301
+b = 2 
+"""
+        messages = self.lint_code(code)
+        self.assertNotIn("Line 3 has trailing whitespace.", messages)
+        self.assertIn("Line 5 has trailing whitespace.", messages)
+
+    def test_all_suppresses_every_rule(self):
+        code = """
+a = 1   # jay_lint: disable=all
+"""
+        messages = self.lint_code(code)
+        self.assertFalse(any(message.startswith("Line 2 ") for message in messages))
+
+    def test_long_line_suppression(self):
+        long_line = "a = '" + "x" * 110 + "'"
+        code = f"{long_line}  # jay_lint: disable=JL307\n{long_line}\n"
+        messages = self.lint_code(code)
+        self.assertNotIn("Line 1 exceeds the maximum line length of 100 characters.", messages)
+        self.assertIn("Line 2 exceeds the maximum line length of 100 characters.", messages)
+
+    def test_file_suppression_skips_rule(self):
+        code = """# jay_lint: disable-file=JL303,JL304
+a = 1
+b = 2"""
+        linter = JayLinter(source_code=code)
+        with mock.patch.object(linter, 'check_empty_lines') as check_empty_lines:
+            messages = linter.lint()
+        check_empty_lines.assert_not_called()
+        self.assertNotIn("File should end with an empty line.", messages)
+
+    def test_diagnostics_carry_codes(self):
+        code = """
+a = 1 
+"""
+        linter = JayLinter(source_code=code)
+        linter.lint()
+        self.assertIn(('JL301', 2, "Line 2 has trailing whitespace."), linter.diagnostics)
+        self.assertEqual(len(linter.diagnostics), len(linter.messages))
+
+if __name__ == '__main__':
+    unittest.main()
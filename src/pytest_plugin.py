@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+# Key of the pytest cache entry recording the files that passed, and what they passed with
+CACHE_KEY = 'jay_lint/passed'
+
+# Key of the files a pytest-xdist worker saw pass, sent back to the controller in workeroutput
+WORKER_OUTPUT_KEY = 'jay_lint_passed'
+
+# Where a run with --jay-lint keeps its JayLintState in config.stash
+_state_key = pytest.StashKey()
+
+def pytest_addoption(parser):
+    group = parser.getgroup('jay-lint')
+    group.addoption('--jay-lint', action='store_true', help="Lint every collected .py file with jays-linter")
+    group.addoption(
+        '--jay-lint-select', metavar='CODES',
+        help="Comma-separated codes or code prefixes of plugin rules to run as well, or 'all'",
+    )
+
+class JayLintState:
+    """
+    The files that passed, as path -> [mtime_ns, size, settings] where settings identifies
+    the linter and the options. A file whose entry still matches is skipped, so only the
+    files changed since the last run are linted again.
+    """
+    def __init__(self, config):
+        self.config = config
+        select = config.getoption('jay_lint_select')
+        self.select = tuple(code.strip() for code in select.split(',') if code.strip()) if select else None
+        self.settings = None
+        cache = getattr(config, 'cache', None)
+        self.previous = cache.get(CACHE_KEY, {}) if cache is not None else {}
+        self.passed = {}
+
+    def stamp(self, path):
+        if self.settings is None:
+            from src.lexing.logic.shared_cache import linter_digest
+            self.settings = f"{linter_digest(self.select or ()).hex()}:{','.join(self.select or ())}"
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size, self.settings]
+
+    def save(self):
+        cache = getattr(self.config, 'cache', None)
+        if cache is not None:
+            # Files not collected this time keep their entries, e.g. when only a subdirectory ran
+            cache.set(CACHE_KEY, dict(self.previous, **self.passed))
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "jay_lint: lint items added by --jay-lint")
+    if config.getoption('jay_lint'):
+        config.stash[_state_key] = JayLintState(config)
+
+def pytest_collect_file(file_path, parent):
+    if file_path.suffix == '.py' and _state_key in parent.config.stash:
+        return JayLintFile.from_parent(parent, path=file_path)
+    return None
+
+def pytest_sessionfinish(session):
+    state = session.config.stash.get(_state_key, None)
+    if state is None:
+        return
+    workeroutput = getattr(session.config, 'workeroutput', None)
+    if workeroutput is not None:
+        # A pytest-xdist worker leaves writing the cache to the controller, so the workers
+        # don't overwrite one another's results
+        workeroutput[WORKER_OUTPUT_KEY] = state.passed
+    else:
+        state.save()
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # pytest-xdist controller: gather what a worker saw pass
+    state = node.config.stash.get(_state_key, None)
+    workeroutput = getattr(node, 'workeroutput', None)
+    if state is not None and workeroutput:
+        state.passed.update(workeroutput.get(WORKER_OUTPUT_KEY, {}))
+
+class JayLintError(Exception):
+    """Findings of a file that failed linting, reported as the item's failure."""
+
+class JayLintFile(pytest.File):
+    def collect(self):
+        yield JayLintItem.from_parent(self, name='jay-lint')
+
+class JayLintItem(pytest.Item):
+    """One lint check of a file, independent of every other item so xdist can run it anywhere."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.add_marker('jay_lint')
+        self.state = self.config.stash[_state_key]
+
+    def setup(self):
+        self.stamp = self.state.stamp(self.path)
+        if self.state.previous.get(str(self.path)) == self.stamp:
+            pytest.skip("file previously passed jay-lint checks")
+
+    def runtest(self):
+        from src.lexing.logic import engine
+        options = {'select': self.state.select} if self.state.select else None
+        result = engine.lint_file(str(self.path), options)
+        if result.error:
+            raise JayLintError(f"could not lint the file: {result.error}")
+        if result.messages:
+            raise JayLintError('\n'.join(result.messages))
+        self.state.passed[str(self.path)] = self.stamp
+
+    def repr_failure(self, excinfo):
+        if excinfo.errisinstance(JayLintError):
+            return str(excinfo.value)
+        return super().repr_failure(excinfo)
+
+    def reportinfo(self):
+        return self.path, None, f"{self.path}::jay-lint"
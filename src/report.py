@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+import time
+
+def _change(current, previous):
+    if previous is None:
+        return ''
+    return f"{current - previous:+d}"
+
+def print_path_history(database, path, runs=10, out=None):
+    # Findings and lint time of one file over the last runs that linted it
+    out = out or sys.stdout
+    history = database.path_history(path, runs)
+    if not history:
+        print(f"No results recorded for {path}.", file=out)
+        return
+    print(f"Run     Findings  Change   Seconds  ({path})", file=out)
+    lines = []
+    previous = None
+    for run, findings, elapsed in reversed(history):
+        lines.append(f"{run:<7} {findings:>8}  {_change(findings, previous):>6}  {elapsed:8.3f}")
+        previous = findings
+    for line in reversed(lines):
+        print(line, file=out)
+
+def print_report(database, runs=10, top=10, rule=None, out=None):
+    """
+    Print the finding counts of the last runs recorded in database, a ResultsDatabase,
+    then for the latest run the findings by rule and the files with the most findings
+    and the slowest ones. rule limits the findings counted to codes starting with it.
+    """
+    from src.lexing.logic.lexing import RULES
+
+    out = out or sys.stdout
+    recent = database.runs(runs)
+    if not recent:
+        print(f"No runs recorded in {database.path}.", file=out)
+        return
+    counts = database.rule_counts([run for run, *_ in recent], rule)
+
+    print("Run     Started             Files  Findings  Change", file=out)
+    previous = None
+    lines = []
+    for run, started, files, findings, errors in reversed(recent):
+        if rule:
+            findings = sum(counts[run].values())
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(started))
+        errors = f"  ({errors} could not be linted)" if errors else ''
+        lines.append(f"{run:<7} {when}  {files:>6}  {findings:>8}  {_change(findings, previous):>6}{errors}")
+        previous = findings
+    for line in reversed(lines):
+        print(line, file=out)
+
+    latest = recent[0][0]
+    before = counts[recent[1][0]] if len(recent) > 1 else None
+    print(f"\nFindings by rule in run {latest}:", file=out)
+    for code, count in sorted(counts[latest].items(), key=lambda item: (-item[1], item[0])):
+        change = _change(count, before.get(code, 0)) if before is not None else ''
+        print(f"  {code}  {RULES.get(code, ''):<26} {count:>8}  {change:>6}", file=out)
+
+    print(f"\nTop offenders in run {latest}:", file=out)
+    for path, count in database.top_paths(latest, top, rule):
+        print(f"  {count:>8}  {path}", file=out)
+
+    print(f"\nSlowest files in run {latest}:", file=out)
+    for path, elapsed in database.slowest_files(latest, top):
+        print(f"  {elapsed:8.3f} s  {path}", file=out)
+
+def report_main(argv):
+    parser = argparse.ArgumentParser(prog='jays-linter report', description='Summarize the runs recorded with --results-db')
+    parser.add_argument(
+        '--db', metavar='FILE', default=os.environ.get('JAY_LINT_RESULTS_DB'),
+        help="Results database to read (default: $JAY_LINT_RESULTS_DB)",
+    )
+    parser.add_argument('--runs', type=int, default=10, help="Number of recent runs to show the trend of")
+    parser.add_argument('--top', type=int, default=10, help="Number of files to list as top offenders and slowest")
+    parser.add_argument('--rule', metavar='CODE', help="Only count findings whose code starts with CODE")
+    parser.add_argument('--path', metavar='FILE', help="Show the history of one file, as it was named when linted")
+    args = parser.parse_args(argv)
+
+    if not args.db:
+        parser.error("no results database: pass --db or set $JAY_LINT_RESULTS_DB")
+    if not os.path.isfile(args.db):
+        parser.error(f"results database '{args.db}' not found")
+
+    from src.lexing.logic.results_db import ResultsDatabase
+    try:
+        database = ResultsDatabase(args.db)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        if args.path:
+            print_path_history(database, args.path, args.runs)
+        else:
+            print_report(database, args.runs, args.top, args.rule)
+    finally:
+        database.close()
+    return 0